@@ -1,12 +1,26 @@
 # Main Flask application for NSOS
 # Police Station Management System
 
-from flask import Flask, send_from_directory
+from flask import Flask, send_from_directory, abort, request, current_app
+from werkzeug.utils import send_file
 from flask_cors import CORS
-from config import SECRET_KEY, UPLOAD_FOLDER
-from routes import routes
+from config import (SECRET_KEY, UPLOAD_FOLDER, EVIDENCE_CACHE_MAX_AGE, EVIDENCE_SENDFILE,
+                    EVIDENCE_ACCEL_PREFIX, METRICS_PATH, PROFILE_SLOW_REQUESTS, PROFILE_DIR,
+                    PROFILE_INTERVAL, ASGI_THREADS, ASGI_MAX_PENDING, HEALTH_LIVE_PATH,
+                    HEALTH_READY_PATH, HEALTH_CHECK_TIMEOUT)
+from asgi import ASGIAdapter
+from routes import routes, login_required
+import database as db
+import health
+import logs
+import metrics
+import utils
+import mimetypes
 import os
 
+# Log records go through a queue to a background writer (LOG_* in config.py)
+logs.setup_from_config()
+
 # Create Flask app
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
 
@@ -31,6 +45,24 @@ CORS(app, supports_credentials=True)
 # Register routes
 app.register_blueprint(routes)
 
+# Request IDs (X-Request-ID) on every log record written during a request
+logs.init_app(app)
+
+# One pooled DB connection per request, released at teardown
+db.init_app(app)
+
+# Request / DB / JSON timings, GET /metrics and the optional slow request profiler
+metrics.init_app(app, METRICS_PATH, PROFILE_SLOW_REQUESTS, PROFILE_DIR, PROFILE_INTERVAL)
+
+# Liveness / readiness checks for load balancers (no login needed)
+health.init_app(app, HEALTH_LIVE_PATH, HEALTH_READY_PATH, HEALTH_CHECK_TIMEOUT)
+
+# Revoked session tokens are checked from memory, load them once now
+db.load_revoked_tokens()
+
+# Build the full-text search index in the background if it doesn't exist yet
+db.ensure_search_index()
+
 # Create uploads folder if it doesn't exist
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
@@ -55,6 +87,79 @@ def uploaded_file(filename):
     return send_from_directory(UPLOAD_FOLDER, filename)
 
 
+@app.route('/uploads/evidence/<int:evidence_id>')
+@login_required
+def evidence_file(evidence_id):
+    """Serve an evidence file under its original name
+
+    Supports Range requests and conditional GETs. Files stored by content
+    hash use the hash as a strong ETag and are cached as immutable.
+    Evidence IDs are sequential, so a login is required: links and <img>
+    tags can't send the Bearer header, the session cookie set at login
+    is accepted too.
+    """
+    evidence = db.get_evidence_by_id(evidence_id)
+    if not evidence:
+        abort(404)
+    path = utils.get_evidence_path(evidence)
+    if not os.path.exists(path):
+        abort(404)
+    sha256 = evidence.get('sha256')
+
+    if EVIDENCE_SENDFILE == 'x-accel-redirect':
+        # nginx streams the file (and handles Range); we only answer 304s
+        mimetype = mimetypes.guess_type(evidence['file_name'])[0] or 'application/octet-stream'
+        response = current_app.response_class(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = (
+            EVIDENCE_ACCEL_PREFIX + os.path.relpath(path, UPLOAD_FOLDER).replace(os.sep, '/'))
+        # Stored names went through secure_filename, so they are plain ASCII
+        response.headers['Content-Disposition'] = f'inline; filename="{evidence["file_name"]}"'
+        response.set_etag(sha256 or f'{os.path.getmtime(path)}-{os.path.getsize(path)}')
+        response.last_modified = os.path.getmtime(path)
+        response = response.make_conditional(request)
+    else:
+        # send_file handles Range, If-None-Match and If-Modified-Since itself
+        response = send_file(
+            path, request.environ,
+            download_name=evidence['file_name'],
+            etag=sha256 or True,
+            max_age=EVIDENCE_CACHE_MAX_AGE if sha256 else None,
+            use_x_sendfile=EVIDENCE_SENDFILE == 'x-sendfile',
+            response_class=current_app.response_class,
+            _root_path=current_app.root_path)
+
+    if sha256:
+        # Evidence is private, and a hash-addressed file can never change
+        response.headers['Cache-Control'] = f'private, max-age={EVIDENCE_CACHE_MAX_AGE}, immutable'
+    return response
+
+
+@app.route('/uploads/evidence/<int:evidence_id>/preview')
+@login_required
+def evidence_preview(evidence_id):
+    """Small JPEG preview of an image or PDF evidence file
+
+    202 while the preview is being generated, 404 if the file type has none.
+    """
+    evidence = db.get_evidence_by_id(evidence_id)
+    if not evidence or not evidence.get('sha256'):
+        abort(404)
+    sha256 = evidence['sha256']
+    if not utils.previews.has_preview(sha256):
+        if utils.previews.submit(sha256, evidence['file_name']):
+            return {'status': 'pending'}, 202
+        abort(404)
+    response = send_file(
+        utils.previews.preview_path(sha256), request.environ,
+        mimetype='image/jpeg',
+        etag=sha256 + '-preview',
+        use_x_sendfile=EVIDENCE_SENDFILE == 'x-sendfile',
+        response_class=current_app.response_class,
+        _root_path=current_app.root_path)
+    response.headers['Cache-Control'] = f'private, max-age={EVIDENCE_CACHE_MAX_AGE}, immutable'
+    return response
+
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -66,6 +171,11 @@ def internal_error(error):
     return {'error': 'Internal server error'}, 500
 
 
+# ASGI entry point with the same routes: uvicorn --app-dir backend app:asgi_app
+asgi_app = ASGIAdapter(app, ASGI_THREADS, ASGI_MAX_PENDING)
+metrics.REGISTRY.register_collector(asgi_app.collect_metrics)
+
+
 if __name__ == '__main__':
     # Run the app
     app.run(debug=True, host='0.0.0.0', port=5000)
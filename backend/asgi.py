@@ -0,0 +1,243 @@
+# ASGI adapter for the Flask app
+# Lets an ASGI server (uvicorn, hypercorn, ...) serve the same app as the
+# WSGI server: app.py exposes it as app:asgi_app, e.g.
+#   uvicorn --app-dir backend app:asgi_app
+# The event loop only reads requests and writes responses. Handlers, with
+# their blocking database calls, run on a pool of threads; a request
+# waiting for a thread is a coroutine, not a thread, so one process can
+# hold many requests in flight while the database is slow.
+
+import asyncio
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Request bodies larger than this are spooled to a temporary file
+SPOOL_SIZE = 1024 * 1024
+# Response bytes a thread collects before handing them to the event loop
+CHUNK_BATCH_SIZE = 64 * 1024
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope, body is a file object"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        # WSGI strings are bytes decoded as latin-1 (PEP 3333)
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE' or name == 'CONTENT_LENGTH':
+            key = name
+        else:
+            key = f'HTTP_{name}'
+        if key in environ:
+            separator = '; ' if key == 'HTTP_COOKIE' else ','
+            value = environ[key] + separator + value
+        environ[key] = value
+    return environ
+
+
+class ASGIAdapter:
+    """ASGI application running a WSGI app on a thread pool
+
+    At most max_pending requests are in flight (running or waiting for a
+    thread); more get 503 with Retry-After without touching the pool.
+    Bodies larger than the app's MAX_CONTENT_LENGTH get 413 while they are
+    read, before anything is spooled past the limit or run on the pool.
+    The threads are started on the first request.
+    """
+
+    def __init__(self, wsgi_app, threads=20, max_pending=1000):
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self.max_pending = max_pending
+        self._executor = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stats = {'handled': 0, 'rejected': 0, 'too_large': 0}
+
+    def _get_executor(self):
+        # Created on first use, after any fork
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='asgi')
+            return self._executor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        with self._lock:
+            if self._in_flight >= self.max_pending:
+                self._stats['rejected'] += 1
+                busy = True
+            else:
+                self._in_flight += 1
+                busy = False
+        if busy:
+            await send({'type': 'http.response.start', 'status': 503,
+                        'headers': [(b'content-type', b'application/json'), (b'retry-after', b'1')]})
+            await send({'type': 'http.response.body', 'body': b'{"error": "Server busy"}'})
+            return
+        try:
+            await self._handle(scope, receive, send)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._stats['handled'] += 1
+
+    def _max_body_size(self):
+        # Read per request, like Flask does, so config changes apply
+        config = getattr(self.wsgi_app, 'config', None)
+        return config.get('MAX_CONTENT_LENGTH') if config is not None else None
+
+    def _declared_length(self, scope):
+        for name, value in scope.get('headers', []):
+            if name.lower() == b'content-length':
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    async def _too_large(self, send):
+        with self._lock:
+            self._stats['too_large'] += 1
+        await send({'type': 'http.response.start', 'status': 413,
+                    'headers': [(b'content-type', b'application/json'), (b'connection', b'close')]})
+        await send({'type': 'http.response.body', 'body': b'{"error": "Request body too large"}'})
+
+    async def _handle(self, scope, receive, send):
+        max_size = self._max_body_size()
+        if max_size is not None and (self._declared_length(scope) or 0) > max_size:
+            await self._too_large(send)
+            return
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if max_size is not None and size > max_size:
+                body.close()
+                await self._too_large(send)
+                return
+            body.write(chunk)
+            if not message.get('more_body'):
+                break
+        body.seek(0)
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        environ = build_environ(scope, body)
+        stream = None
+        try:
+            status, headers, chunks, stream = await loop.run_in_executor(executor, self._start, environ)
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            while stream is not None:
+                await send({'type': 'http.response.body', 'body': b''.join(chunks), 'more_body': True})
+                # _next_chunks closes the stream itself if it fails
+                current, stream = stream, None
+                chunks, stream = await loop.run_in_executor(executor, self._next_chunks, current)
+            await send({'type': 'http.response.body', 'body': b''.join(chunks)})
+        finally:
+            body.close()
+            if stream is not None:
+                # Client went away mid-response
+                await loop.run_in_executor(executor, self._close, stream)
+
+    def _start(self, environ):
+        """Run the WSGI app (on a pool thread), returns status, headers, first chunks"""
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                   for name, value in headers]
+            return lambda data: response.setdefault('written', []).append(data)
+
+        result = self.wsgi_app(environ, start_response)
+        chunks, stream = self._next_chunks((result, iter(result)))
+        return response['status'], response['headers'], response.get('written', []) + chunks, stream
+
+    @classmethod
+    def _next_chunks(cls, stream):
+        """Up to CHUNK_BATCH_SIZE bytes of the body; stream is None once done"""
+        chunks = []
+        size = 0
+        try:
+            for chunk in stream[1]:
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= CHUNK_BATCH_SIZE:
+                    return chunks, stream
+        except BaseException:
+            cls._close(stream)
+            raise
+        cls._close(stream)
+        return chunks, None
+
+    @staticmethod
+    def _close(stream):
+        # WSGI apps release per-request resources in close()
+        close = getattr(stream[0], 'close', None)
+        if close is not None:
+            close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=self._in_flight, threads=self.threads,
+                        max_pending=self.max_pending)
+
+    def collect_metrics(self):
+        """In-flight and rejected request counts for /metrics"""
+        stats = self.stats()
+        return [('nsos_asgi_in_flight', 'gauge', 'ASGI requests running or waiting for a thread',
+                 [({}, stats['in_flight'])]),
+                ('nsos_asgi_rejected_total', 'counter', 'ASGI requests refused with 503 (ASGI_MAX_PENDING)',
+                 [({}, stats['rejected'])]),
+                ('nsos_asgi_too_large_total', 'counter', 'ASGI requests refused with 413 (MAX_CONTENT_LENGTH)',
+                 [({}, stats['too_large'])])]
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,151 @@
+# Buffered audit log writer
+# Queues AuditLog rows in memory and bulk-inserts them from a background thread
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+AUDIT_INSERT_SQL = """
+    INSERT INTO AuditLog (action, table_name, record_id, action_date)
+    VALUES (?, ?, ?, ?)
+"""
+
+
+class AuditBuffer:
+    """Bounded queue of audit rows flushed in batches with executemany
+
+    connection is a callable returning a context manager that yields a
+    database connection (e.g. ConnectionPool.connection). A batch that
+    fails to write is kept and tried again on the next flushes; after
+    max_attempts failures its rows are logged and given up.
+    """
+
+    def __init__(self, connection, max_queue=10000, batch_size=500, flush_interval=1.0, max_attempts=5):
+        self._connection = connection
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self._retry = []  # (rows, failed attempts) of batches whose write failed
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+
+        # Counters
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches = 0
+
+    def start(self):
+        """Start the background flusher and flush again on interpreter exit"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='audit-flusher', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def add(self, action, table_name, record_id, action_date):
+        """Queue one audit row, returns False if the queue is full"""
+        try:
+            self._queue.put_nowait((action, table_name, record_id, action_date))
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+        with self._stats_lock:
+            self.queued += 1
+        return True
+
+    def _drain(self):
+        rows = []
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def flush(self):
+        """Write everything queued so far, returns number of rows written
+
+        Stops at the first failed batch, which is kept for the next flush.
+        """
+        total = 0
+        with self._flush_lock:
+            while True:
+                if self._retry:
+                    rows, attempts = self._retry.pop(0)
+                else:
+                    rows, attempts = self._drain(), 0
+                if not rows:
+                    break
+                try:
+                    with self._connection() as conn:
+                        cursor = conn.cursor()
+                        if hasattr(cursor, 'fast_executemany'):
+                            cursor.fast_executemany = True  # pyodbc: send the batch in one go
+                        cursor.executemany(AUDIT_INSERT_SQL, rows)
+                        conn.commit()
+                        cursor.close()
+                except Exception as e:
+                    attempts += 1
+                    if attempts < self.max_attempts:
+                        log.warning("Audit flush error (%d rows kept, attempt %d of %d): %s",
+                                    len(rows), attempts, self.max_attempts, e)
+                        self._retry.append((rows, attempts))
+                        with self._stats_lock:
+                            self.retried += len(rows)
+                    else:
+                        self._give_up(rows, e)
+                    break
+                with self._stats_lock:
+                    self.written += len(rows)
+                    self.batches += 1
+                total += len(rows)
+        return total
+
+    def _give_up(self, rows, error):
+        # The rows go to the error log, so they can still be re-entered by hand
+        log.error("Audit flush error, %d rows lost: %s; rows: %r", len(rows), error, rows)
+        with self._stats_lock:
+            self.failed += len(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Wake up early when a full batch is waiting
+            deadline = time.monotonic() + self.flush_interval
+            while (self._queue.qsize() < self.batch_size and not self._stop.is_set()
+                   and time.monotonic() < deadline):
+                self._stop.wait(0.05)
+            self.flush()
+
+    def stop(self):
+        """Stop the flusher and write whatever is still queued"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+        with self._flush_lock:
+            for rows, attempts in self._retry:
+                self._give_up(rows, 'still failing at shutdown')
+            self._retry = []
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'pending': self._queue.qsize() + sum(len(rows) for rows, attempts in self._retry),
+                'capacity': self._queue.maxsize,
+                'queued': self.queued,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'retried': self.retried,
+                'batches': self.batches
+            }
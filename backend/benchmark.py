@@ -0,0 +1,387 @@
+# Load / latency benchmark for the REST API
+# Drives the routes blueprint in-process through Flask test clients (WSGI
+# mode) or through the ASGI adapter on an event loop (ASGI mode), one
+# thread per simulated client, and reports latency percentiles, throughput
+# and peak memory per endpoint. Results are saved as JSON so runs can be
+# compared against a baseline.
+
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import unquote
+
+from flask import Flask
+
+import database as db
+import logs
+import metrics
+import utils
+from asgi import ASGIAdapter
+from config import SECRET_KEY, ASGI_THREADS, ASGI_MAX_PENDING
+from routes import routes
+from synthetic import BENCH_ADMIN, BENCH_PASSWORD, sample_ids
+
+SEARCH_TERMS = ['theft', 'robbery', 'khan', 'ahmed', 'market', 'fraud', 'bank', 'lahore', 'FIR', 'malik']
+
+
+# Each scenario picks the next request for a client: (method, path, json body)
+def _cases_list(rng, sample):
+    return 'GET', '/api/cases?limit=50', None
+
+
+def _cases_filtered(rng, sample):
+    if rng.random() < 0.5:
+        return 'GET', f'/api/cases?limit=50&status={rng.choice(["Open", "Closed"])}', None
+    return 'GET', f'/api/cases?limit=50&filed_by={rng.choice(sample["Officer"])}', None
+
+
+def _case_detail(rng, sample):
+    return 'GET', f'/api/cases/{rng.choice(sample["Case"])}/full', None
+
+
+def _search(rng, sample):
+    return 'GET', f'/api/search?q={rng.choice(SEARCH_TERMS)}&limit=20', None
+
+
+def _lookup(rng, sample):
+    return 'GET', f'/api/lookup?cnic={rng.choice(sample["cnic"])[:9]}', None
+
+
+def _evidence_list(rng, sample):
+    if rng.random() < 0.5:
+        return 'GET', '/api/evidence?limit=50', None
+    return 'GET', f'/api/evidence?limit=50&case_id={rng.choice(sample["Case"])}', None
+
+
+def _duties_list(rng, sample):
+    return 'GET', '/api/duties?limit=50', None
+
+
+def _officers_list(rng, sample):
+    return 'GET', '/api/officers?limit=50', None
+
+
+def _login(rng, sample):
+    return 'POST', '/api/login', {'username': BENCH_ADMIN, 'password': BENCH_PASSWORD}
+
+
+SCENARIOS = {
+    'cases': _cases_list,
+    'cases_filtered': _cases_filtered,
+    'case_detail': _case_detail,
+    'search': _search,
+    'lookup': _lookup,
+    'evidence': _evidence_list,
+    'duties': _duties_list,
+    'officers': _officers_list,
+    'login': _login,
+}
+
+
+def create_app():
+    """Minimal app with the API blueprint and instrumentation (no static files / CORS)"""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = SECRET_KEY
+    app.register_blueprint(routes)
+    logs.init_app(app)
+    db.init_app(app)
+    metrics.init_app(app)
+    # The login scenario measures password checks, not the attempt limits
+    utils.login_throttle.enabled = False
+    return app
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def current_rss():
+    """Resident memory of this process in bytes (None where unsupported)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss():
+    """Peak resident memory of this process so far, in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RssSampler:
+    """Samples RSS in the background to get the peak during one scenario"""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            if rss is not None and rss > (self.peak or 0):
+                self.peak = rss
+
+    def __enter__(self):
+        if self.peak is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        if self.peak is None:
+            # No /proc: fall back to the process-wide high-water mark
+            self.peak = peak_rss()
+
+
+class _ASGIResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def get_data(self):
+        return self.body
+
+    @property
+    def json(self):
+        return json.loads(self.body)
+
+
+class _ASGIClient:
+    """Calls an ASGI app on an event loop thread, with test_client's open()"""
+
+    def __init__(self, asgi_app, loop):
+        self.asgi_app = asgi_app
+        self.loop = loop
+        self.token = None
+
+    def open(self, path, method='GET', json=None):
+        return asyncio.run_coroutine_threadsafe(self._request(method, path, json), self.loop).result()
+
+    def post(self, path, json=None):
+        return self.open(path, 'POST', json)
+
+    async def _request(self, method, path, body):
+        path, _, query = path.partition('?')
+        payload = json.dumps(body).encode('utf-8') if body is not None else b''
+        headers = [(b'host', b'localhost')]
+        if body is not None:
+            headers += [(b'content-type', b'application/json'), (b'content-length', str(len(payload)).encode())]
+        if self.token:
+            headers.append((b'authorization', f'Bearer {self.token}'.encode()))
+        scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+                 'scheme': 'http', 'path': unquote(path), 'raw_path': path.encode(),
+                 'query_string': query.encode(), 'root_path': '', 'headers': headers,
+                 'client': ('127.0.0.1', 0), 'server': ('localhost', 80)}
+        received = False
+        response = {'status': None, 'body': []}
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': payload, 'more_body': False}
+            await asyncio.Event().wait()  # the client never disconnects
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            else:
+                response['body'].append(message.get('body', b''))
+
+        await self.asgi_app(scope, receive, send)
+        return _ASGIResponse(response['status'], b''.join(response['body']))
+
+
+class _EventLoopThread:
+    """asyncio event loop running in a background thread"""
+
+    def __enter__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='bench-loop', daemon=True)
+        self._thread.start()
+        return self.loop
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+def _client(make_client):
+    client = make_client()
+    response = client.post('/api/login', json={'username': BENCH_ADMIN, 'password': BENCH_PASSWORD})
+    if response.status_code != 200:
+        raise RuntimeError(f'Benchmark login failed ({response.status_code}), run "run_benchmark.py generate" first')
+    if isinstance(client, _ASGIClient):
+        client.token = response.json['token']
+    return client
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def run_scenario(make_client, name, sample, clients=8, duration=10.0, requests=None, warmup=1.0, seed=1):
+    """Run one scenario with concurrent clients, returns its result dict
+
+    make_client() returns a new client with test_client's open() / post().
+
+    Each client sends requests back to back for duration seconds (or
+    until requests have been sent in total). The first warmup seconds are
+    not measured.
+    """
+    pick = SCENARIOS[name]
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+    statuses = [{} for _ in range(clients)]
+    sent = [0]
+    sent_lock = threading.Lock()
+    start_barrier = threading.Barrier(clients + 1)
+    times = {}
+
+    def worker(i):
+        rng = random.Random(seed * 1000 + i)
+        client = sessions[i]
+        start_barrier.wait()
+        measure_from = times['start'] + warmup
+        stop_at = measure_from + duration
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                break
+            if requests is not None and now >= measure_from:
+                with sent_lock:
+                    if sent[0] >= requests:
+                        break
+                    sent[0] += 1
+            method, path, body = pick(rng, sample)
+            started = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            response.get_data()
+            elapsed = time.perf_counter() - started
+            if started < measure_from:
+                continue
+            latencies[i].append(elapsed)
+            statuses[i][response.status_code] = statuses[i].get(response.status_code, 0) + 1
+            if response.status_code >= 400:
+                errors[i] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f'bench-{i}') for i in range(clients)]
+    with RssSampler() as rss:
+        sessions = [_client(make_client) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        times['start'] = time.perf_counter()
+        start_barrier.wait()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - times['start'] - warmup
+
+    all_latencies = sorted(value for values in latencies for value in values)
+    status_counts = {}
+    for counts in statuses:
+        for status, count in counts.items():
+            status_counts[str(status)] = status_counts.get(str(status), 0) + count
+    count = len(all_latencies)
+    return {
+        'requests': count,
+        'errors': sum(errors),
+        'status': status_counts,
+        'throughput': round(count / wall, 1) if wall > 0 else None,
+        'mean_ms': _ms(sum(all_latencies) / count) if count else None,
+        'p50_ms': _ms(percentile(all_latencies, 50)),
+        'p95_ms': _ms(percentile(all_latencies, 95)),
+        'p99_ms': _ms(percentile(all_latencies, 99)),
+        'max_ms': _ms(all_latencies[-1]) if count else None,
+        'peak_rss_mb': round(rss.peak / (1024 * 1024), 1) if rss.peak else None,
+    }
+
+
+def run(scenarios=None, clients=8, duration=10.0, requests=None, warmup=1.0, on_result=None, mode='wsgi'):
+    """Run scenarios one after another, returns the full report dict
+
+    mode 'wsgi' calls the app directly, 'asgi' through ASGIAdapter (the
+    same handlers on its thread pool). on_result(name, result) is called
+    after each scenario.
+    """
+    app = create_app()
+    sample = sample_ids()
+    if not sample['Case']:
+        raise RuntimeError('No cases in the database, run "run_benchmark.py generate" first')
+    results = {}
+    with contextlib.ExitStack() as stack:
+        if mode == 'asgi':
+            asgi_app = ASGIAdapter(app, ASGI_THREADS, ASGI_MAX_PENDING)
+            stack.callback(asgi_app.shutdown)
+            loop = stack.enter_context(_EventLoopThread())
+            make_client = lambda: _ASGIClient(asgi_app, loop)
+        else:
+            make_client = app.test_client
+        for name in scenarios or list(SCENARIOS):
+            results[name] = run_scenario(make_client, name, sample, clients, duration, requests, warmup)
+            if on_result:
+                on_result(name, results[name])
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'engine': db.get_engine().name,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'settings': {'clients': clients, 'duration': duration, 'requests': requests, 'warmup': warmup,
+                     'mode': mode},
+        'results': results,
+    }
+
+
+def save(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Metrics where a bigger number is a regression (throughput is the reverse)
+COMPARED_METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'throughput', 'peak_rss_mb')
+
+
+def compare(report, baseline, threshold=10.0):
+    """Per-scenario change against a baseline report
+
+    Returns a list of (scenario, metric, baseline, current, change_pct,
+    regressed) for scenarios present in both; regressed is True when the
+    metric got worse by more than threshold percent.
+    """
+    rows = []
+    for name, result in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if metric == 'throughput' else change
+            rows.append((name, metric, old, new, round(change, 1), worse > threshold))
+    return rows
@@ -0,0 +1,143 @@
+# Content-addressed file storage for evidence
+# Files are stored once under their SHA-256: blobs/ab/cd/abcd...
+
+import hashlib
+import os
+import re
+import shutil
+import uuid
+
+_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+# Bytes read per write when hashing a stream
+READ_SIZE = 64 * 1024
+
+
+def is_sha256(value):
+    return bool(value) and bool(_SHA256_RE.match(value))
+
+
+class BlobStore:
+    """Stores each distinct file content once, keyed by SHA-256
+
+    Reference counting lives in the database (Evidence rows with the same
+    sha256), the store only adds and removes blobs.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.tmp_folder = os.path.join(root, '.tmp')
+
+    def path_for(self, sha256):
+        """Sharded path for a hash (two directory levels)"""
+        if not is_sha256(sha256):
+            raise ValueError('Invalid SHA-256')
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256):
+        return is_sha256(sha256) and os.path.exists(self.path_for(sha256))
+
+    def size(self, sha256):
+        return os.path.getsize(self.path_for(sha256))
+
+    def put_file(self, src_path, sha256):
+        """Move a file with a known hash into the store
+
+        If the content is already stored the source is just deleted.
+        Returns True if a new blob was created.
+        """
+        dest = self.path_for(sha256)
+        if os.path.exists(dest):
+            os.remove(src_path)
+            return False
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(src_path, dest)
+        return True
+
+    # Storing a file for a new Evidence row is two steps: stage_*() before
+    # the insert, settle() after its commit. A delete() of the last row
+    # using the same content can run in between; the staged copy puts the
+    # blob back if that delete removed it.
+
+    def stage_file(self, src_path, sha256):
+        """Make the content available under its hash, keeping a private copy
+
+        The source is moved into the store's temp folder and hard linked
+        (or copied) to the blob path if that doesn't exist yet. Returns the
+        staged path for settle() / discard().
+        """
+        os.makedirs(self.tmp_folder, exist_ok=True)
+        staged = os.path.join(self.tmp_folder, uuid.uuid4().hex)
+        os.replace(src_path, staged)
+        dest = self.path_for(sha256)
+        if not os.path.exists(dest):
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            try:
+                os.link(staged, dest)
+            except FileExistsError:
+                pass
+            except OSError:
+                # No hard links on this file system: copy, then rename into place
+                copy = os.path.join(self.tmp_folder, uuid.uuid4().hex)
+                shutil.copyfile(staged, copy)
+                os.replace(copy, dest)
+        return staged
+
+    def stage_stream(self, stream):
+        """Hash a stream while writing it to a temp file, then stage it
+
+        Returns (staged path, sha256, size).
+        """
+        os.makedirs(self.tmp_folder, exist_ok=True)
+        tmp_path = os.path.join(self.tmp_folder, uuid.uuid4().hex)
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                while True:
+                    block = stream.read(READ_SIZE)
+                    if not block:
+                        break
+                    f.write(block)
+                    hasher.update(block)
+                    size += len(block)
+            sha256 = hasher.hexdigest()
+            return self.stage_file(tmp_path, sha256), sha256, size
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def settle(self, staged, sha256):
+        """Drop the staged copy once the row using it is committed
+
+        If the blob was deleted meanwhile, the staged copy becomes the blob.
+        """
+        self.put_file(staged, sha256)
+
+    def discard(self, staged):
+        """Drop a staged copy whose row was not inserted"""
+        if os.path.exists(staged):
+            os.remove(staged)
+
+    def delete(self, sha256, count_references=None):
+        """Remove a blob (call only when no Evidence row references it)
+
+        count_references(sha256) is asked again after the blob has been
+        moved aside: if a row using it was inserted meanwhile (or the count
+        fails), the blob is put back. An upload that committed after that
+        second count finds the blob missing in settle() and restores it.
+        Returns True if the blob was removed.
+        """
+        path = self.path_for(sha256)
+        os.makedirs(self.tmp_folder, exist_ok=True)
+        aside = os.path.join(self.tmp_folder, uuid.uuid4().hex)
+        try:
+            os.replace(path, aside)
+        except FileNotFoundError:
+            return False
+        if count_references is not None and count_references(sha256) != 0:
+            self.put_file(aside, sha256)
+            return False
+        os.remove(aside)
+        return True
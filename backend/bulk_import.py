@@ -0,0 +1,244 @@
+# Bulk import of officers, criminals, cases and duties
+# Streams CSV / NDJSON rows, validates them and inserts in chunked transactions
+
+import csv
+import io
+import json
+import time
+
+import database as db
+from pagination import parse_date, parse_time
+
+# Max per-row errors (and per-batch audit entries) kept in the result
+# (the CLI can stream all errors)
+MAX_ERRORS_KEPT = 1000
+
+
+def _text(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def _int(value):
+    value = _text(value)
+    return int(value) if value is not None else None
+
+
+# What each importable table looks like: columns in insert order,
+# required fields and a converter per column
+IMPORT_SPECS = {
+    'officers': {
+        'table': 'Officer',
+        'columns': ['name', 'address', 'badge_no', 'rank', 'contact', 'unit_id'],
+        'required': ['name', 'badge_no'],
+        'convert': {'unit_id': _int}
+    },
+    'criminals': {
+        'table': 'Criminal',
+        'columns': ['name', 'address', 'cnic', 'notes'],
+        'required': ['name', 'cnic'],
+        'convert': {}
+    },
+    'cases': {
+        'table': 'Case',
+        'sql_table': 'Case_table',
+        'columns': ['case_number', 'title', 'description', 'filed_date', 'filed_by', 'suspect_id', 'status'],
+        'required': ['case_number', 'title', 'filed_date', 'filed_by'],
+        'convert': {'filed_date': parse_date, 'filed_by': _int, 'suspect_id': _int},
+        'defaults': {'status': 'Open'}
+    },
+    'duties': {
+        'table': 'Duty',
+        'columns': ['officer_id', 'duty_date', 'duty_time', 'location'],
+        'required': ['officer_id', 'duty_date', 'duty_time', 'location'],
+        'convert': {'officer_id': _int, 'duty_date': parse_date, 'duty_time': parse_time}
+    }
+}
+
+
+def insert_sql(spec):
+    columns = spec['columns']
+    return (f"INSERT INTO {spec.get('sql_table', spec['table'])} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})")
+
+
+def read_rows(stream, fmt):
+    """Yield (line_no, row_dict or None, error) from a binary or text stream"""
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row, None
+    elif fmt == 'ndjson':
+        for line_no, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError('expected a JSON object')
+                yield line_no, row, None
+            except ValueError as e:
+                yield line_no, None, f'Invalid JSON: {e}'
+    else:
+        raise ValueError(f'Unknown format: {fmt}')
+
+
+def validate_row(spec, row):
+    """Turn one input row into an insert tuple, raises ValueError if invalid"""
+    values = []
+    defaults = spec.get('defaults', {})
+    for column in spec['columns']:
+        raw = row.get(column)
+        if _text(raw) is None:
+            raw = defaults.get(column)
+        if column in spec['required'] and _text(raw) is None:
+            raise ValueError(f'{column} is required')
+        convert = spec['convert'].get(column)
+        try:
+            value = convert(raw) if convert and _text(raw) is not None else _text(raw)
+        except (TypeError, ValueError):
+            raise ValueError(f'Invalid {column}: {raw!r}')
+        values.append(value)
+    return tuple(values)
+
+
+class ImportResult:
+    """Counters for one import run"""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.rows_read = 0
+        self.inserted = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors = []
+        self.audited = []  # one entry per batch's AuditLog row
+        self.started = time.monotonic()
+
+    def add_error(self, line_no, error, on_error=None):
+        self.failed += 1
+        if on_error:
+            on_error(line_no, error)
+        if len(self.errors) < MAX_ERRORS_KEPT:
+            self.errors.append({'line': line_no, 'error': error})
+
+    @property
+    def seconds(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rows_per_sec(self):
+        return self.rows_read / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'rows_read': self.rows_read,
+            'inserted': self.inserted,
+            'failed': self.failed,
+            'batches': self.batches,
+            'seconds': round(self.seconds, 3),
+            'rows_per_sec': round(self.rows_per_sec, 1),
+            'errors': self.errors,
+            'audited': self.audited
+        }
+
+
+def _insert_batch(spec, batch, result, on_error=None):
+    """Insert one batch in its own transaction with one audit row
+
+    batch is a list of (line_no, values). If the fast path fails (e.g. a
+    duplicate key) the batch is retried row by row so only bad rows fail.
+    The audit row's record_id is the batch's first inserted ID; the row
+    count and line range go to result.audited.
+    """
+    engine = db.get_engine()
+    conn = db.get_db_connection()
+    if not conn:
+        for line_no, values in batch:
+            result.add_error(line_no, 'No database connection', on_error)
+        return
+    sql = insert_sql(spec)
+    try:
+        cursor = conn.cursor()
+        try:
+            # The first row on its own, for its ID
+            cursor.execute(sql, batch[0][1])
+            first_id = engine.last_insert_id(cursor)
+            if len(batch) > 1:
+                if hasattr(cursor, 'fast_executemany'):
+                    cursor.fast_executemany = True  # pyodbc: send the batch in one go
+                cursor.executemany(sql, [values for line_no, values in batch[1:]])
+            inserted = len(batch)
+        except Exception:
+            conn.rollback()
+            cursor = conn.cursor()
+            first_id = None
+            inserted = 0
+            for line_no, values in batch:
+                try:
+                    cursor.execute(sql, values)
+                    if first_id is None:
+                        first_id = engine.last_insert_id(cursor)
+                    inserted += 1
+                except Exception as e:
+                    result.add_error(line_no, str(e), on_error)
+        if inserted:
+            # One summary entry per batch, under the first row it inserted
+            db.log_audit('BULK INSERT', spec['table'], first_id, cursor)
+        conn.commit()
+        if inserted:
+            db.audit_committed('BULK INSERT', spec['table'], first_id)
+            if len(result.audited) < MAX_ERRORS_KEPT:
+                result.audited.append({'record_id': first_id, 'inserted': inserted,
+                                       'first_line': batch[0][0], 'last_line': batch[-1][0]})
+        result.inserted += inserted
+        result.batches += 1
+        conn.close()
+    except Exception as e:
+        for line_no, values in batch:
+            result.add_error(line_no, f'Batch failed: {e}', on_error)
+        conn.close()
+
+
+def import_stream(kind, stream, fmt='csv', batch_size=1000, on_batch=None, on_error=None,
+                  background_refresh=True):
+    """Import rows of one kind from a stream, returns an ImportResult
+
+    on_batch(result) is called after every batch (progress reporting),
+    on_error(line_no, error) for every rejected row.
+    """
+    spec = IMPORT_SPECS[kind]
+    result = ImportResult(kind)
+    batch = []
+
+    for line_no, row, error in read_rows(stream, fmt):
+        result.rows_read += 1
+        if error is None:
+            try:
+                batch.append((line_no, validate_row(spec, row)))
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            result.add_error(line_no, error, on_error)
+        if len(batch) >= batch_size:
+            _insert_batch(spec, batch, result, on_error)
+            batch = []
+            if on_batch:
+                on_batch(result)
+
+    if batch:
+        _insert_batch(spec, batch, result, on_error)
+        if on_batch:
+            on_batch(result)
+
+    if result.inserted:
+        db.after_bulk_import(spec['table'], background=background_refresh)
+    return result
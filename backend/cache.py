@@ -0,0 +1,257 @@
+# Small caches with expiry and LRU eviction
+# Used for values that are expensive to compute but fine to serve slightly stale
+#
+# Two backends with the same interface:
+#   TTLCache    - in-process dict, fastest, private to one worker process
+#   SQLiteCache - SQLite file shared by all worker processes on one host
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class TTLCache:
+    """Thread-safe key/value cache where every entry expires after ttl seconds
+
+    With max_entries set the least recently used entry is evicted when the
+    cache is full.
+    """
+
+    def __init__(self, ttl=30, max_entries=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped on every invalidation
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._counters['misses'] += 1
+                return default
+            value, expires_at = item
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                self._counters['expirations'] += 1
+                self._counters['misses'] += 1
+                return default
+            self._data.move_to_end(key)
+            self._counters['hits'] += 1
+            return value
+
+    def _store(self, key, value, expires_at):
+        # Caller holds the lock
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        if self.max_entries:
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._store(key, value, expires_at)
+
+    def get_or_load(self, key, loader):
+        """Return cached value, calling loader() to fill it on a miss
+
+        The loaded value is not stored if an invalidation happened while
+        loading, so a write that commits mid-load can't leave stale data.
+        """
+        value = self.get(key)
+        if value is None:
+            generation = self._generation
+            value = loader()
+            if value is not None:
+                with self._lock:
+                    if generation == self._generation:
+                        self._store(key, value, time.monotonic() + self.ttl)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation += 1
+
+    def invalidate_prefix(self, prefix):
+        """Drop every key starting with prefix (e.g. all 'case:' entries)"""
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+            self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, backend='memory', entries=len(self._data),
+                        max_entries=self.max_entries, ttl=self.ttl)
+
+
+class SQLiteCache:
+    """Same interface as TTLCache, stored in a SQLite file
+
+    Every worker process opening the same file sees the same entries and
+    invalidations, so a write in one worker is not served stale by another.
+    Values must be JSON serializable. Hit/miss counters are per process.
+    """
+
+    def __init__(self, path, name, ttl=30, max_entries=None):
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        self._counter_lock = threading.Lock()
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cache_entry (
+                name TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (name, key)
+            );
+            CREATE INDEX IF NOT EXISTS ix_cache_entry_last_used ON cache_entry (name, last_used);
+            CREATE TABLE IF NOT EXISTS cache_generation (
+                name TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL
+            );
+        """)
+
+    def _conn(self):
+        # One connection per thread; WAL lets readers run while another process writes
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _count(self, counter, amount=1):
+        with self._counter_lock:
+            self._counters[counter] += amount
+
+    def _generation(self):
+        row = self._conn().execute(
+            "SELECT generation FROM cache_generation WHERE name = ?", (self.name,)).fetchone()
+        return row[0] if row else 0
+
+    def _bump_generation(self, conn):
+        conn.execute("""
+            INSERT INTO cache_generation (name, generation) VALUES (?, 1)
+            ON CONFLICT (name) DO UPDATE SET generation = generation + 1
+        """, (self.name,))
+
+    def get(self, key, default=None):
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires_at, last_used FROM cache_entry WHERE name = ? AND key = ?",
+                           (self.name, key)).fetchone()
+        # time.time(), not monotonic: expiry times are shared between processes
+        now = time.time()
+        if row is None:
+            self._count('misses')
+            return default
+        if now >= row[1]:
+            conn.execute("DELETE FROM cache_entry WHERE name = ? AND key = ?", (self.name, key))
+            self._count('expirations')
+            self._count('misses')
+            return default
+        if now - row[2] > 1.0:
+            # LRU order to the second is enough, and saves a write on most hits
+            conn.execute("UPDATE cache_entry SET last_used = ? WHERE name = ? AND key = ?",
+                         (now, self.name, key))
+        self._count('hits')
+        return json.loads(row[0])
+
+    def _store(self, conn, key, value, ttl):
+        now = time.time()
+        conn.execute("""
+            INSERT OR REPLACE INTO cache_entry (name, key, value, expires_at, last_used)
+            VALUES (?, ?, ?, ?, ?)
+        """, (self.name, key, json.dumps(value, default=str), now + ttl, now))
+        if self.max_entries:
+            evicted = conn.execute("""
+                DELETE FROM cache_entry WHERE name = ? AND key IN (
+                    SELECT key FROM cache_entry WHERE name = ?
+                    ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.name, self.name, self.max_entries)).rowcount
+            if evicted > 0:
+                self._count('evictions', evicted)
+
+    def set(self, key, value, ttl=None):
+        with self._transaction() as conn:
+            self._store(conn, key, value, self.ttl if ttl is None else ttl)
+
+    def get_or_load(self, key, loader):
+        """Return cached value, calling loader() to fill it on a miss
+
+        Like TTLCache, the value is dropped if any process invalidated this
+        cache while it was loading.
+        """
+        value = self.get(key)
+        if value is None:
+            generation = self._generation()
+            value = loader()
+            if value is not None:
+                with self._transaction() as conn:
+                    if generation == self._generation():
+                        self._store(conn, key, value, self.ttl)
+        return value
+
+    def invalidate(self, key):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM cache_entry WHERE name = ? AND key = ?", (self.name, key))
+            self._bump_generation(conn)
+
+    def invalidate_prefix(self, prefix):
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM cache_entry WHERE name = ? AND key LIKE ? ESCAPE '\\'",
+                         (self.name, escaped + '%'))
+            self._bump_generation(conn)
+
+    def clear(self):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM cache_entry WHERE name = ?", (self.name,))
+            self._bump_generation(conn)
+
+    def stats(self):
+        entries = self._conn().execute(
+            "SELECT COUNT(*) FROM cache_entry WHERE name = ?", (self.name,)).fetchone()[0]
+        with self._counter_lock:
+            return dict(self._counters, backend='sqlite', entries=entries,
+                        max_entries=self.max_entries, ttl=self.ttl)
+
+
+def create_cache(backend, name, ttl, max_entries=None, path=None):
+    """Build a cache for the configured backend ('memory' or 'sqlite')"""
+    if backend == 'sqlite':
+        return SQLiteCache(path, name, ttl, max_entries)
+    if backend != 'memory':
+        raise ValueError(f'Unknown cache backend: {backend}')
+    return TTLCache(ttl, max_entries)
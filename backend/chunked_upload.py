@@ -0,0 +1,202 @@
+# Chunked, resumable evidence uploads
+# init -> append chunks (at the current offset) -> finalize
+# Chunks are streamed to a temp file while a SHA-256 is computed
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+from werkzeug.utils import secure_filename
+
+# Bytes read from the request per write
+READ_SIZE = 64 * 1024
+
+
+class UploadNotFound(Exception):
+    """No upload session with this ID"""
+    pass
+
+
+class UploadOffsetMismatch(Exception):
+    """Chunk does not start where the file currently ends"""
+
+    def __init__(self, offset):
+        super().__init__(f'Upload is at offset {offset}')
+        self.offset = offset
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UploadManager:
+    """Keeps partial uploads under <upload_folder>/.partial
+
+    Hash state is kept in memory per upload. After a restart (or when a
+    different worker gets the next chunk) it is rebuilt from the bytes
+    already on disk, so uploads can always be resumed.
+    """
+
+    def __init__(self, upload_folder, max_size, session_ttl=86400, store=None):
+        self.upload_folder = upload_folder
+        self.store = store
+        self.partial_folder = os.path.join(upload_folder, '.partial')
+        self.max_size = max_size
+        self.session_ttl = session_ttl
+        self._hashes = {}  # upload_id -> (hasher, bytes hashed)
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    # Paths and metadata
+    def _part_path(self, upload_id):
+        return os.path.join(self.partial_folder, upload_id + '.part')
+
+    def _meta_path(self, upload_id):
+        return os.path.join(self.partial_folder, upload_id + '.json')
+
+    def _lock_for(self, upload_id):
+        with self._locks_lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _load_meta(self, upload_id):
+        # IDs are uuid4 hex, anything else can't be ours (and can't escape the folder)
+        try:
+            uuid.UUID(hex=upload_id)
+        except ValueError:
+            raise UploadNotFound(upload_id)
+        try:
+            with open(self._meta_path(upload_id), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadNotFound(upload_id)
+
+    def _forget(self, upload_id):
+        self._hashes.pop(upload_id, None)
+        with self._locks_lock:
+            self._locks.pop(upload_id, None)
+
+    # Protocol
+    def init(self, case_id, file_name, description='', total_size=None):
+        """Start an upload, returns its status dict"""
+        if total_size is not None and total_size > self.max_size:
+            raise UploadTooLarge(f'File is larger than {self.max_size} bytes')
+        os.makedirs(self.partial_folder, exist_ok=True)
+        self.cleanup()
+
+        upload_id = uuid.uuid4().hex
+        meta = {
+            'upload_id': upload_id,
+            'case_id': case_id,
+            'file_name': secure_filename(file_name),
+            'description': description,
+            'total_size': total_size,
+            'created': time.time()
+        }
+        open(self._part_path(upload_id), 'wb').close()
+        with open(self._meta_path(upload_id), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        self._hashes[upload_id] = (hashlib.sha256(), 0)
+        return self.status(upload_id)
+
+    def status(self, upload_id):
+        """Current offset of an upload (where the next chunk must start)"""
+        meta = self._load_meta(upload_id)
+        meta['offset'] = os.path.getsize(self._part_path(upload_id))
+        return meta
+
+    def _hasher(self, upload_id, size):
+        """Hash state covering the first size bytes of the partial file"""
+        hasher, hashed = self._hashes.get(upload_id, (None, 0))
+        if hasher is None or hashed > size:
+            hasher, hashed = hashlib.sha256(), 0
+        if hashed < size:
+            # Catch up on bytes written before a restart / by another worker
+            with open(self._part_path(upload_id), 'rb') as f:
+                f.seek(hashed)
+                while hashed < size:
+                    block = f.read(min(READ_SIZE, size - hashed))
+                    if not block:
+                        break
+                    hasher.update(block)
+                    hashed += len(block)
+        return hasher, hashed
+
+    def append(self, upload_id, offset, stream):
+        """Append a chunk read from stream, returns the new offset"""
+        self._load_meta(upload_id)
+        with self._lock_for(upload_id):
+            path = self._part_path(upload_id)
+            size = os.path.getsize(path)
+            if offset != size:
+                raise UploadOffsetMismatch(size)
+            hasher, hashed = self._hasher(upload_id, size)
+            try:
+                with open(path, 'ab') as f:
+                    while True:
+                        block = stream.read(READ_SIZE)
+                        if not block:
+                            break
+                        if hashed + len(block) > self.max_size:
+                            raise UploadTooLarge(f'File is larger than {self.max_size} bytes')
+                        f.write(block)
+                        hasher.update(block)
+                        hashed += len(block)
+            finally:
+                self._hashes[upload_id] = (hasher, hashed)
+            return hashed
+
+    def finalize(self, upload_id, expected_sha256=None):
+        """Check the hash and stage the file in the blob store
+
+        Returns (meta, sha256); meta['staged'] goes to store.settle() once
+        the Evidence row is committed, or to store.discard(). The partial
+        file is only renamed, never copied.
+        """
+        meta = self._load_meta(upload_id)
+        with self._lock_for(upload_id):
+            path = self._part_path(upload_id)
+            size = os.path.getsize(path)
+            if meta.get('total_size') is not None and size != meta['total_size']:
+                raise UploadOffsetMismatch(size)
+            hasher, hashed = self._hasher(upload_id, size)
+            digest = hasher.hexdigest()
+            if expected_sha256 and expected_sha256.lower() != digest:
+                raise ValueError('SHA-256 mismatch')
+
+            staged = self.store.stage_file(path, digest)
+            os.remove(self._meta_path(upload_id))
+        self._forget(upload_id)
+        meta['size'] = size
+        meta['staged'] = staged
+        return meta, digest
+
+    def abort(self, upload_id):
+        self._load_meta(upload_id)
+        with self._lock_for(upload_id):
+            for path in (self._part_path(upload_id), self._meta_path(upload_id)):
+                if os.path.exists(path):
+                    os.remove(path)
+        self._forget(upload_id)
+
+    def cleanup(self):
+        """Remove partial uploads that have not received a chunk for session_ttl"""
+        if not os.path.isdir(self.partial_folder):
+            return
+        cutoff = time.time() - self.session_ttl
+        for name in os.listdir(self.partial_folder):
+            upload_id, ext = os.path.splitext(name)
+            if ext != '.json':
+                continue
+            try:
+                part = self._part_path(upload_id)
+                last_write = os.path.getmtime(part) if os.path.exists(part) else 0
+                if last_write < cutoff:
+                    for path in (part, self._meta_path(upload_id)):
+                        if os.path.exists(path):
+                            os.remove(path)
+                    self._forget(upload_id)
+            except OSError:
+                pass
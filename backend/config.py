@@ -16,9 +16,136 @@ def get_connection_string():
     Trusted_Connection=yes;
     """
 
+# Connection pool settings
+DB_POOL_MIN_SIZE = 2
+DB_POOL_MAX_SIZE = 20
+DB_POOL_IDLE_TIMEOUT = 300  # seconds before an idle connection is closed
+DB_POOL_CHECKOUT_TIMEOUT = 10  # seconds to wait for a free connection
+DB_POOL_PING_INTERVAL = 30  # ping connections idle longer than this before reuse
+
+# Audit log settings
+# Buffered mode queues audit rows and writes them in batches from a
+# background thread instead of inside each write transaction
+AUDIT_BUFFERED = False
+AUDIT_QUEUE_SIZE = 10000
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_INTERVAL = 1.0  # seconds
+AUDIT_FLUSH_ATTEMPTS = 5  # failed writes of a batch before its rows are logged and dropped
+
+# Dashboard stats are cached for this many seconds (writes clear it sooner)
+STATS_CACHE_TTL = 30
+
+# Table versions behind the API's ETags are re-read from AuditLog after
+# this many seconds (how long another worker's write can go unnoticed)
+TABLE_VERSION_TTL = 1
+
+# Reference data cache (units, officer lists, officer / criminal / case by ID)
+# Writes drop the affected entries; the TTL bounds staleness otherwise
+REFERENCE_CACHE_TTL = 300
+REFERENCE_CACHE_MAX_ENTRIES = 5000  # least recently used entries are evicted
+
+# List API page sizes
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+OPTIONS_LIMIT = 50  # rows a case / criminal picker gets per query
+
 # Flask settings
 SECRET_KEY = 'nsos-secret-key-2025'  # Change in production
 import os
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
 MAX_UPLOAD_SIZE = 16 * 1024 * 1024  # 16MB max file size
 
+# Chunked evidence uploads (large files are sent in pieces of at most
+# MAX_UPLOAD_SIZE and can be resumed)
+MAX_EVIDENCE_SIZE = 10 * 1024 * 1024 * 1024  # 10GB max per file
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # suggested chunk size for clients
+UPLOAD_SESSION_TTL = 86400  # unfinished uploads are removed after 24 hours idle
+
+# Full-text search index (SQLite file next to the project)
+SEARCH_INDEX_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'search_index.db')
+SEARCH_PAGE_SIZE = 50
+
+# Database engine: 'mssql' (SQL Server above) or 'sqlite' (embedded file,
+# no ODBC driver needed - local runs, benchmarks, single-station installs)
+DB_ENGINE = 'mssql'
+SQLITE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'nsos.db')
+
+# Reference cache backend: 'memory' (per process) or 'sqlite' (one file
+# shared by all worker processes on this host)
+CACHE_BACKEND = 'memory'
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cache.db')
+
+# CNIC / badge lookup indexes are reloaded from the database after this
+# many seconds (picks up writes made by other worker processes)
+LOOKUP_INDEX_REFRESH = 300
+
+
+# Evidence downloads
+# Content-addressed files never change, so browsers may cache them for a year
+EVIDENCE_CACHE_MAX_AGE = 365 * 24 * 3600
+# Let a front proxy send the file: None, 'x-sendfile' (Apache/lighttpd)
+# or 'x-accel-redirect' (nginx, with an internal location for the prefix
+# below that points at UPLOAD_FOLDER)
+EVIDENCE_SENDFILE = None
+EVIDENCE_ACCEL_PREFIX = '/_evidence/'
+
+# Evidence previews (thumbnails of images, first page of PDFs)
+PREVIEW_WORKERS = 2  # worker processes
+PREVIEW_MAX_PENDING = 100  # jobs queued or running before new ones are skipped
+PREVIEW_SIZE = (320, 320)  # max width, height in pixels
+
+# Instrumentation
+SLOW_QUERY_SECONDS = 0.5  # queries at least this slow are logged with their function (None: off)
+METRICS_PATH = '/metrics'  # Prometheus-style metrics endpoint (None: off)
+# Sampling profiler: requests at least this many seconds slow get their
+# stacks written to PROFILE_DIR as folded stacks for flame graphs (None: off)
+PROFILE_SLOW_REQUESTS = None
+PROFILE_INTERVAL = 0.005  # seconds between stack samples
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'profiles')
+
+# ASGI serving (app:asgi_app, see asgi.py)
+# Handlers run on ASGI_THREADS threads; more threads than pooled
+# connections would only wait for a connection
+ASGI_THREADS = DB_POOL_MAX_SIZE
+ASGI_MAX_PENDING = 2000  # requests in flight per process before new ones get 503
+
+# Production server (python serve.py, see prefork.py)
+# Each worker process has its own DB pool of up to DB_POOL_MAX_SIZE
+# connections, so the database sees up to SERVER_WORKERS times that
+SERVER_BIND = '0.0.0.0:5000'
+SERVER_WORKERS = min(os.cpu_count() or 1, 4)
+SERVER_THREADS = DB_POOL_MAX_SIZE  # request threads per worker
+SERVER_MAX_REQUESTS = 10000  # a worker is replaced after this many requests (0: never)
+SERVER_MAX_REQUESTS_JITTER = 1000  # random extra requests, so workers don't restart together
+SERVER_GRACEFUL_TIMEOUT = 30  # seconds a stopping worker may finish its requests
+SERVER_PRELOAD = True  # import the app and fill caches once, before forking the workers
+HEALTH_LIVE_PATH = '/livez'
+HEALTH_READY_PATH = '/readyz'
+HEALTH_CHECK_TIMEOUT = 2  # seconds readiness waits for a pooled connection
+
+# Passwords and login
+BCRYPT_ROUNDS = 12  # cost of new hashes; older hashes are rehashed at next login
+PASSWORD_HASH_WORKERS = 2  # processes checking passwords (0: on the request thread)
+PASSWORD_MAX_PENDING = 32  # queued checks before logins get 503 Retry-After
+# Login attempts: a burst, then this many per minute (per username / per client IP)
+LOGIN_USER_BURST = 5
+LOGIN_USER_PER_MINUTE = 5
+LOGIN_IP_BURST = 30  # a whole station may log in from one address at shift change
+LOGIN_IP_PER_MINUTE = 60
+
+# Session tokens (HMAC-signed, see tokens.py)
+# To rotate the key: add a new version to TOKEN_KEYS and make it
+# TOKEN_KEY_VERSION; remove the old one after TOKEN_TTL has passed
+TOKEN_KEYS = {1: SECRET_KEY}
+TOKEN_KEY_VERSION = 1  # signs new tokens
+TOKEN_TTL = 86400  # seconds a token is valid (24 hours, like the session cookie)
+TOKEN_REVOCATION_REFRESH = 5  # seconds between reads of other workers' logouts
+
+# Logging (records are queued and written by a background thread)
+LOG_LEVEL = 'INFO'
+LOG_LEVELS = {}  # per-module overrides, e.g. {'routes': 'DEBUG', 'database': 'WARNING'}
+LOG_FORMAT = 'json'  # 'json' (one object per line) or 'text'
+LOG_FILE = None  # None: stderr
+LOG_QUEUE_SIZE = 10000  # records waiting to be written; more are dropped
+LOG_DEBUG_RATE = 20  # DEBUG records per second per module (None: no limit)
+LOG_DEBUG_SAMPLE = 1.0  # fraction of DEBUG records kept
@@ -1,40 +1,575 @@
 # Database connection and CRUD operations
-# Using pyodbc for SQL Server
+# SQL Server (pyodbc) or SQLite depending on DB_ENGINE (see storage.py),
+# connections come from a pool (see pool.py)
+
+import threading
+from flask import g, has_app_context, current_app
+from config import (get_connection_string, DB_ENGINE, SQLITE_PATH, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE,
+                    DB_POOL_IDLE_TIMEOUT, DB_POOL_CHECKOUT_TIMEOUT, DB_POOL_PING_INTERVAL,
+                    AUDIT_BUFFERED, AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL, AUDIT_FLUSH_ATTEMPTS,
+                    STATS_CACHE_TTL, TABLE_VERSION_TTL, REFERENCE_CACHE_TTL, REFERENCE_CACHE_MAX_ENTRIES,
+                    CACHE_BACKEND, CACHE_PATH, SEARCH_INDEX_PATH, LOOKUP_INDEX_REFRESH,
+                    TOKEN_REVOCATION_REFRESH)
+from pool import ConnectionPool, BorrowedConnection
+from storage import create_engine
+import metrics
+from audit import AuditBuffer, AUDIT_INSERT_SQL
+from cache import TTLCache, create_cache
+from search import SearchIndex
+from lookup import PrefixIndex, normalize_cnic, normalize_badge
+from pagination import keyset_condition, parse_datetime, parse_date, parse_time
+from tokens import RevocationList
+from datetime import datetime, timedelta
+import logging
+
+log = logging.getLogger(__name__)
+
+
+# SQL dialect and connection factory for the configured database
+_engine = create_engine(DB_ENGINE, get_connection_string(), SQLITE_PATH)
+
+# Query timings are tagged with the function here, not the engine helper
+metrics.add_plumbing_file(create_engine.__code__.co_filename)
+
+
+def get_engine():
+    return _engine
+
+
+# Connection pool (created on first use)
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Get the shared connection pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    metrics.instrument_connect(_engine.connect),
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    idle_timeout=DB_POOL_IDLE_TIMEOUT,
+                    checkout_timeout=DB_POOL_CHECKOUT_TIMEOUT,
+                    ping_interval=DB_POOL_PING_INTERVAL
+                )
+    return _pool
+
+
+def get_pool_stats():
+    """Get connection pool stats (in use, idle, wait times)"""
+    return get_pool().stats()
+
+
+def close_pool():
+    """Close the pool's connections, the next get_pool() starts a new pool
+
+    Worker processes must not share connections with the process they
+    were forked from, so a preloading parent calls this before forking.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close_all()
+
+
+def check_database(timeout=2):
+    """Check out a pooled connection and run SELECT 1, returns (ok, error message)"""
+    try:
+        with get_pool().connection(timeout) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def init_app(app):
+    """Check out one pooled connection per request and release it at teardown"""
+    app.extensions['nsos_db'] = True
+    app.teardown_appcontext(release_request_connection)
 
-import pyodbc
-from config import get_connection_string
-from datetime import datetime
+
+def release_request_connection(exception=None):
+    """Return the current request's connection to the pool"""
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        conn.close()
 
 
 def get_db_connection():
-    """Get database connection using pyodbc"""
+    """Get database connection from the pool
+
+    Inside a Flask request every call shares the request's connection,
+    calling close() on it only rolls back uncommitted work.
+    """
     try:
-        conn = pyodbc.connect(get_connection_string())
-        return conn
+        if has_app_context() and 'nsos_db' in current_app.extensions:
+            conn = g.get('_db_conn')
+            if conn is None:
+                with metrics.DB_SECONDS.time('checkout', 'pool'):
+                    conn = get_pool().acquire()
+                g._db_conn = conn
+            return BorrowedConnection(conn)
+        with metrics.DB_SECONDS.time('checkout', 'pool'):
+            return get_pool().acquire()
     except Exception as e:
-        print(f"Database connection error: {e}")
+        log.error("Database connection error: %s", e)
+        return None
+
+
+def _iter_query(sql, params, to_dict, batch_size=1000):
+    """Run a query and yield rows as dicts, fetching batch_size rows per round trip
+
+    Memory stays flat no matter how many rows match.
+    """
+    conn = get_db_connection()
+    if not conn:
+        return
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield to_dict(row)
+        cursor.close()
+    finally:
+        conn.close()
+
+
+# Keyset pagination keys: (field, converter) matching each list query's ORDER BY
+OFFICER_PAGE_KEY = (('officer_id', int),)
+CRIMINAL_PAGE_KEY = (('criminal_id', int),)
+CASE_PAGE_KEY = (('case_id', int),)
+EVIDENCE_PAGE_KEY = (('upload_date', parse_datetime), ('evidence_id', int))
+DUTY_PAGE_KEY = (('duty_date', parse_date), ('duty_time', parse_time), ('duty_id', int))
+AUDIT_PAGE_KEY = (('action_date', parse_datetime), ('log_id', int))
+CASE_UPDATE_PAGE_KEY = (('update_date', parse_datetime), ('update_id', int))
+
+
+def _build_list_query(select, conditions, params, order_by, limit=None):
+    """Add WHERE, ORDER BY and the row limit to a list query, returns (sql, params)"""
+    sql = select
+    if conditions:
+        sql += "\nWHERE " + " AND ".join(conditions)
+    sql += "\nORDER BY " + order_by
+    if limit:
+        return _engine.limit(sql, params, limit)
+    return sql, params
+
+
+# Cached dashboard statistics
+_stats_cache = TTLCache(ttl=STATS_CACHE_TTL)
+
+# Reference data and single-row lookups (units, officer lists, officer /
+# criminal / case by ID). Entries are dropped by the write functions through
+# _after_write; the TTL only bounds staleness from writes made elsewhere.
+_reference_cache = create_cache(CACHE_BACKEND, 'reference', REFERENCE_CACHE_TTL,
+                                REFERENCE_CACHE_MAX_ENTRIES, CACHE_PATH)
+
+# Cache keys each table's writes make stale. Case rows embed officer and
+# suspect names, officer rows embed the unit name.
+_REFERENCE_INVALIDATION = {
+    'Unit': ['units', 'officers:', 'officer:'],
+    'Officer': ['officers:', 'officer_options', 'case:'],
+    'Criminal': ['case:', 'criminal_options:'],
+    'Case': ['case_options:']
+}
+_REFERENCE_ROW_KEYS = {'Officer': 'officer', 'Criminal': 'criminal', 'Case': 'case'}
+
+
+def _invalidate_reference(table_name, record_id=None):
+    """Drop cached reference data made stale by a write to table_name"""
+    try:
+        prefix = _REFERENCE_ROW_KEYS.get(table_name)
+        if prefix:
+            if record_id is None:
+                _reference_cache.invalidate_prefix(prefix + ':')
+            else:
+                _reference_cache.invalidate(f'{prefix}:{record_id}')
+        for key in _REFERENCE_INVALIDATION.get(table_name, []):
+            if key.endswith(':'):
+                _reference_cache.invalidate_prefix(key)
+            else:
+                _reference_cache.invalidate(key)
+    except Exception as e:
+        # A cache failure must never fail the write; the TTL bounds staleness
+        log.error("Cache invalidation error: %s", e)
+
+
+# Per-table version tokens for HTTP ETags. Every write leaves an AuditLog
+# row, so MAX(log_id) per table changes whenever the table does. Writes in
+# this process also bump a local counter so they show up immediately (the
+# audit row may still be queued in buffered mode).
+_version_cache = TTLCache(ttl=TABLE_VERSION_TTL)
+_local_versions = {}
+_local_versions_lock = threading.Lock()
+
+
+def _bump_table_version(table_name):
+    with _local_versions_lock:
+        _local_versions[table_name] = _local_versions.get(table_name, 0) + 1
+    _version_cache.clear()
+
+
+# Tables that have version tokens (AuditLog.table_name values)
+VERSIONED_TABLES = ('Officer', 'Criminal', 'Case', 'CaseUpdate', 'Evidence', 'Duty', 'Unit')
+
+
+def _load_table_versions():
+    conn = get_db_connection()
+    if not conn:
         return None
+    try:
+        cursor = conn.cursor()
+        # Newest audit row per table: one index seek each on IX_AuditLog_table_log
+        statements = [("""
+            SELECT log_id, action_date FROM AuditLog
+            WHERE log_id = (SELECT MAX(log_id) FROM AuditLog WHERE table_name = ?)""", [table])
+            for table in VERSIONED_TABLES]
+        results = _engine.run_batch(cursor, statements)
+        versions = {}
+        for table, rows in zip(VERSIONED_TABLES, results):
+            versions[table] = (rows[0][0], rows[0][1]) if rows else (0, None)
+        conn.close()
+        return versions
+    except Exception as e:
+        log.error("Error getting table versions: %s", e)
+        if conn:
+            conn.close()
+    return None
+
+
+def get_table_versions(tables):
+    """Version token and last change time for a set of tables
+
+    Returns (token, last_modified); token is None if versions can't be read
+    (callers then skip conditional handling). Cached for TABLE_VERSION_TTL
+    seconds, which bounds how long writes from other processes go unseen.
+    """
+    versions = _version_cache.get_or_load('versions', _load_table_versions)
+    if versions is None:
+        return None, None
+    parts = []
+    last_modified = None
+    with _local_versions_lock:
+        for table in sorted(tables):
+            log_id, changed = versions.get(table, (0, None))
+            parts.append(f'{table}:{log_id}.{_local_versions.get(table, 0)}')
+            if changed and (last_modified is None or changed > last_modified):
+                last_modified = changed
+    return ','.join(parts), last_modified
+
+
+def get_cache_stats():
+    """Hit / miss / eviction counters of the caches"""
+    return {
+        'reference': _reference_cache.stats(),
+        'stats': _stats_cache.stats(),
+        'table_versions': _version_cache.stats()
+    }
+
+
+def _collect_metrics():
+    """Pool and cache counters for /metrics"""
+    families = []
+    if _pool is not None:
+        pool = _pool.stats()
+        families.append(('nsos_db_pool_connections', 'gauge', 'Pooled connections by state',
+                         [({'state': 'in_use'}, pool['in_use']), ({'state': 'idle'}, pool['idle'])]))
+        families.append(('nsos_db_pool_checkouts_total', 'counter', 'Connections checked out',
+                         [({}, pool['checkouts'])]))
+        families.append(('nsos_db_pool_timeouts_total', 'counter', 'Checkouts that timed out',
+                         [({}, pool['timeouts'])]))
+    caches = get_cache_stats()
+    for counter in ('hits', 'misses', 'evictions'):
+        families.append((f'nsos_cache_{counter}_total', 'counter', f'Cache {counter}',
+                         [({'cache': name}, stats[counter]) for name, stats in caches.items()]))
+    return families
+
+
+metrics.REGISTRY.register_collector(_collect_metrics)
+
+
+def _after_write(action, table_name, record_id):
+    """Called after a write commits - queues its audit row (buffered mode), drops stale cached data"""
+    audit_committed(action, table_name, record_id)
+    _stats_cache.clear()
+    _invalidate_reference(table_name, record_id)
+    _bump_table_version(table_name)
+
+
+# Full-text search index (SQLite FTS5 sidecar, see search.py)
+_search_index = None
+_search_lock = threading.Lock()
+
+
+def get_search_index():
+    """Get the search index, opening it on first use"""
+    global _search_index
+    if _search_index is None:
+        with _search_lock:
+            if _search_index is None:
+                _search_index = SearchIndex(SEARCH_INDEX_PATH)
+    return _search_index
+
+
+def _update_search(method, *args):
+    """Apply one change to the search index (a failure never fails the write)"""
+    try:
+        index = get_search_index()
+        if index.available:
+            getattr(index, method)(*args)
+    except Exception as e:
+        log.error("Search index error: %s", e)
+
+
+def rebuild_search_index(batch_size=5000):
+    """Rebuild the search index from the database"""
+    index = get_search_index()
+    if not index.available:
+        return False
+    conn = get_db_connection()
+    if not conn:
+        return False
+    try:
+        cursor = conn.cursor()
+        index.clear()
+        for sql, add in (
+            ("SELECT officer_id, name FROM Officer", index.add_officers),
+            ("SELECT case_id, case_number, title, description, filed_by FROM Case_table", index.add_cases),
+            ("SELECT case_id, update_text FROM CaseUpdate ORDER BY update_id", index.add_case_updates),
+            ("SELECT criminal_id, name, cnic, notes FROM Criminal", index.add_criminals),
+        ):
+            cursor.execute(sql)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                add([tuple(row) for row in rows])
+        index.mark_built()
+        conn.close()
+        return True
+    except Exception as e:
+        log.error("Error rebuilding search index: %s", e)
+        if conn:
+            conn.close()
+    return False
+
+
+_search_rebuild_thread = None
+
+
+def ensure_search_index():
+    """Build the search index in the background if it was never built"""
+    global _search_rebuild_thread
+    index = get_search_index()
+    if index.available and not index.is_built():
+        _search_rebuild_thread = threading.Thread(target=rebuild_search_index, name='search-rebuild',
+                                                  daemon=True)
+        _search_rebuild_thread.start()
+
+
+def _use_search_index():
+    try:
+        index = get_search_index()
+        return index.available and index.is_built()
+    except Exception as e:
+        log.error("Search index error: %s", e)
+        return False
+
+
+# CNIC / badge number lookup indexes (see lookup.py)
+_cnic_index = PrefixIndex(normalize_cnic)
+_badge_index = PrefixIndex(normalize_badge)
+
+
+def _criminal_lookup_payload(criminal_id, name, cnic):
+    return {'criminal_id': criminal_id, 'name': name, 'cnic': cnic}
+
+
+def _officer_lookup_payload(officer_id, name, badge_no, rank):
+    return {'officer_id': officer_id, 'name': name, 'badge_no': badge_no, 'rank': rank}
+
 
+def _load_lookup_index(index, sql, make_row):
+    """(Re)load a lookup index from the database when it is missing or old
+
+    Other workers' writes only show up here on reload, hence the refresh age.
+    """
+    if not index.is_stale(LOOKUP_INDEX_REFRESH):
+        return
+    # Until the first load is done every lookup waits for it; later
+    # reloads are done by one thread while the others use the old index
+    if not index.load_lock.acquire(blocking=not index.loaded):
+        return
+    try:
+        if not index.is_stale(LOOKUP_INDEX_REFRESH):
+            return  # another thread just loaded it
+        conn = get_db_connection()
+        if not conn:
+            return
+        index.begin_load()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            rows = []
+            while True:
+                batch = cursor.fetchmany(5000)
+                if not batch:
+                    break
+                rows.extend(make_row(row) for row in batch)
+            conn.close()
+            index.load(rows)
+        except Exception as e:
+            index.abort_load()
+            log.error("Error loading lookup index: %s", e)
+            if conn:
+                conn.close()
+    finally:
+        index.load_lock.release()
+
+
+def _load_cnic_index():
+    _load_lookup_index(_cnic_index, "SELECT criminal_id, name, cnic FROM Criminal",
+                       lambda r: (r[0], r[2], _criminal_lookup_payload(r[0], r[1], r[2])))
+
+
+def _load_badge_index():
+    _load_lookup_index(_badge_index, "SELECT officer_id, name, badge_no, rank FROM Officer",
+                       lambda r: (r[0], r[2], _officer_lookup_payload(r[0], r[1], r[2], r[3])))
+
+
+def lookup_cnic(cnic, limit=20):
+    """Find criminals by full or partial CNIC (dashes and spaces ignored)"""
+    _load_cnic_index()
+    return {'exact': _cnic_index.exact(cnic), 'matches': _cnic_index.prefix(cnic, limit)}
+
+
+def lookup_badge(badge_no, limit=20):
+    """Find officers by full or partial badge number"""
+    _load_badge_index()
+    return {'exact': _badge_index.exact(badge_no), 'matches': _badge_index.prefix(badge_no, limit)}
+
+
+def preload():
+    """Load the caches worth sharing between forked worker processes
+
+    Lookup indexes, units, officer options and revoked tokens; read-only
+    after the fork, so their memory pages stay shared (copy-on-write).
+    Also waits for a search index build started by ensure_search_index():
+    forked during the build, workers would inherit its locks held.
+    """
+    if _search_rebuild_thread is not None:
+        _search_rebuild_thread.join()
+    _load_cnic_index()
+    _load_badge_index()
+    get_all_units()
+    get_officer_options()
+    load_revoked_tokens()
+
+
+def after_bulk_import(table_name, background=True, rebuild_search=True):
+    """Refresh derived data after rows were inserted without going through the CRUD functions
+
+    Pass rebuild_search=False when importing several tables and call
+    rebuild_search_index() once at the end.
+    """
+    _stats_cache.clear()
+    _invalidate_reference(table_name)
+    _bump_table_version(table_name)
+    if table_name == 'Officer':
+        _badge_index.invalidate()
+    elif table_name == 'Criminal':
+        _cnic_index.invalidate()
+    if rebuild_search and table_name in ('Officer', 'Criminal', 'Case'):
+        if background:
+            threading.Thread(target=rebuild_search_index, name='search-rebuild', daemon=True).start()
+        else:
+            rebuild_search_index()
+
+
+# Audit buffer (only used when AUDIT_BUFFERED is on)
+_audit_buffer = None
+_audit_lock = threading.Lock()
+
+
+def get_audit_buffer():
+    """Get the background audit writer, starting it on first use"""
+    global _audit_buffer
+    if _audit_buffer is None:
+        with _audit_lock:
+            if _audit_buffer is None:
+                buffer = AuditBuffer(lambda: get_pool().connection(),
+                                     max_queue=AUDIT_QUEUE_SIZE,
+                                     batch_size=AUDIT_BATCH_SIZE,
+                                     flush_interval=AUDIT_FLUSH_INTERVAL,
+                                     max_attempts=AUDIT_FLUSH_ATTEMPTS)
+                buffer.start()
+                _audit_buffer = buffer
+    return _audit_buffer
+
+
+def get_audit_stats():
+    """Get audit writer stats (mode, queue depth, dropped rows)"""
+    stats = {'buffered': AUDIT_BUFFERED}
+    if _audit_buffer is not None:
+        stats.update(_audit_buffer.stats())
+    return stats
+
+
+def flush_audit():
+    """Write any queued audit rows now (call on shutdown)"""
+    if _audit_buffer is not None:
+        return _audit_buffer.flush()
+    return 0
+
+
+def log_audit(action, table_name, record_id, cursor=None):
+    """Log action to audit log table
+
+    Pass the caller's cursor so the audit row is committed together with
+    the data change. In buffered mode the row is queued instead: for a
+    cursor only after the commit, by audit_committed(), so a rolled back
+    change leaves no audit row.
+    """
+    if AUDIT_BUFFERED:
+        if cursor is None:
+            get_audit_buffer().add(action, table_name, record_id, datetime.now())
+        return
+
+    if cursor is not None:
+        cursor.execute(AUDIT_INSERT_SQL, (action, table_name, record_id, datetime.now()))
+        return
 
-def log_audit(action, table_name, record_id):
-    """Log action to audit log table"""
     conn = get_db_connection()
     if conn:
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO AuditLog (action, table_name, record_id, action_date)
-                VALUES (?, ?, ?, ?)
-            """, (action, table_name, record_id, datetime.now()))
+            cursor.execute(AUDIT_INSERT_SQL, (action, table_name, record_id, datetime.now()))
             conn.commit()
             cursor.close()
             conn.close()
         except Exception as e:
-            print(f"Audit log error: {e}")
+            log.error("Audit log error: %s", e)
             if conn:
                 conn.close()
 
 
+def audit_committed(action, table_name, record_id):
+    """Queue the audit row of a committed change (buffered mode, else a no-op)"""
+    if AUDIT_BUFFERED:
+        get_audit_buffer().add(action, table_name, record_id, datetime.now())
+
+
 # Admin CRUD
 def get_admin_by_username(username):
     """Get admin by username"""
@@ -48,27 +583,125 @@ def get_admin_by_username(username):
             if row:
                 return {'admin_id': row[0], 'username': row[1], 'password_hash': row[2]}
         except Exception as e:
-            print(f"Error getting admin: {e}")
+            log.error("Error getting admin: %s", e)
             if conn:
                 conn.close()
     return None
 
 
-# Officer CRUD operations
-def get_all_officers():
-    """Get all officers"""
+def update_admin_password(admin_id, password_hash):
+    """Replace an admin's password hash"""
     conn = get_db_connection()
-    officers = []
     if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE Admin SET password_hash = ? WHERE admin_id = ?", (password_hash, admin_id))
+            log_audit('UPDATE', 'Admin', admin_id, cursor)
+            conn.commit()
+            audit_committed('UPDATE', 'Admin', admin_id)
+            conn.close()
+            return True
+        except Exception as e:
+            log.error("Error updating admin password: %s", e)
+            if conn:
+                conn.close()
+    return False
+
+
+# Revoked session tokens (see tokens.py), kept in memory so checking a
+# token needs no query. Other workers' revocations are read every
+# TOKEN_REVOCATION_REFRESH seconds.
+_revoked_tokens = RevocationList()
+_revoked_load_lock = threading.Lock()
+
+
+def load_revoked_tokens():
+    """Read revocations newer than the last one seen (all unexpired ones the first time)"""
+    # Until the first load is done every check waits for it; later
+    # refreshes are done by one thread while the others use the old set
+    if not _revoked_load_lock.acquire(blocking=not _revoked_tokens.loaded):
+        return
+    try:
+        if _revoked_tokens.loaded and not _revoked_tokens.is_stale(TOKEN_REVOCATION_REFRESH):
+            return  # another thread just read them
+        conn = get_db_connection()
+        if not conn:
+            return
         try:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT o.officer_id, o.name, o.address, o.badge_no, o.rank, o.contact, o.unit_id, u.unit_name
-                FROM Officer o
-                LEFT JOIN Unit u ON o.unit_id = u.unit_id
-                ORDER BY o.officer_id
-            """)
-            for row in cursor.fetchall():
+                SELECT revocation_id, token_id, expires_at FROM RevokedToken
+                WHERE revocation_id > ? AND expires_at > ?
+                ORDER BY revocation_id
+            """, (_revoked_tokens.last_id, datetime.now()))
+            for revocation_id, token_id, expires_at in cursor.fetchall():
+                _revoked_tokens.add(token_id, expires_at.timestamp(), revocation_id)
+            _revoked_tokens.mark_loaded()
+            conn.close()
+        except Exception as e:
+            log.error("Error loading revoked tokens: %s", e)
+            if conn:
+                conn.close()
+    finally:
+        _revoked_load_lock.release()
+
+
+def is_token_revoked(token_id):
+    """True if the token was revoked (logout), from the in-memory set"""
+    if _revoked_tokens.is_stale(TOKEN_REVOCATION_REFRESH):
+        load_revoked_tokens()
+    return token_id in _revoked_tokens
+
+
+def revoke_token(token_id, admin_id, expires):
+    """Revoke a session token until it expires (expires: unix time)"""
+    conn = get_db_connection()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO RevokedToken (token_id, admin_id, expires_at) VALUES (?, ?, ?)",
+                           (token_id, admin_id, datetime.fromtimestamp(expires)))
+            conn.commit()
+            conn.close()
+            _revoked_tokens.add(token_id, expires)
+            return True
+        except Exception as e:
+            log.error("Error revoking token: %s", e)
+            if conn:
+                conn.close()
+    return False
+
+
+# Officer CRUD operations
+def _officers_query(limit=None, after=None, unit_id=None):
+    """Build the officer list query (by ID) with filters, returns (sql, params)"""
+    conditions, params = [], []
+    if unit_id:
+        conditions.append("o.unit_id = ?")
+        params.append(unit_id)
+    if after:
+        condition, values = keyset_condition(["o.officer_id"], after)
+        conditions.append(condition)
+        params.extend(values)
+    return _build_list_query("""
+        SELECT o.officer_id, o.name, o.address, o.badge_no, o.rank, o.contact, o.unit_id, u.unit_name
+        FROM Officer o
+        LEFT JOIN Unit u ON o.unit_id = u.unit_id""", conditions, params, "o.officer_id", limit)
+
+
+def _load_officers(limit=None, after=None, unit_id=None):
+    """Get officers ordered by ID, one page at a time when limit is given"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        sql, params = _officers_query(limit, after, unit_id)
+        cursor.execute(sql, params)
+        officers = []
+        rows = cursor.fetchall()
+        with metrics.db_timer('convert'):
+            for row in rows:
                 officers.append({
                     'officer_id': row[0],
                     'name': row[1],
@@ -79,15 +712,98 @@ def get_all_officers():
                     'unit_id': row[6],
                     'unit_name': row[7]
                 })
+        conn.close()
+        return officers
+    except Exception as e:
+        log.error("Error getting officers: %s", e)
+        if conn:
             conn.close()
-        except Exception as e:
-            print(f"Error getting officers: {e}")
-            if conn:
-                conn.close()
-    return officers
+    return None
 
 
-def get_officer_by_id(officer_id):
+def get_all_officers(limit=None, after=None, unit_id=None):
+    """Get officers ordered by ID, one page at a time when limit is given (cached)"""
+    key = f'officers:{limit}:{after}:{unit_id}'
+    return _reference_cache.get_or_load(key, lambda: _load_officers(limit, after, unit_id)) or []
+
+
+def _load_officer_options():
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT officer_id, name FROM Officer ORDER BY name, officer_id")
+        options = [{'officer_id': row[0], 'name': row[1]} for row in cursor.fetchall()]
+        conn.close()
+        return options
+    except Exception as e:
+        log.error("Error getting officer options: %s", e)
+        if conn:
+            conn.close()
+    return None
+
+
+def get_officer_options():
+    """Slim officer list (id, name) for pickers, cached until an officer changes"""
+    return _reference_cache.get_or_load('officer_options', _load_officer_options) or []
+
+
+def _load_options(sql, limit, make_option):
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        sql, params = _engine.limit(sql, [], limit)
+        cursor.execute(sql, params)
+        options = [make_option(row) for row in cursor.fetchall()]
+        conn.close()
+        return options
+    except Exception as e:
+        log.error("Error getting options: %s", e)
+        if conn:
+            conn.close()
+    return None
+
+
+def _case_option(row):
+    return {'case_id': row[0], 'case_number': row[1], 'title': row[2]}
+
+
+def _criminal_option(row):
+    return {'criminal_id': row[0], 'name': row[1], 'cnic': row[2]}
+
+
+def get_case_options(query=None, limit=50):
+    """Slim case list (id, number, title) for pickers, at most limit rows
+
+    Newest cases (cached until a case changes), or the ones matching
+    query through search_cases(). There can be too many cases to list.
+    """
+    if query:
+        return [_case_option((c['case_id'], c['case_number'], c['title']))
+                for c in search_cases(query, limit)]
+    return _reference_cache.get_or_load(f'case_options:{limit}', lambda: _load_options(
+        "SELECT case_id, case_number, title FROM Case_table ORDER BY case_id DESC",
+        limit, _case_option)) or []
+
+
+def get_criminal_options(query=None, limit=50):
+    """Slim criminal list (id, name, CNIC) for pickers, at most limit rows
+
+    Most recently added criminals (cached until a criminal changes), or the
+    ones matching query (name or CNIC) through search_criminals().
+    """
+    if query:
+        return [_criminal_option((c['criminal_id'], c['name'], c['cnic']))
+                for c in search_criminals(query, limit)]
+    return _reference_cache.get_or_load(f'criminal_options:{limit}', lambda: _load_options(
+        "SELECT criminal_id, name, cnic FROM Criminal ORDER BY criminal_id DESC",
+        limit, _criminal_option)) or []
+
+
+def _load_officer(officer_id):
     """Get officer by ID"""
     conn = get_db_connection()
     if conn:
@@ -113,30 +829,38 @@ def get_officer_by_id(officer_id):
                     'unit_name': row[7]
                 }
         except Exception as e:
-            print(f"Error getting officer: {e}")
+            log.error("Error getting officer: %s", e)
             if conn:
                 conn.close()
     return None
 
 
+def get_officer_by_id(officer_id):
+    """Get officer by ID (cached)"""
+    return _reference_cache.get_or_load(f'officer:{officer_id}', lambda: _load_officer(officer_id))
+
+
 def create_officer(name, address, badge_no, rank, contact, unit_id):
     """Create new officer"""
     conn = get_db_connection()
     if conn:
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO Officer (name, address, badge_no, rank, contact, unit_id)
-                OUTPUT INSERTED.officer_id
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (name, address, badge_no, rank, contact, unit_id))
+            cursor.execute(_engine.insert_returning(
+                'Officer',
+                ['name', 'address', 'badge_no', 'rank', 'contact', 'unit_id'],
+                ['officer_id']
+            ), (name, address, badge_no, rank, contact, unit_id))
             officer_id = cursor.fetchone()[0]
+            log_audit('INSERT', 'Officer', officer_id, cursor)
             conn.commit()
-            log_audit('INSERT', 'Officer', officer_id)
+            _after_write('INSERT', 'Officer', officer_id)
+            _update_search('index_officer', officer_id, name)
+            _badge_index.put(officer_id, badge_no, _officer_lookup_payload(officer_id, name, badge_no, rank))
             conn.close()
             return officer_id
         except Exception as e:
-            print(f"Error creating officer: {e}")
+            log.error("Error creating officer: %s", e)
             if conn:
                 conn.close()
     return None
@@ -153,12 +877,15 @@ def update_officer(officer_id, name, address, badge_no, rank, contact, unit_id):
                 SET name = ?, address = ?, badge_no = ?, rank = ?, contact = ?, unit_id = ?
                 WHERE officer_id = ?
             """, (name, address, badge_no, rank, contact, unit_id, officer_id))
+            log_audit('UPDATE', 'Officer', officer_id, cursor)
             conn.commit()
-            log_audit('UPDATE', 'Officer', officer_id)
+            _after_write('UPDATE', 'Officer', officer_id)
+            _update_search('index_officer', officer_id, name)
+            _badge_index.put(officer_id, badge_no, _officer_lookup_payload(officer_id, name, badge_no, rank))
             conn.close()
             return True
         except Exception as e:
-            print(f"Error updating officer: {e}")
+            log.error("Error updating officer: %s", e)
             if conn:
                 conn.close()
     return False
@@ -171,43 +898,56 @@ def delete_officer(officer_id):
         try:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM Officer WHERE officer_id = ?", (officer_id,))
+            log_audit('DELETE', 'Officer', officer_id, cursor)
             conn.commit()
-            log_audit('DELETE', 'Officer', officer_id)
+            _after_write('DELETE', 'Officer', officer_id)
+            _update_search('remove_officer', officer_id)
+            _badge_index.remove(officer_id)
             conn.close()
             return True
         except Exception as e:
-            print(f"Error deleting officer: {e}")
+            log.error("Error deleting officer: %s", e)
             if conn:
                 conn.close()
     return False
 
 
 # Criminal CRUD operations
-def get_all_criminals():
-    """Get all criminals"""
+def get_all_criminals(limit=None, after=None):
+    """Get criminals ordered by ID, one page at a time when limit is given"""
     conn = get_db_connection()
     criminals = []
     if conn:
         try:
             cursor = conn.cursor()
-            cursor.execute("SELECT criminal_id, name, address, cnic, notes FROM Criminal ORDER BY criminal_id")
-            for row in cursor.fetchall():
-                criminals.append({
-                    'criminal_id': row[0],
-                    'name': row[1],
-                    'address': row[2],
-                    'cnic': row[3],
-                    'notes': row[4]
-                })
+            conditions, params = [], []
+            if after:
+                condition, values = keyset_condition(["criminal_id"], after)
+                conditions.append(condition)
+                params.extend(values)
+            sql, params = _build_list_query(
+                "SELECT criminal_id, name, address, cnic, notes FROM Criminal",
+                conditions, params, "criminal_id", limit)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            with metrics.db_timer('convert'):
+                for row in rows:
+                    criminals.append({
+                        'criminal_id': row[0],
+                        'name': row[1],
+                        'address': row[2],
+                        'cnic': row[3],
+                        'notes': row[4]
+                    })
             conn.close()
         except Exception as e:
-            print(f"Error getting criminals: {e}")
+            log.error("Error getting criminals: %s", e)
             if conn:
                 conn.close()
     return criminals
 
 
-def get_criminal_by_id(criminal_id):
+def _load_criminal(criminal_id):
     """Get criminal by ID"""
     conn = get_db_connection()
     if conn:
@@ -225,30 +965,38 @@ def get_criminal_by_id(criminal_id):
                     'notes': row[4]
                 }
         except Exception as e:
-            print(f"Error getting criminal: {e}")
+            log.error("Error getting criminal: %s", e)
             if conn:
                 conn.close()
     return None
 
 
+def get_criminal_by_id(criminal_id):
+    """Get criminal by ID (cached)"""
+    return _reference_cache.get_or_load(f'criminal:{criminal_id}', lambda: _load_criminal(criminal_id))
+
+
 def create_criminal(name, address, cnic, notes):
     """Create new criminal"""
     conn = get_db_connection()
     if conn:
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO Criminal (name, address, cnic, notes)
-                OUTPUT INSERTED.criminal_id
-                VALUES (?, ?, ?, ?)
-            """, (name, address, cnic, notes))
+            cursor.execute(_engine.insert_returning(
+                'Criminal',
+                ['name', 'address', 'cnic', 'notes'],
+                ['criminal_id']
+            ), (name, address, cnic, notes))
             criminal_id = cursor.fetchone()[0]
+            log_audit('INSERT', 'Criminal', criminal_id, cursor)
             conn.commit()
-            log_audit('INSERT', 'Criminal', criminal_id)
+            _after_write('INSERT', 'Criminal', criminal_id)
+            _update_search('index_criminal', criminal_id, name, cnic, notes)
+            _cnic_index.put(criminal_id, cnic, _criminal_lookup_payload(criminal_id, name, cnic))
             conn.close()
             return criminal_id
         except Exception as e:
-            print(f"Error creating criminal: {e}")
+            log.error("Error creating criminal: %s", e)
             if conn:
                 conn.close()
     return None
@@ -265,12 +1013,15 @@ def update_criminal(criminal_id, name, address, cnic, notes):
                 SET name = ?, address = ?, cnic = ?, notes = ?
                 WHERE criminal_id = ?
             """, (name, address, cnic, notes, criminal_id))
+            log_audit('UPDATE', 'Criminal', criminal_id, cursor)
             conn.commit()
-            log_audit('UPDATE', 'Criminal', criminal_id)
+            _after_write('UPDATE', 'Criminal', criminal_id)
+            _update_search('index_criminal', criminal_id, name, cnic, notes)
+            _cnic_index.put(criminal_id, cnic, _criminal_lookup_payload(criminal_id, name, cnic))
             conn.close()
             return True
         except Exception as e:
-            print(f"Error updating criminal: {e}")
+            log.error("Error updating criminal: %s", e)
             if conn:
                 conn.close()
     return False
@@ -283,55 +1034,102 @@ def delete_criminal(criminal_id):
         try:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM Criminal WHERE criminal_id = ?", (criminal_id,))
+            log_audit('DELETE', 'Criminal', criminal_id, cursor)
             conn.commit()
-            log_audit('DELETE', 'Criminal', criminal_id)
+            _after_write('DELETE', 'Criminal', criminal_id)
+            _update_search('remove_criminal', criminal_id)
+            _cnic_index.remove(criminal_id)
             conn.close()
             return True
         except Exception as e:
-            print(f"Error deleting criminal: {e}")
+            log.error("Error deleting criminal: %s", e)
             if conn:
                 conn.close()
     return False
 
 
 # Case CRUD operations
-def get_all_cases():
-    """Get all cases"""
+def _cases_query(limit=None, after=None, status=None, filed_by=None, suspect_id=None,
+                 unit_id=None, date_from=None, date_to=None):
+    """Build the case list query (newest first) with filters, returns (sql, params)"""
+    conditions, params = [], []
+    if status:
+        conditions.append("c.status = ?")
+        params.append(status)
+    if filed_by:
+        conditions.append("c.filed_by = ?")
+        params.append(filed_by)
+    if suspect_id:
+        conditions.append("c.suspect_id = ?")
+        params.append(suspect_id)
+    if unit_id:
+        conditions.append("o.unit_id = ?")
+        params.append(unit_id)
+    if date_from:
+        conditions.append("c.filed_date >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("c.filed_date <= ?")
+        params.append(date_to)
+    if after:
+        condition, values = keyset_condition(["c.case_id"], after, descending=True)
+        conditions.append(condition)
+        params.extend(values)
+    return _build_list_query("""
+        SELECT c.case_id, c.case_number, c.title, c.description, c.filed_date,
+               c.filed_by, o.name as officer_name, c.suspect_id, cr.name as suspect_name, c.status
+        FROM Case_table c
+        LEFT JOIN Officer o ON c.filed_by = o.officer_id
+        LEFT JOIN Criminal cr ON c.suspect_id = cr.criminal_id""",
+        conditions, params, "c.case_id DESC", limit)
+
+
+def _case_row_to_dict(row):
+    return {
+        'case_id': row[0],
+        'case_number': row[1],
+        'title': row[2],
+        'description': row[3],
+        'filed_date': str(row[4]) if row[4] else None,
+        'filed_by': row[5],
+        'officer_name': row[6],
+        'suspect_id': row[7],
+        'suspect_name': row[8],
+        'status': row[9]
+    }
+
+
+def get_all_cases(limit=None, after=None, **filters):
+    """Get cases newest first, filtered in SQL, one page at a time when limit is given
+
+    Filters: status, filed_by, suspect_id, unit_id, date_from, date_to
+    """
     conn = get_db_connection()
     cases = []
     if conn:
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT c.case_id, c.case_number, c.title, c.description, c.filed_date,
-                       c.filed_by, o.name as officer_name, c.suspect_id, cr.name as suspect_name, c.status
-                FROM Case_table c
-                LEFT JOIN Officer o ON c.filed_by = o.officer_id
-                LEFT JOIN Criminal cr ON c.suspect_id = cr.criminal_id
-                ORDER BY c.case_id DESC
-            """)
-            for row in cursor.fetchall():
-                cases.append({
-                    'case_id': row[0],
-                    'case_number': row[1],
-                    'title': row[2],
-                    'description': row[3],
-                    'filed_date': str(row[4]) if row[4] else None,
-                    'filed_by': row[5],
-                    'officer_name': row[6],
-                    'suspect_id': row[7],
-                    'suspect_name': row[8],
-                    'status': row[9]
-                })
+            sql, params = _cases_query(limit, after, **filters)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            with metrics.db_timer('convert'):
+                for row in rows:
+                    cases.append(_case_row_to_dict(row))
             conn.close()
         except Exception as e:
-            print(f"Error getting cases: {e}")
+            log.error("Error getting cases: %s", e)
             if conn:
                 conn.close()
     return cases
 
 
-def get_case_by_id(case_id):
+def iter_cases(batch_size=1000, **filters):
+    """Yield every matching case (for exports), batch_size rows per fetch"""
+    sql, params = _cases_query(**filters)
+    return _iter_query(sql, params, _case_row_to_dict, batch_size)
+
+
+def _load_case(case_id):
     """Get case by ID"""
     conn = get_db_connection()
     if conn:
@@ -361,41 +1159,41 @@ def get_case_by_id(case_id):
                     'status': row[9]
                 }
         except Exception as e:
-            print(f"Error getting case: {e}")
+            log.error("Error getting case: %s", e)
             if conn:
                 conn.close()
     return None
 
 
+def get_case_by_id(case_id):
+    """Get case by ID (cached)"""
+    return _reference_cache.get_or_load(f'case:{case_id}', lambda: _load_case(case_id))
+
+
 def create_case(case_number, title, description, filed_date, filed_by, suspect_id, status):
     """Create new case"""
-    print(f"=== DB CREATE CASE ===")
-    print(f"Parameters: case_number={case_number}, title={title}, filed_date={filed_date}")
-    print(f"filed_by={filed_by} (type: {type(filed_by)}), suspect_id={suspect_id} (type: {type(suspect_id)})")
-
     conn = get_db_connection()
     if not conn:
-        print("ERROR: Could not get database connection")
+        log.error("Error creating case: no database connection")
         return None
 
     try:
         cursor = conn.cursor()
-        print("Executing INSERT query...")
-        cursor.execute("""
-            INSERT INTO Case_table (case_number, title, description, filed_date, filed_by, suspect_id, status)
-            OUTPUT INSERTED.case_id
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (case_number, title, description, filed_date, filed_by, suspect_id, status))
+        cursor.execute(_engine.insert_returning(
+            'Case_table',
+            ['case_number', 'title', 'description', 'filed_date', 'filed_by', 'suspect_id', 'status'],
+            ['case_id']
+        ), (case_number, title, description, filed_date, filed_by, suspect_id, status))
         case_id = cursor.fetchone()[0]
+        log_audit('INSERT', 'Case', case_id, cursor)
         conn.commit()
-        print(f"Case created successfully with ID: {case_id}")
-        log_audit('INSERT', 'Case', case_id)
+        _after_write('INSERT', 'Case', case_id)
+        _update_search('index_case', case_id, case_number, title, description, filed_by)
+        log.debug("Case created", extra={'case_id': case_id, 'filed_by': filed_by, 'suspect_id': suspect_id})
         conn.close()
         return case_id
     except Exception as e:
-        print(f"ERROR creating case: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error creating case: %s", e)
         if conn:
             conn.close()
     return None
@@ -413,12 +1211,14 @@ def update_case(case_id, case_number, title, description, filed_date, filed_by,
                     filed_by = ?, suspect_id = ?, status = ?
                 WHERE case_id = ?
             """, (case_number, title, description, filed_date, filed_by, suspect_id, status, case_id))
+            log_audit('UPDATE', 'Case', case_id, cursor)
             conn.commit()
-            log_audit('UPDATE', 'Case', case_id)
+            _after_write('UPDATE', 'Case', case_id)
+            _update_search('index_case', case_id, case_number, title, description, filed_by)
             conn.close()
             return True
         except Exception as e:
-            print(f"Error updating case: {e}")
+            log.error("Error updating case: %s", e)
             if conn:
                 conn.close()
     return False
@@ -431,102 +1231,241 @@ def delete_case(case_id):
         try:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM Case_table WHERE case_id = ?", (case_id,))
+            log_audit('DELETE', 'Case', case_id, cursor)
             conn.commit()
-            log_audit('DELETE', 'Case', case_id)
+            _after_write('DELETE', 'Case', case_id)
+            _update_search('remove_case', case_id)
             conn.close()
             return True
         except Exception as e:
-            print(f"Error deleting case: {e}")
+            log.error("Error deleting case: %s", e)
             if conn:
                 conn.close()
     return False
 
 
 # Case Update operations
-def get_case_updates(case_id):
-    """Get all updates for a case"""
+def _case_updates_query(case_id, limit=None, after=None):
+    """Updates of one case, newest first, returns (sql, params)"""
+    conditions, params = ["cu.case_id = ?"], [case_id]
+    if after:
+        condition, values = keyset_condition(["cu.update_date", "cu.update_id"], after, descending=True)
+        conditions.append(condition)
+        params.extend(values)
+    return _build_list_query("""
+        SELECT cu.update_id, cu.update_text, cu.update_date, cu.updated_by, o.name as officer_name
+        FROM CaseUpdate cu
+        LEFT JOIN Officer o ON cu.updated_by = o.officer_id""",
+        conditions, params, "cu.update_date DESC, cu.update_id DESC", limit)
+
+
+def _case_update_row_to_dict(row):
+    return {
+        'update_id': row[0],
+        'update_text': row[1],
+        'update_date': str(row[2]) if row[2] else None,
+        'updated_by': row[3],
+        'officer_name': row[4]
+    }
+
+
+def get_case_updates(case_id, limit=None, after=None):
+    """Get updates for a case, one page at a time when limit is given"""
     conn = get_db_connection()
     updates = []
     if conn:
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT cu.update_id, cu.update_text, cu.update_date, cu.updated_by, o.name as officer_name
-                FROM CaseUpdate cu
-                LEFT JOIN Officer o ON cu.updated_by = o.officer_id
-                WHERE cu.case_id = ?
-                ORDER BY cu.update_date DESC
-            """, (case_id,))
-            for row in cursor.fetchall():
-                updates.append({
-                    'update_id': row[0],
-                    'update_text': row[1],
-                    'update_date': str(row[2]) if row[2] else None,
-                    'updated_by': row[3],
-                    'officer_name': row[4]
-                })
+            sql, params = _case_updates_query(case_id, limit, after)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            with metrics.db_timer('convert'):
+                for row in rows:
+                    updates.append(_case_update_row_to_dict(row))
             conn.close()
         except Exception as e:
-            print(f"Error getting case updates: {e}")
+            log.error("Error getting case updates: %s", e)
             if conn:
                 conn.close()
     return updates
 
 
+def get_case_full(case_id, updates_limit, updates_after=None):
+    """Everything the case page shows, in one batch on one connection
+
+    Returns {case, filing_officer, suspect, updates, evidence} or None if
+    the case doesn't exist. updates is a raw page of up to updates_limit
+    rows (pass limit + 1 and use make_page, like the list functions).
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        updates_sql, updates_params = _case_updates_query(case_id, updates_limit, updates_after)
+        case_rows, update_rows, evidence_rows = _engine.run_batch(cursor, [
+            ("""
+            SELECT c.case_id, c.case_number, c.title, c.description, c.filed_date,
+                   c.filed_by, o.name, c.suspect_id, cr.name, c.status,
+                   o.badge_no, o.rank, o.unit_id, u.unit_name, cr.cnic
+            FROM Case_table c
+            LEFT JOIN Officer o ON c.filed_by = o.officer_id
+            LEFT JOIN Unit u ON o.unit_id = u.unit_id
+            LEFT JOIN Criminal cr ON c.suspect_id = cr.criminal_id
+            WHERE c.case_id = ?""", [case_id]),
+            (updates_sql, updates_params),
+            ("""
+            SELECT evidence_id, case_id, file_name, description, upload_date, sha256, file_size
+            FROM Evidence
+            WHERE case_id = ?
+            ORDER BY upload_date DESC, evidence_id DESC""", [case_id])
+        ])
+
+        if not case_rows:
+            conn.close()
+            return None
+        with metrics.db_timer('convert'):
+            row = case_rows[0]
+            result = {
+                'case': {
+                    'case_id': row[0],
+                    'case_number': row[1],
+                    'title': row[2],
+                    'description': row[3],
+                    'filed_date': str(row[4]) if row[4] else None,
+                    'filed_by': row[5],
+                    'officer_name': row[6],
+                    'suspect_id': row[7],
+                    'suspect_name': row[8],
+                    'status': row[9]
+                },
+                'filing_officer': {
+                    'officer_id': row[5],
+                    'name': row[6],
+                    'badge_no': row[10],
+                    'rank': row[11],
+                    'unit_id': row[12],
+                    'unit_name': row[13]
+                } if row[5] is not None else None,
+                'suspect': {
+                    'criminal_id': row[7],
+                    'name': row[8],
+                    'cnic': row[14]
+                } if row[7] is not None else None
+            }
+            result['updates'] = [_case_update_row_to_dict(r) for r in update_rows]
+            result['evidence'] = [{
+                'evidence_id': r[0],
+                'case_id': r[1],
+                'file_name': r[2],
+                'description': r[3],
+                'upload_date': str(r[4]) if r[4] else None,
+                'sha256': r[5],
+                'file_size': r[6]
+            } for r in evidence_rows]
+        conn.close()
+        return result
+    except Exception as e:
+        log.error("Error getting case details: %s", e)
+        if conn:
+            conn.close()
+    return None
+
+
 def add_case_update(case_id, update_text, updated_by):
     """Add update to case"""
     conn = get_db_connection()
     if conn:
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO CaseUpdate (case_id, update_text, update_date, updated_by)
-                OUTPUT INSERTED.update_id
-                VALUES (?, ?, ?, ?)
-            """, (case_id, update_text, datetime.now(), updated_by))
+            cursor.execute(_engine.insert_returning(
+                'CaseUpdate',
+                ['case_id', 'update_text', 'update_date', 'updated_by'],
+                ['update_id']
+            ), (case_id, update_text, datetime.now(), updated_by))
             update_id = cursor.fetchone()[0]
+            log_audit('INSERT', 'CaseUpdate', update_id, cursor)
             conn.commit()
-            log_audit('INSERT', 'CaseUpdate', update_id)
+            _after_write('INSERT', 'CaseUpdate', update_id)
+            _update_search('add_case_update', case_id, update_text)
             conn.close()
             return update_id
         except Exception as e:
-            print(f"Error adding case update: {e}")
+            log.error("Error adding case update: %s", e)
             if conn:
                 conn.close()
     return None
 
 
 # Evidence operations
-def get_all_evidence():
-    """Get all evidence"""
+def _evidence_query(limit=None, after=None, case_id=None, date_from=None, date_to=None):
+    """Build the evidence list query (newest first) with filters, returns (sql, params)"""
+    conditions, params = [], []
+    if case_id:
+        conditions.append("e.case_id = ?")
+        params.append(case_id)
+    if date_from:
+        conditions.append("e.upload_date >= ?")
+        params.append(date_from)
+    if date_to:
+        # upload_date has a time part, so include the whole last day
+        conditions.append("e.upload_date < ?")
+        params.append(date_to + timedelta(days=1))
+    if after:
+        condition, values = keyset_condition(["e.upload_date", "e.evidence_id"], after, descending=True)
+        conditions.append(condition)
+        params.extend(values)
+    return _build_list_query("""
+        SELECT e.evidence_id, e.case_id, c.case_number, e.file_name, e.description, e.upload_date,
+               e.sha256, e.file_size
+        FROM Evidence e
+        LEFT JOIN Case_table c ON e.case_id = c.case_id""",
+        conditions, params, "e.upload_date DESC, e.evidence_id DESC", limit)
+
+
+def _evidence_row_to_dict(row):
+    return {
+        'evidence_id': row[0],
+        'case_id': row[1],
+        'case_number': row[2],
+        'file_name': row[3],
+        'description': row[4],
+        'upload_date': str(row[5]) if row[5] else None,
+        'sha256': row[6],
+        'file_size': row[7]
+    }
+
+
+def get_all_evidence(limit=None, after=None, **filters):
+    """Get evidence newest first, one page at a time when limit is given
+
+    Filters: case_id, date_from, date_to
+    """
     conn = get_db_connection()
     evidence_list = []
     if conn:
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT e.evidence_id, e.case_id, c.case_number, e.file_name, e.description, e.upload_date
-                FROM Evidence e
-                LEFT JOIN Case_table c ON e.case_id = c.case_id
-                ORDER BY e.upload_date DESC
-            """)
-            for row in cursor.fetchall():
-                evidence_list.append({
-                    'evidence_id': row[0],
-                    'case_id': row[1],
-                    'case_number': row[2],
-                    'file_name': row[3],
-                    'description': row[4],
-                    'upload_date': str(row[5]) if row[5] else None
-                })
+            sql, params = _evidence_query(limit, after, **filters)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            with metrics.db_timer('convert'):
+                for row in rows:
+                    evidence_list.append(_evidence_row_to_dict(row))
             conn.close()
         except Exception as e:
-            print(f"Error getting evidence: {e}")
+            log.error("Error getting evidence: %s", e)
             if conn:
                 conn.close()
     return evidence_list
 
 
+def iter_evidence(batch_size=1000, **filters):
+    """Yield every matching evidence record (for exports)"""
+    sql, params = _evidence_query(**filters)
+    return _iter_query(sql, params, _evidence_row_to_dict, batch_size)
+
+
 def get_evidence_by_case(case_id):
     """Get evidence for a specific case"""
     conn = get_db_connection()
@@ -535,7 +1474,7 @@ def get_evidence_by_case(case_id):
         try:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT evidence_id, case_id, file_name, description, upload_date
+                SELECT evidence_id, case_id, file_name, description, upload_date, sha256, file_size
                 FROM Evidence
                 WHERE case_id = ?
                 ORDER BY upload_date DESC
@@ -546,65 +1485,187 @@ def get_evidence_by_case(case_id):
                     'case_id': row[1],
                     'file_name': row[2],
                     'description': row[3],
-                    'upload_date': str(row[4]) if row[4] else None
+                    'upload_date': str(row[4]) if row[4] else None,
+                    'sha256': row[5],
+                    'file_size': row[6]
                 })
             conn.close()
         except Exception as e:
-            print(f"Error getting evidence: {e}")
+            log.error("Error getting evidence: %s", e)
             if conn:
                 conn.close()
     return evidence_list
 
 
-def create_evidence(case_id, file_name, description):
-    """Create evidence record"""
+def get_evidence_by_id(evidence_id):
+    """Get a single evidence record"""
     conn = get_db_connection()
     if conn:
         try:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO Evidence (case_id, file_name, description, upload_date)
-                OUTPUT INSERTED.evidence_id
-                VALUES (?, ?, ?, ?)
-            """, (case_id, file_name, description, datetime.now()))
+                SELECT evidence_id, case_id, file_name, description, upload_date, sha256, file_size
+                FROM Evidence
+                WHERE evidence_id = ?
+            """, (evidence_id,))
+            row = cursor.fetchone()
+            conn.close()
+            if row:
+                return {
+                    'evidence_id': row[0],
+                    'case_id': row[1],
+                    'file_name': row[2],
+                    'description': row[3],
+                    'upload_date': str(row[4]) if row[4] else None,
+                    'sha256': row[5],
+                    'file_size': row[6]
+                }
+        except Exception as e:
+            log.error("Error getting evidence: %s", e)
+            if conn:
+                conn.close()
+    return None
+
+
+def count_evidence_references(sha256):
+    """Number of evidence records pointing at a stored file"""
+    conn = get_db_connection()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM Evidence WHERE sha256 = ?", (sha256,))
+            count = cursor.fetchone()[0]
+            conn.close()
+            return count
+        except Exception as e:
+            log.error("Error counting evidence references: %s", e)
+            if conn:
+                conn.close()
+    return None
+
+
+def create_evidence(case_id, file_name, description, sha256=None, file_size=None):
+    """Create evidence record
+
+    sha256 / file_size point at the file in the blob store. Records
+    without a hash are legacy files stored under file_name.
+    """
+    conn = get_db_connection()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(_engine.insert_returning(
+                'Evidence',
+                ['case_id', 'file_name', 'description', 'upload_date', 'sha256', 'file_size'],
+                ['evidence_id']
+            ), (case_id, file_name, description, datetime.now(), sha256, file_size))
             evidence_id = cursor.fetchone()[0]
+            log_audit('INSERT', 'Evidence', evidence_id, cursor)
             conn.commit()
-            log_audit('INSERT', 'Evidence', evidence_id)
+            _after_write('INSERT', 'Evidence', evidence_id)
             conn.close()
             return evidence_id
         except Exception as e:
-            print(f"Error creating evidence: {e}")
+            log.error("Error creating evidence: %s", e)
+            if conn:
+                conn.close()
+    return None
+
+
+def delete_evidence(evidence_id):
+    """Delete evidence record
+
+    Returns the deleted record with 'references' set to the number of other
+    records still using the same stored file (the caller removes the file
+    when it reaches 0), or None if nothing was deleted.
+    """
+    conn = get_db_connection()
+    if conn:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(_engine.delete_returning(
+                'Evidence', 'evidence_id = ?', ['evidence_id', 'case_id', 'file_name', 'sha256']),
+                (evidence_id,))
+            row = cursor.fetchone()
+            if not row:
+                conn.close()
+                return None
+            references = 0
+            if row[3]:
+                cursor.execute("SELECT COUNT(*) FROM Evidence WHERE sha256 = ?", (row[3],))
+                references = cursor.fetchone()[0]
+            log_audit('DELETE', 'Evidence', evidence_id, cursor)
+            conn.commit()
+            _after_write('DELETE', 'Evidence', evidence_id)
+            conn.close()
+            return {
+                'evidence_id': row[0],
+                'case_id': row[1],
+                'file_name': row[2],
+                'sha256': row[3],
+                'references': references
+            }
+        except Exception as e:
+            log.error("Error deleting evidence: %s", e)
             if conn:
                 conn.close()
     return None
 
 
 # Duty operations
-def get_all_duties():
-    """Get all duties"""
+def _duties_query(limit=None, after=None, officer_id=None, unit_id=None, date_from=None, date_to=None):
+    """Build the duty list query (latest first) with filters, returns (sql, params)"""
+    conditions, params = [], []
+    if officer_id:
+        conditions.append("d.officer_id = ?")
+        params.append(officer_id)
+    if unit_id:
+        conditions.append("o.unit_id = ?")
+        params.append(unit_id)
+    if date_from:
+        conditions.append("d.duty_date >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("d.duty_date <= ?")
+        params.append(date_to)
+    if after:
+        condition, values = keyset_condition(["d.duty_date", "d.duty_time", "d.duty_id"], after,
+                                             descending=True)
+        conditions.append(condition)
+        params.extend(values)
+    return _build_list_query("""
+        SELECT d.duty_id, d.officer_id, o.name as officer_name, d.duty_date, d.duty_time, d.location
+        FROM Duty d
+        LEFT JOIN Officer o ON d.officer_id = o.officer_id""",
+        conditions, params, "d.duty_date DESC, d.duty_time DESC, d.duty_id DESC", limit)
+
+
+def get_all_duties(limit=None, after=None, **filters):
+    """Get duties latest first, one page at a time when limit is given
+
+    Filters: officer_id, unit_id, date_from, date_to
+    """
     conn = get_db_connection()
     duties = []
     if conn:
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT d.duty_id, d.officer_id, o.name as officer_name, d.duty_date, d.duty_time, d.location
-                FROM Duty d
-                LEFT JOIN Officer o ON d.officer_id = o.officer_id
-                ORDER BY d.duty_date DESC, d.duty_time DESC
-            """)
-            for row in cursor.fetchall():
-                duties.append({
-                    'duty_id': row[0],
-                    'officer_id': row[1],
-                    'officer_name': row[2],
-                    'duty_date': str(row[3]) if row[3] else None,
-                    'duty_time': str(row[4]) if row[4] else None,
-                    'location': row[5]
-                })
+            sql, params = _duties_query(limit, after, **filters)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            with metrics.db_timer('convert'):
+                for row in rows:
+                    duties.append({
+                        'duty_id': row[0],
+                        'officer_id': row[1],
+                        'officer_name': row[2],
+                        'duty_date': str(row[3]) if row[3] else None,
+                        'duty_time': str(row[4]) if row[4] else None,
+                        'location': row[5]
+                    })
             conn.close()
         except Exception as e:
-            print(f"Error getting duties: {e}")
+            log.error("Error getting duties: %s", e)
             if conn:
                 conn.close()
     return duties
@@ -616,18 +1677,19 @@ def create_duty(officer_id, duty_date, duty_time, location):
     if conn:
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO Duty (officer_id, duty_date, duty_time, location)
-                OUTPUT INSERTED.duty_id
-                VALUES (?, ?, ?, ?)
-            """, (officer_id, duty_date, duty_time, location))
+            cursor.execute(_engine.insert_returning(
+                'Duty',
+                ['officer_id', 'duty_date', 'duty_time', 'location'],
+                ['duty_id']
+            ), (officer_id, duty_date, duty_time, location))
             duty_id = cursor.fetchone()[0]
+            log_audit('INSERT', 'Duty', duty_id, cursor)
             conn.commit()
-            log_audit('INSERT', 'Duty', duty_id)
+            _after_write('INSERT', 'Duty', duty_id)
             conn.close()
             return duty_id
         except Exception as e:
-            print(f"Error creating duty: {e}")
+            log.error("Error creating duty: %s", e)
             if conn:
                 conn.close()
     return None
@@ -640,42 +1702,134 @@ def delete_duty(duty_id):
         try:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM Duty WHERE duty_id = ?", (duty_id,))
+            log_audit('DELETE', 'Duty', duty_id, cursor)
             conn.commit()
-            log_audit('DELETE', 'Duty', duty_id)
+            _after_write('DELETE', 'Duty', duty_id)
             conn.close()
             return True
         except Exception as e:
-            print(f"Error deleting duty: {e}")
+            log.error("Error deleting duty: %s", e)
             if conn:
                 conn.close()
     return False
 
 
 # Unit operations
-def get_all_units():
+def _load_units():
     """Get all units"""
     conn = get_db_connection()
-    units = []
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT unit_id, unit_name FROM Unit ORDER BY unit_name")
+        units = []
+        for row in cursor.fetchall():
+            units.append({
+                'unit_id': row[0],
+                'unit_name': row[1]
+            })
+        conn.close()
+        return units
+    except Exception as e:
+        log.error("Error getting units: %s", e)
+        if conn:
+            conn.close()
+    return None
+
+
+def get_all_units():
+    """Get all units (cached)"""
+    return _reference_cache.get_or_load('units', _load_units) or []
+
+
+# Search operations
+def _get_cases_by_ids(case_ids):
+    """Load cases by ID, keeping the order of case_ids"""
+    if not case_ids:
+        return []
+    conn = get_db_connection()
+    found = {}
     if conn:
         try:
             cursor = conn.cursor()
-            cursor.execute("SELECT unit_id, unit_name FROM Unit ORDER BY unit_name")
-            for row in cursor.fetchall():
-                units.append({
-                    'unit_id': row[0],
-                    'unit_name': row[1]
-                })
+            placeholders = ', '.join('?' for _ in case_ids)
+            cursor.execute(f"""
+                SELECT c.case_id, c.case_number, c.title, c.description, c.filed_date,
+                       c.filed_by, o.name as officer_name, c.suspect_id, cr.name as suspect_name, c.status
+                FROM Case_table c
+                LEFT JOIN Officer o ON c.filed_by = o.officer_id
+                LEFT JOIN Criminal cr ON c.suspect_id = cr.criminal_id
+                WHERE c.case_id IN ({placeholders})
+            """, list(case_ids))
+            rows = cursor.fetchall()
+            with metrics.db_timer('convert'):
+                for row in rows:
+                    found[row[0]] = {
+                        'case_id': row[0],
+                        'case_number': row[1],
+                        'title': row[2],
+                        'description': row[3],
+                        'filed_date': str(row[4]) if row[4] else None,
+                        'filed_by': row[5],
+                        'officer_name': row[6],
+                        'suspect_id': row[7],
+                        'suspect_name': row[8],
+                        'status': row[9]
+                    }
             conn.close()
         except Exception as e:
-            print(f"Error getting units: {e}")
+            log.error("Error getting cases: %s", e)
             if conn:
                 conn.close()
-    return units
+    return [found[case_id] for case_id in case_ids if case_id in found]
 
 
-# Search operations
-def search_cases(query):
-    """Search cases by case number or officer name"""
+def _get_criminals_by_ids(criminal_ids):
+    """Load criminals by ID, keeping the order of criminal_ids"""
+    if not criminal_ids:
+        return []
+    conn = get_db_connection()
+    found = {}
+    if conn:
+        try:
+            cursor = conn.cursor()
+            placeholders = ', '.join('?' for _ in criminal_ids)
+            cursor.execute(f"""
+                SELECT criminal_id, name, address, cnic, notes
+                FROM Criminal
+                WHERE criminal_id IN ({placeholders})
+            """, list(criminal_ids))
+            rows = cursor.fetchall()
+            with metrics.db_timer('convert'):
+                for row in rows:
+                    found[row[0]] = {
+                        'criminal_id': row[0],
+                        'name': row[1],
+                        'address': row[2],
+                        'cnic': row[3],
+                        'notes': row[4]
+                    }
+            conn.close()
+        except Exception as e:
+            log.error("Error getting criminals: %s", e)
+            if conn:
+                conn.close()
+    return [found[criminal_id] for criminal_id in criminal_ids if criminal_id in found]
+
+
+def search_cases(query, limit=50, offset=0):
+    """Search cases by number, title, description, updates or officer name
+
+    Uses the full-text index (ranked, prefix matching) once it is built,
+    until then falls back to LIKE.
+    """
+    if _use_search_index():
+        try:
+            return _get_cases_by_ids(get_search_index().search_cases(query, limit, offset))
+        except Exception as e:
+            log.error("Search index error: %s", e)
+
     conn = get_db_connection()
     cases = []
     if conn:
@@ -690,7 +1844,8 @@ def search_cases(query):
                 LEFT JOIN Criminal cr ON c.suspect_id = cr.criminal_id
                 WHERE c.case_number LIKE ? OR o.name LIKE ? OR c.title LIKE ?
                 ORDER BY c.case_id DESC
-            """, (search_term, search_term, search_term))
+                """ + _engine.offset_clause(),
+                [search_term, search_term, search_term] + _engine.offset_params(offset, limit))
             for row in cursor.fetchall():
                 cases.append({
                     'case_id': row[0],
@@ -706,14 +1861,20 @@ def search_cases(query):
                 })
             conn.close()
         except Exception as e:
-            print(f"Error searching cases: {e}")
+            log.error("Error searching cases: %s", e)
             if conn:
                 conn.close()
     return cases
 
 
-def search_criminals(query):
-    """Search criminals by name or CNIC"""
+def search_criminals(query, limit=50, offset=0):
+    """Search criminals by name or CNIC (the full-text index also covers notes)"""
+    if _use_search_index():
+        try:
+            return _get_criminals_by_ids(get_search_index().search_criminals(query, limit, offset))
+        except Exception as e:
+            log.error("Search index error: %s", e)
+
     conn = get_db_connection()
     criminals = []
     if conn:
@@ -725,7 +1886,8 @@ def search_criminals(query):
                 FROM Criminal
                 WHERE name LIKE ? OR cnic LIKE ?
                 ORDER BY criminal_id
-            """, (search_term, search_term))
+                """ + _engine.offset_clause(),
+                [search_term, search_term] + _engine.offset_params(offset, limit))
             for row in cursor.fetchall():
                 criminals.append({
                     'criminal_id': row[0],
@@ -736,37 +1898,140 @@ def search_criminals(query):
                 })
             conn.close()
         except Exception as e:
-            print(f"Error searching criminals: {e}")
+            log.error("Error searching criminals: %s", e)
             if conn:
                 conn.close()
     return criminals
 
 
 # Audit log
-def get_audit_logs(limit=100):
-    """Get audit logs"""
+def _audit_log_query(limit=None, after=None, table_name=None, action=None, record_id=None,
+                     since=None, until=None):
+    """Build the AuditLog reader query, newest first"""
+    conditions, params = [], []
+    if table_name:
+        conditions.append("table_name = ?")
+        params.append(table_name)
+    if action:
+        conditions.append("action = ?")
+        params.append(action)
+    if record_id:
+        conditions.append("record_id = ?")
+        params.append(record_id)
+    if since:
+        conditions.append("action_date >= ?")
+        params.append(since)
+    if until:
+        conditions.append("action_date < ?")
+        params.append(until)
+    if after:
+        condition, values = keyset_condition(["action_date", "log_id"], after, descending=True)
+        conditions.append(condition)
+        params.extend(values)
+    return _build_list_query(
+        "SELECT log_id, action, table_name, record_id, action_date FROM AuditLog",
+        conditions, params, "action_date DESC, log_id DESC", limit)
+
+
+def _audit_row_to_dict(row):
+    return {
+        'log_id': row[0],
+        'action': row[1],
+        'table_name': row[2],
+        'record_id': row[3],
+        'action_date': str(row[4]) if row[4] else None
+    }
+
+
+def get_audit_logs(limit=100, after=None, **filters):
+    """Get audit logs newest first (up to limit rows, keyset seek past after)"""
     conn = get_db_connection()
     logs = []
     if conn:
         try:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT log_id, action, table_name, record_id, action_date
-                FROM AuditLog
-                ORDER BY action_date DESC
-            """)
-            for row in cursor.fetchall():
-                logs.append({
-                    'log_id': row[0],
-                    'action': row[1],
-                    'table_name': row[2],
-                    'record_id': row[3],
-                    'action_date': str(row[4]) if row[4] else None
-                })
+            sql, params = _audit_log_query(limit, after, **filters)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            with metrics.db_timer('convert'):
+                for row in rows:
+                    logs.append(_audit_row_to_dict(row))
             conn.close()
         except Exception as e:
-            print(f"Error getting audit logs: {e}")
+            log.error("Error getting audit logs: %s", e)
             if conn:
                 conn.close()
-    return logs[:limit]
+    return logs
+
+
+def iter_audit_logs(batch_size=1000, **filters):
+    """Yield every matching audit log (for exports)"""
+    sql, params = _audit_log_query(**filters)
+    return _iter_query(sql, params, _audit_row_to_dict, batch_size)
+
+
+# Dashboard statistics
+def _load_stats():
+    """Run all dashboard aggregates in one batch (several result sets on SQL Server)"""
+    conn = get_db_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        top_officers = _engine.limit("""
+            SELECT o.officer_id, o.name, COUNT(*) AS case_count
+            FROM Case_table c
+            JOIN Officer o ON c.filed_by = o.officer_id
+            GROUP BY o.officer_id, o.name
+            ORDER BY case_count DESC, o.officer_id""", [], 50)
+        totals, by_status, by_unit, by_officer = _engine.run_batch(cursor, [
+            ("""
+            SELECT (SELECT COUNT(*) FROM Officer),
+                   (SELECT COUNT(*) FROM Criminal),
+                   (SELECT COUNT(*) FROM Case_table),
+                   (SELECT COUNT(*) FROM CaseUpdate),
+                   (SELECT COUNT(*) FROM Evidence),
+                   (SELECT COUNT(DISTINCT case_id) FROM Evidence),
+                   (SELECT COUNT(*) FROM Duty),
+                   (SELECT COALESCE(SUM(file_size), 0) FROM Evidence)""", []),
+            ("SELECT status, COUNT(*) FROM Case_table GROUP BY status", []),
+            ("""
+            SELECT u.unit_id, u.unit_name, COUNT(c.case_id)
+            FROM Unit u
+            LEFT JOIN Officer o ON o.unit_id = u.unit_id
+            LEFT JOIN Case_table c ON c.filed_by = o.officer_id
+            GROUP BY u.unit_id, u.unit_name
+            ORDER BY u.unit_name""", []),
+            top_officers
+        ])
+        row = totals[0]
+        stats = {
+            'officers': row[0],
+            'criminals': row[1],
+            'cases': row[2],
+            'case_updates': row[3],
+            'evidence': row[4],
+            'cases_with_evidence': row[5],
+            'duties': row[6],
+            'evidence_bytes': row[7]
+        }
+        stats['cases_by_status'] = {status: count for status, count in by_status}
+        stats['open_cases'] = stats['cases_by_status'].get('Open', 0)
+        stats['cases_by_unit'] = [
+            {'unit_id': r[0], 'unit_name': r[1], 'cases': r[2]} for r in by_unit
+        ]
+        stats['cases_by_officer'] = [
+            {'officer_id': r[0], 'name': r[1], 'cases': r[2]} for r in by_officer
+        ]
+        conn.close()
+        return stats
+    except Exception as e:
+        log.error("Error getting stats: %s", e)
+        if conn:
+            conn.close()
+    return None
+
 
+def get_stats():
+    """Get dashboard statistics, cached for STATS_CACHE_TTL seconds"""
+    return _stats_cache.get_or_load('dashboard', _load_stats)
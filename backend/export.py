@@ -0,0 +1,58 @@
+# Streaming exports as NDJSON or CSV
+# Turns a row iterator into text chunks for a Flask streaming response
+
+import csv
+import io
+import json
+
+# Rows written per yielded chunk
+CHUNK_ROWS = 500
+
+# Columns written for each export (CSV header order)
+FIELDS = {
+    'cases': ['case_id', 'case_number', 'title', 'description', 'filed_date', 'filed_by',
+              'officer_name', 'suspect_id', 'suspect_name', 'status'],
+    'evidence': ['evidence_id', 'case_id', 'case_number', 'file_name', 'description', 'upload_date',
+                 'sha256', 'file_size'],
+    'audit': ['log_id', 'action', 'table_name', 'record_id', 'action_date']
+}
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+
+def ndjson_chunks(rows):
+    """One JSON object per line"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row, default=str))
+        if len(lines) >= CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def csv_chunks(rows, fields):
+    """Header line followed by one line per row"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count >= CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            count = 0
+    yield buffer.getvalue()
+
+
+def export_chunks(rows, fmt, fields):
+    if fmt == 'csv':
+        return csv_chunks(rows, fields)
+    return ndjson_chunks(rows)
@@ -0,0 +1,35 @@
+# Liveness / readiness endpoints for load balancers and process managers
+# Liveness says the worker answers and its connection pool is usable, but
+# sends no query, so a database outage doesn't get every worker restarted.
+# Readiness checks a connection out of the pool and runs SELECT 1; a worker
+# that can't reach the database is taken out of rotation.
+
+import os
+
+from flask import jsonify
+
+import database as db
+
+
+def init_app(app, live_path='/livez', ready_path='/readyz', timeout=2):
+    """Add the liveness and readiness routes (no login needed)"""
+
+    @app.route(live_path)
+    def liveness():
+        stats = db.get_pool_stats()
+        alive = not stats['closed']
+        body = {'status': 'ok' if alive else 'pool closed', 'pid': os.getpid(),
+                'pool': {key: stats[key] for key in ('size', 'in_use', 'idle', 'max_size', 'timeouts')}}
+        response = jsonify(body)
+        response.headers['Cache-Control'] = 'no-store'
+        return response, 200 if alive else 503
+
+    @app.route(ready_path)
+    def readiness():
+        ok, error = db.check_database(timeout)
+        body = {'status': 'ready' if ok else 'not ready', 'pid': os.getpid()}
+        if error:
+            body['error'] = error
+        response = jsonify(body)
+        response.headers['Cache-Control'] = 'no-store'
+        return response, 200 if ok else 503
@@ -0,0 +1,239 @@
+# Structured logging
+# Modules log with logging.getLogger(__name__). setup_logging() routes all
+# records through a bounded queue: the request thread only enqueues, a
+# background thread formats and writes them (one JSON object per line by
+# default), so slow stdout / disks never hold up a request. Records carry
+# the ID of the request that logged them.
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+# ID of the request being handled (set by init_app), None outside requests
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Attributes every LogRecord has; anything else came from extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+# Records dropped before reaching the output, by reason (see collect_metrics)
+_dropped = {'queue_full': 0, 'rate_limited': 0, 'sampled_out': 0}
+_dropped_lock = threading.Lock()
+
+
+def _count_drop(reason):
+    with _dropped_lock:
+        _dropped[reason] += 1
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, request_id, extras"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        request_id = getattr(record, 'request_id', None)
+        if request_id:
+            entry['request_id'] = request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'
+
+
+class DebugLimiter(logging.Filter):
+    """Rate-limits and samples DEBUG records, per logger
+
+    Each logger may emit rate DEBUG records per second (bursts up to the
+    same number); of those only the sample fraction is kept. Records at
+    INFO and above always pass.
+    """
+
+    def __init__(self, rate=None, sample=1.0):
+        super().__init__()
+        self.rate = rate
+        self.sample = sample
+        self._buckets = {}  # logger name -> [tokens, last refill]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        if self.sample < 1.0 and random.random() >= self.sample:
+            _count_drop('sampled_out')
+            return False
+        if self.rate is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(record.name)
+            if bucket is None:
+                bucket = self._buckets[record.name] = [float(self.rate), now]
+            bucket[0] = min(float(self.rate), bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                allowed = False
+            else:
+                bucket[0] -= 1
+                allowed = True
+        if not allowed:
+            _count_drop('rate_limited')
+        return allowed
+
+
+class RequestQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks: a full queue drops the record"""
+
+    def prepare(self, record):
+        # Runs on the logging thread: capture the request ID and render the
+        # message now, the listener thread may format it much later
+        record = logging.makeLogRecord(vars(record))
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.request_id = request_id_var.get()
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _count_drop('queue_full')
+
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(level='INFO', module_levels=None, fmt='json', path=None, queue_size=10000,
+                  debug_rate=None, debug_sample=1.0):
+    """Send every log record through the background queue
+
+    module_levels maps logger names (module names, e.g. 'database') to
+    levels. path=None writes to stderr. Calling it again reconfigures.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+        if path:
+            output = logging.FileHandler(path, encoding='utf-8')
+        else:
+            output = logging.StreamHandler(sys.stderr)
+        if fmt == 'json':
+            output.setFormatter(JSONFormatter())
+        else:
+            output.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        log_queue = queue.Queue(maxsize=queue_size)
+        handler = RequestQueueHandler(log_queue)
+        handler.addFilter(DebugLimiter(debug_rate, debug_sample))
+
+        root = logging.getLogger()
+        for old in list(root.handlers):
+            root.removeHandler(old)
+        root.addHandler(handler)
+        root.setLevel(level)
+        for name, module_level in (module_levels or {}).items():
+            logging.getLogger(name).setLevel(module_level)
+
+        _listener = logging.handlers.QueueListener(log_queue, output)
+        _listener.start()
+
+
+def shutdown():
+    """Write out queued records and stop the background thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(shutdown)
+
+
+def after_fork():
+    """Start a fresh queue and writer thread in a forked child process
+
+    The parent's writer thread isn't copied by fork(), and its queue may
+    have been copied mid-update, so neither is touched.
+    """
+    global _listener, _setup_lock
+    _listener = None
+    _setup_lock = threading.Lock()
+    setup_from_config()
+
+
+def setup_from_config():
+    """setup_logging() with the LOG_* settings from config.py"""
+    from config import (LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, LOG_FILE, LOG_QUEUE_SIZE, LOG_DEBUG_RATE,
+                        LOG_DEBUG_SAMPLE)
+    setup_logging(LOG_LEVEL, LOG_LEVELS, LOG_FORMAT, LOG_FILE, LOG_QUEUE_SIZE, LOG_DEBUG_RATE,
+                  LOG_DEBUG_SAMPLE)
+
+
+def collect_metrics():
+    """Dropped record counters for /metrics"""
+    with _dropped_lock:
+        dropped = dict(_dropped)
+    return [('nsos_log_dropped_total', 'counter', 'Log records dropped before output',
+             [({'reason': reason}, count) for reason, count in dropped.items()])]
+
+
+def new_request_id(incoming=None):
+    """Use the caller's X-Request-ID if it looks sane, else make one"""
+    if incoming and _VALID_REQUEST_ID.match(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def init_app(app):
+    """Give every request an ID (X-Request-ID in and out) for its log records"""
+    from flask import g, request
+
+    @app.before_request
+    def set_request_id():
+        request_id = new_request_id(request.headers.get(REQUEST_ID_HEADER))
+        g._request_id_token = request_id_var.set(request_id)
+
+    @app.after_request
+    def add_request_id_header(response):
+        request_id = request_id_var.get()
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+    @app.teardown_request
+    def clear_request_id(exception=None):
+        token = g.pop('_request_id_token', None)
+        if token is not None:
+            request_id_var.reset(token)
@@ -0,0 +1,133 @@
+# Exact / prefix lookup of criminals by CNIC and officers by badge number
+# Sorted in-memory index searched with bisect
+
+import bisect
+import re
+import threading
+import time
+
+_SEPARATORS = re.compile(r'[\s\-]+')
+
+
+def normalize_cnic(value):
+    """12345-1234567-1 -> 1234512345671"""
+    return _SEPARATORS.sub('', str(value or ''))
+
+
+def normalize_badge(value):
+    """Badge numbers compare without spaces/dashes and case-insensitively"""
+    return _SEPARATORS.sub('', str(value or '')).upper()
+
+
+class PrefixIndex:
+    """Sorted (key, record_id) list with a payload per record
+
+    A reload reads the rows and builds new lists without holding the lock
+    lookups use, then swaps them in: begin_load(), read rows, load(rows)
+    (or abort_load() if reading failed). load_lock keeps it to one reload
+    at a time.
+    """
+
+    def __init__(self, normalize):
+        self._normalize = normalize
+        self._keys = []  # sorted list of (key, record_id)
+        self._by_id = {}  # record_id -> (key, payload)
+        self._lock = threading.Lock()
+        self._changes = None  # put() / remove() calls made during a reload
+        self.load_lock = threading.Lock()
+        self.loaded = False
+        self.loaded_at = None
+
+    def is_stale(self, max_age):
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > max_age
+
+    def invalidate(self):
+        """Force a reload on next use"""
+        self.loaded_at = None
+
+    def begin_load(self):
+        """Start recording changes, call before reading the rows for load()"""
+        with self._lock:
+            self._changes = []
+
+    def abort_load(self):
+        with self._lock:
+            self._changes = None
+
+    def load(self, rows):
+        """Replace the whole index with (record_id, raw_key, payload) rows
+
+        Changes made since begin_load() are applied on top, so writes that
+        committed after the rows were read aren't lost.
+        """
+        by_id = {}
+        for record_id, raw_key, payload in rows:
+            by_id[record_id] = (self._normalize(raw_key), payload)
+        keys = sorted((key, record_id) for record_id, (key, payload) in by_id.items())
+        with self._lock:
+            for record_id, key, payload in self._changes or []:
+                _remove(keys, by_id, record_id)
+                if key is not None:
+                    _insert(keys, by_id, record_id, key, payload)
+            self._changes = None
+            self._keys = keys
+            self._by_id = by_id
+            self.loaded = True
+            self.loaded_at = time.monotonic()
+
+    def put(self, record_id, raw_key, payload):
+        """Add or update one record"""
+        key = self._normalize(raw_key)
+        with self._lock:
+            _remove(self._keys, self._by_id, record_id)
+            _insert(self._keys, self._by_id, record_id, key, payload)
+            if self._changes is not None:
+                self._changes.append((record_id, key, payload))
+
+    def remove(self, record_id):
+        with self._lock:
+            _remove(self._keys, self._by_id, record_id)
+            if self._changes is not None:
+                self._changes.append((record_id, None, None))
+
+    def exact(self, raw_key):
+        """Payloads whose key equals raw_key"""
+        key = self._normalize(raw_key)
+        results = []
+        if not key:
+            return results
+        with self._lock:
+            i = bisect.bisect_left(self._keys, (key,))
+            while i < len(self._keys) and self._keys[i][0] == key:
+                results.append(self._by_id[self._keys[i][1]][1])
+                i += 1
+        return results
+
+    def prefix(self, raw_key, limit=20):
+        """Payloads whose key starts with raw_key, in key order"""
+        key = self._normalize(raw_key)
+        results = []
+        if not key:
+            return results
+        with self._lock:
+            i = bisect.bisect_left(self._keys, (key,))
+            while i < len(self._keys) and len(results) < limit and self._keys[i][0].startswith(key):
+                results.append(self._by_id[self._keys[i][1]][1])
+                i += 1
+        return results
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def _insert(keys, by_id, record_id, key, payload):
+    bisect.insort(keys, (key, record_id))
+    by_id[record_id] = (key, payload)
+
+
+def _remove(keys, by_id, record_id):
+    old = by_id.pop(record_id, None)
+    if old is not None:
+        i = bisect.bisect_left(keys, (old[0], record_id))
+        if i < len(keys) and keys[i] == (old[0], record_id):
+            del keys[i]
@@ -0,0 +1,375 @@
+# Request / database timing and Prometheus-style metrics
+# Histograms and counters are kept in process; GET /metrics renders them
+# in the Prometheus text format. Database connections are wrapped at
+# connect time so every execute / fetch is timed without touching the
+# CRUD functions.
+
+import bisect
+import logging
+import sys
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+import logs
+from config import SLOW_QUERY_SECONDS
+from profiler import SamplingProfiler
+
+log = logging.getLogger(__name__)
+
+# Seconds; roughly doubling from 0.5ms to 10s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels (like prometheus_client's)"""
+
+    type = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, *labelvalues):
+        """Context manager that observes the time spent inside it"""
+        return _Timer(self, labelvalues)
+
+    def samples(self):
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        lines = []
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket'
+                             f'{_format_labels(self.labelnames, labels, ("le", _format_value(bound)))} '
+                             f'{cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {values[-2]!r}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {values[-1]}')
+        return lines
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    type = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+                for labels, value in sorted(values.items())]
+
+
+class _Timer:
+    __slots__ = ('metric', 'labelvalues', 'start')
+
+    def __init__(self, metric, labelvalues):
+        self.metric = metric
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metric.observe(time.perf_counter() - self.start, *self.labelvalues)
+
+
+class Registry:
+    """Metrics plus collectors (callbacks that report current values)"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collect):
+        """collect() returns [(name, type, help, [(labels dict, value), ...]), ...]"""
+        self._collectors.append(collect)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(metric.samples())
+        for collect in self._collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                log.error("Error collecting metrics: %s", e)
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    lines.append(f'{name}{_format_labels(list(labels), list(labels.values()))} '
+                                 f'{_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'nsos_request_seconds', 'Time to handle an HTTP request', ('method', 'endpoint', 'status'))
+DB_SECONDS = REGISTRY.histogram(
+    'nsos_db_seconds', 'Time spent in database calls by operation and calling function',
+    ('operation', 'function'))
+JSON_SECONDS = REGISTRY.histogram(
+    'nsos_json_seconds', 'Time to serialize JSON responses', ('endpoint',))
+BCRYPT_SECONDS = REGISTRY.histogram(
+    'nsos_bcrypt_seconds', 'Time spent hashing / verifying passwords', ('operation',),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+SLOW_QUERIES = REGISTRY.counter(
+    'nsos_slow_queries_total', 'Queries slower than SLOW_QUERY_SECONDS', ('function',))
+LOGIN_REJECTED = REGISTRY.counter(
+    'nsos_login_rejected_total', 'Logins refused before checking the password', ('reason',))
+AUTH_FAILURES = REGISTRY.counter(
+    'nsos_auth_failures_total', 'Session tokens refused by login_required', ('reason',))
+REGISTRY.register_collector(logs.collect_metrics)
+
+
+# Which function a database call belongs to: the first frame outside the
+# instrumentation and connection plumbing
+_PLUMBING_FILES = set()
+
+
+def add_plumbing_file(path):
+    """Frames from this file are skipped when naming the calling function"""
+    _PLUMBING_FILES.add(path)
+
+
+add_plumbing_file(__file__)
+
+
+def calling_function():
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename in _PLUMBING_FILES:
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else '?'
+
+
+class db_timer:
+    """Time a block as one database operation of the calling function
+
+        with metrics.db_timer('convert'):
+            cases = [_case_row_to_dict(row) for row in rows]
+    """
+
+    __slots__ = ('operation', 'start')
+
+    def __init__(self, operation):
+        self.operation = operation
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        DB_SECONDS.observe(time.perf_counter() - self.start, self.operation, calling_function())
+
+
+def _statement(sql):
+    return ' '.join(str(sql).split())[:300]
+
+
+class InstrumentedCursor:
+    """Cursor wrapper that times execute and fetch calls"""
+
+    def __init__(self, cursor):
+        object.__setattr__(self, '_cursor', cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        # e.g. fast_executemany must reach the real cursor
+        setattr(self._cursor, name, value)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def _execute(self, method, sql, args):
+        start = time.perf_counter()
+        try:
+            method(sql, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            function = calling_function()
+            DB_SECONDS.observe(elapsed, 'execute', function)
+            if SLOW_QUERY_SECONDS is not None and elapsed >= SLOW_QUERY_SECONDS:
+                SLOW_QUERIES.inc(function)
+                log.warning("Slow query in %s (%.3fs): %s", function, elapsed, _statement(sql),
+                            extra={'function': function, 'seconds': round(elapsed, 4)})
+        return self
+
+    def execute(self, sql, *args):
+        return self._execute(self._cursor.execute, sql, args)
+
+    def executemany(self, sql, *args):
+        return self._execute(self._cursor.executemany, sql, args)
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            DB_SECONDS.observe(time.perf_counter() - start, 'fetch', calling_function())
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args):
+        return self._fetch(self._cursor.fetchmany, *args)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def nextset(self):
+        return self._fetch(self._cursor.nextset)
+
+
+class InstrumentedConnection:
+    """Connection wrapper whose cursors are InstrumentedCursors"""
+
+    def __init__(self, conn):
+        object.__setattr__(self, '_conn', conn)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def cursor(self, *args):
+        return InstrumentedCursor(self._conn.cursor(*args))
+
+
+def instrument_connect(connect):
+    """Wrap a connection factory so connects are timed and connections instrumented"""
+    def instrumented_connect():
+        with DB_SECONDS.time('connect', 'pool'):
+            conn = connect()
+        return InstrumentedConnection(conn)
+    return instrumented_connect
+
+
+def _endpoint_label():
+    # The URL rule, not the path, so IDs don't create new series
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, timing every JSON response it builds"""
+
+    def response(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            label = _endpoint_label() if has_request_context() else 'none'
+            JSON_SECONDS.observe(time.perf_counter() - start, label)
+
+
+def init_app(app, metrics_path='/metrics', profile_threshold=None, profile_dir=None,
+             profile_interval=0.005):
+    """Time every request, serve metrics_path and optionally profile slow requests
+
+    With profile_threshold set (seconds), requests at least that slow get
+    their sampled stacks written to profile_dir.
+    """
+    app.json_provider_class = TimedJSONProvider
+    app.json = TimedJSONProvider(app)
+
+    sampler = None
+    if profile_threshold is not None:
+        sampler = SamplingProfiler(profile_threshold, profile_dir, profile_interval)
+        sampler.start()
+        app.extensions['nsos_profiler'] = sampler
+
+    @app.before_request
+    def start_timer():
+        g._request_start = time.perf_counter()
+        if sampler:
+            sampler.start_request()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('_request_start', None)
+        if start is not None:
+            elapsed = time.perf_counter() - start
+            endpoint = _endpoint_label()
+            REQUEST_SECONDS.observe(elapsed, request.method, endpoint, response.status_code)
+            if sampler:
+                path = sampler.end_request(elapsed, f'{request.method} {endpoint}')
+                if path:
+                    log.warning("Slow request %s %s (%.3fs), profile written to %s", request.method,
+                                endpoint, elapsed, path,
+                                extra={'seconds': round(elapsed, 4), 'profile': path})
+        return response
+
+    if metrics_path:
+        @app.route(metrics_path)
+        def metrics_endpoint():
+            return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,144 @@
+# Versioned schema migrations
+# Applies database/migrations/NNN_name.sql in order and records each one
+# in the schema_version table
+
+import hashlib
+import os
+import re
+from datetime import datetime
+
+import pyodbc
+
+from config import get_connection_string
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'migrations')
+
+FILENAME_RE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+# Batches are separated by GO on its own line, like in SSMS / sqlcmd
+GO_RE = re.compile(r'^\s*GO\s*;?\s*$', re.IGNORECASE | re.MULTILINE)
+
+VERSION_TABLE_SQL = """
+    IF OBJECT_ID('schema_version', 'U') IS NULL
+        CREATE TABLE schema_version (
+            version INT PRIMARY KEY,
+            name NVARCHAR(200) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at DATETIME NOT NULL
+        );
+"""
+
+
+class Migration:
+    """One migration file"""
+
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def read(self):
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+
+    @property
+    def checksum(self):
+        return hashlib.sha256(self.read().encode('utf-8')).hexdigest()
+
+    def batches(self):
+        return [batch.strip() for batch in GO_RE.split(self.read()) if batch.strip()]
+
+
+def list_migrations(folder=MIGRATIONS_DIR):
+    """All migration files, ordered by version"""
+    migrations = []
+    seen = {}
+    for file_name in sorted(os.listdir(folder)):
+        match = FILENAME_RE.match(file_name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in seen:
+            raise ValueError(f'Duplicate migration version {version}: {seen[version]} and {file_name}')
+        seen[version] = file_name
+        migrations.append(Migration(version, match.group(2), os.path.join(folder, file_name)))
+    migrations.sort(key=lambda m: m.version)
+    return migrations
+
+
+def connect():
+    """Dedicated connection for DDL (not from the app's pool)"""
+    conn = pyodbc.connect(get_connection_string())
+    conn.autocommit = False
+    return conn
+
+
+def ensure_version_table(conn):
+    cursor = conn.cursor()
+    cursor.execute(VERSION_TABLE_SQL)
+    conn.commit()
+
+
+def applied_versions(conn):
+    """{version: (name, checksum, applied_at)} of migrations already applied"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT version, name, checksum, applied_at FROM schema_version")
+    return {row[0]: (row[1], row[2], row[3]) for row in cursor.fetchall()}
+
+
+def status(conn, migrations=None):
+    """List of (migration, state) where state is applied, pending or changed
+
+    changed means the file was edited after it was applied.
+    """
+    migrations = migrations if migrations is not None else list_migrations()
+    ensure_version_table(conn)
+    applied = applied_versions(conn)
+    result = []
+    for migration in migrations:
+        if migration.version not in applied:
+            result.append((migration, 'pending'))
+        elif applied[migration.version][1] != migration.checksum:
+            result.append((migration, 'changed'))
+        else:
+            result.append((migration, 'applied'))
+    return result
+
+
+def apply_migration(conn, migration):
+    """Run all batches of one migration and record it, in one transaction"""
+    cursor = conn.cursor()
+    try:
+        for batch in migration.batches():
+            cursor.execute(batch)
+            # Drain result sets / row counts so errors in later statements surface
+            while cursor.nextset():
+                pass
+        cursor.execute("""
+            INSERT INTO schema_version (version, name, checksum, applied_at)
+            VALUES (?, ?, ?, ?)
+        """, (migration.version, migration.name, migration.checksum, datetime.now()))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def migrate(conn, target=None, on_apply=None):
+    """Apply pending migrations up to target (default: all)
+
+    on_apply(migration) is called before each one. Returns the list of
+    applied migrations. Stops at the first failure (that migration is
+    rolled back, earlier ones stay applied).
+    """
+    applied = []
+    for migration, state in status(conn):
+        if target is not None and migration.version > target:
+            break
+        if state != 'pending':
+            continue
+        if on_apply:
+            on_apply(migration)
+        apply_migration(conn, migration)
+        applied.append(migration)
+    return applied
@@ -0,0 +1,97 @@
+# Keyset (cursor) pagination helpers for list endpoints
+# A cursor is the sort key of the last row on the previous page
+
+import base64
+import json
+from datetime import datetime, date, time
+
+from config import API_PAGE_SIZE, API_MAX_PAGE_SIZE
+
+
+# Converters for cursor values and date filters
+# (accept the str() form the CRUD functions put in JSON)
+def parse_datetime(value):
+    return datetime.fromisoformat(_trim_fraction(str(value)))
+
+
+def parse_date(value):
+    return date.fromisoformat(str(value)[:10])
+
+
+def parse_time(value):
+    return time.fromisoformat(_trim_fraction(str(value)))
+
+
+def _trim_fraction(value):
+    # SQL Server can return 7 fractional digits, Python only parses 6
+    if '.' in value:
+        head, fraction = value.rsplit('.', 1)
+        return head + '.' + fraction[:6]
+    return value
+
+
+def encode_cursor(values):
+    """Encode sort key values as an opaque URL-safe token"""
+    raw = json.dumps([str(v) if v is not None else None for v in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, key):
+    """Decode a cursor token for key ((field, converter), ...)
+
+    Returns a list of values, or None when there is no cursor.
+    Raises ValueError for a malformed token.
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(key):
+        raise ValueError('Invalid cursor')
+    try:
+        return [convert(value) for (field, convert), value in zip(key, values)]
+    except (TypeError, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def get_limit(value):
+    """Clamp a ?limit= value to 1..API_MAX_PAGE_SIZE"""
+    if value is None:
+        return API_PAGE_SIZE
+    return max(1, min(int(value), API_MAX_PAGE_SIZE))
+
+
+def page_args(args, key):
+    """Read limit and cursor from request args, returns (limit, after)"""
+    limit = get_limit(args.get('limit', type=int))
+    after = decode_cursor(args.get('cursor'), key)
+    return limit, after
+
+
+def keyset_condition(columns, values, descending=False):
+    """WHERE clause that seeks past the row with the given sort key
+
+    For columns (a, b) descending this builds
+    (a < ?) OR (a = ? AND b < ?)
+    """
+    op = '<' if descending else '>'
+    parts = []
+    params = []
+    for i, column in enumerate(columns):
+        terms = [f"{c} = ?" for c in columns[:i]] + [f"{column} {op} ?"]
+        parts.append('(' + ' AND '.join(terms) + ')')
+        params.extend(values[:i + 1])
+    return '(' + ' OR '.join(parts) + ')', params
+
+
+def make_page(items, limit, key):
+    """Build the list response from up to limit + 1 fetched rows"""
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([last[field] for field, convert in key])
+    return {'items': items, 'next_cursor': next_cursor}
@@ -0,0 +1,155 @@
+# Password hashing off the request thread, and login throttling
+# bcrypt is deliberately slow (~0.25s at cost 12). Checks run in a small
+# process pool so a burst of logins can't take every request thread's
+# CPU; past max_pending queued checks, logins are turned away instead of
+# piling up. Token buckets per username and per client IP refuse
+# brute-force attempts before any hashing is done.
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+
+class HasherBusy(Exception):
+    """Too many password checks queued, try again shortly"""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+def hash_rounds(hashed):
+    """bcrypt cost of a stored hash ('$2b$12$...' -> 12), None if unreadable"""
+    parts = hashed.split('$')
+    try:
+        return int(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """bcrypt hashing / checking on a process pool
+
+    workers=0 runs them on the calling thread (scripts, tests).
+    """
+
+    def __init__(self, rounds=12, workers=2, max_pending=32):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._stats = {'checked': 0, 'hashed': 0, 'rehashed': 0, 'rejected': 0}
+
+    def _get_executor(self):
+        # Created on first use so worker processes only start when needed
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats['rejected'] += 1
+                raise HasherBusy()
+            self._pending += 1
+            future = self._get_executor().submit(func, *args)
+        try:
+            return future.result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def hash(self, password):
+        """bcrypt hash of password at the configured cost"""
+        hashed = self._run(_hash, password.encode('utf-8'), self.rounds)
+        with self._lock:
+            self._stats['hashed'] += 1
+        return hashed.decode('utf-8')
+
+    def check(self, password, hashed):
+        """True if password matches hashed, raises HasherBusy when the queue is full"""
+        valid = self._run(_check, password.encode('utf-8'), hashed.encode('utf-8'))
+        with self._lock:
+            self._stats['checked'] += 1
+        return valid
+
+    def needs_rehash(self, hashed):
+        """True if hashed was made with a different cost than configured"""
+        return hash_rounds(hashed) != self.rounds
+
+    def count_rehash(self):
+        with self._lock:
+            self._stats['rehashed'] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=self._pending, workers=self.workers,
+                        max_pending=self.max_pending, rounds=self.rounds)
+
+    def shutdown(self, wait=False):
+        """Cancel queued work; wait=True also waits for the processes to exit"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+class TokenBucket:
+    """Per-key token buckets: burst attempts at once, refilled per_minute
+
+    Only the max_keys most recently seen keys are remembered.
+    """
+
+    def __init__(self, burst, per_minute, max_keys=10000):
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, last refill)
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """Use one token; returns 0 if allowed, else seconds until one is free"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                wait = 0
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate if self.rate else float('inf')
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class LoginThrottle:
+    """Login attempt limits per username and per client IP"""
+
+    def __init__(self, user_burst, user_per_minute, ip_burst, ip_per_minute):
+        self.users = TokenBucket(user_burst, user_per_minute)
+        self.ips = TokenBucket(ip_burst, ip_per_minute)
+        self.enabled = True
+
+    def check(self, username, ip):
+        """None if the attempt may go ahead, else (reason, seconds to wait)"""
+        if not self.enabled:
+            return None
+        wait = self.ips.take(ip or '')
+        if wait:
+            return 'ip', wait
+        wait = self.users.take(username.lower())
+        if wait:
+            return 'username', wait
+        return None
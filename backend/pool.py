@@ -0,0 +1,271 @@
+# Connection pool for database connections
+# Keeps pyodbc connections open and hands them out instead of reconnecting
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection is free before the checkout timeout"""
+    pass
+
+
+class _Entry:
+    """One open connection owned by the pool"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class PooledConnection:
+    """Connection handle - close() gives the connection back to the pool"""
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    def __getattr__(self, name):
+        if self._entry is None:
+            raise RuntimeError('Connection already returned to pool')
+        return getattr(self._entry.raw, name)
+
+    def close(self):
+        """Return connection to pool (safe to call more than once)"""
+        entry = self._entry
+        if entry is not None:
+            self._entry = None
+            self._pool.release(entry)
+
+
+class BorrowedConnection:
+    """Handle to a connection owned by someone else (e.g. the current request)
+
+    close() only rolls back uncommitted work, the owner releases the
+    connection back to the pool.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        try:
+            self._conn.rollback()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of database connections"""
+
+    def __init__(self, connect, min_size=1, max_size=10, idle_timeout=300,
+                 checkout_timeout=10, ping_interval=30):
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition()
+        self._idle = []  # most recently used at the end
+        self._size = 0  # open connections, idle + in use
+        self._in_use = 0
+        self._closed = False
+
+        # Counters for stats()
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._reconnects = 0
+
+    # Opening / closing raw connections
+    def _new_entry(self):
+        entry = _Entry(self._connect())
+        with self._cond:
+            self._created += 1
+        return entry
+
+    def _close_raw(self, entry):
+        try:
+            entry.raw.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, entry):
+        """Ping connections that sat idle for a while before handing them out"""
+        if time.monotonic() - entry.last_used < self.ping_interval:
+            return True
+        try:
+            cursor = entry.raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _take_expired_locked(self):
+        """Remove idle connections past idle_timeout (keeps min_size open)"""
+        expired = []
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size:
+            oldest = self._idle[0]
+            if now - oldest.last_used < self.idle_timeout:
+                break
+            self._idle.pop(0)
+            self._size -= 1
+            self._discarded += 1
+            expired.append(oldest)
+        return expired
+
+    # Checkout / checkin
+    def acquire(self, timeout=None):
+        """Check out a connection, waiting up to timeout seconds for one"""
+        if timeout is None:
+            timeout = self.checkout_timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+        entry = None
+        expired = []
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout('Connection pool is closed')
+                expired.extend(self._take_expired_locked())
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1  # reserve a slot, connect outside the lock
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(f'No free connection after {timeout}s '
+                                      f'({self._in_use} in use)')
+                waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            self._checkouts += 1
+            if waited:
+                wait_time = time.monotonic() - start
+                self._waits += 1
+                self._wait_total += wait_time
+                self._wait_max = max(self._wait_max, wait_time)
+
+        for old in expired:
+            self._close_raw(old)
+
+        try:
+            if entry is None:
+                entry = self._new_entry()
+            elif not self._is_healthy(entry):
+                # Stale connection - drop it and reconnect in the same slot
+                self._close_raw(entry)
+                entry = None
+                entry = self._new_entry()
+                with self._cond:
+                    self._reconnects += 1
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        return PooledConnection(self, entry)
+
+    def release(self, entry):
+        """Return a connection to the pool, discarding it if it is broken"""
+        discard = False
+        try:
+            # Same as pyodbc close(): uncommitted work is thrown away
+            entry.raw.rollback()
+        except Exception:
+            discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._size -= 1
+                self._discarded += 1
+            else:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+                entry = None
+            self._cond.notify()
+
+        if entry is not None:
+            self._close_raw(entry)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager that checks out a connection and returns it"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # Maintenance
+    def warm(self):
+        """Open connections up to min_size"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                entry = self._new_entry()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._idle.insert(0, entry)
+                self._cond.notify()
+
+    def close_all(self):
+        """Close idle connections and stop handing out new ones"""
+        with self._cond:
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close_raw(entry)
+
+    def stats(self):
+        """Current pool usage and wait counters"""
+        with self._cond:
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'wait_time_total': round(self._wait_total, 6),
+                'wait_time_max': round(self._wait_max, 6),
+                'wait_time_avg': round(self._wait_total / self._waits, 6) if self._waits else 0.0,
+                'timeouts': self._timeouts,
+                'created': self._created,
+                'discarded': self._discarded,
+                'reconnects': self._reconnects,
+                'closed': self._closed
+            }
@@ -0,0 +1,336 @@
+# Pre-forking HTTP server for production (python serve.py)
+# A master process opens the listening socket, optionally imports the app
+# and fills its caches (preload), then forks worker processes that serve
+# it with a pool of threads each. Preloaded code and caches stay shared
+# between the workers (copy-on-write). The master only manages workers:
+#   SIGHUP          start a new set of workers; the old set stops once
+#                   the new one is serving, finishing its requests first
+#   SIGTERM/SIGINT  workers stop accepting, finish their requests, exit
+# A worker leaves after max_requests requests and the master replaces it.
+# Connections keep queueing on the shared socket meanwhile, so restarts
+# and reloads don't drop requests. Needs os.fork (Linux, macOS).
+
+import gc
+import logging
+import os
+import random
+import select
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+log = logging.getLogger(__name__)
+
+# Exit status of a worker that failed before serving
+BOOT_ERROR = 3
+
+
+class _RequestHandler(WSGIRequestHandler):
+    # One request per connection: idle keep-alive connections would hold
+    # request threads and delay graceful stops (a front proxy can keep
+    # connections to clients alive)
+    protocol_version = 'HTTP/1.0'
+
+    def log_request(self, code='-', size='-'):
+        # No access log: query strings carry search terms (names, CNICs);
+        # request counts and timings are on /metrics
+        pass
+
+
+class WorkerServer(BaseWSGIServer):
+    """WSGI server on an already listening socket, with a fixed number of threads
+
+    While every thread is busy it stops accepting, leaving new connections
+    to the other workers. stop() lets the requests in progress finish;
+    after max_requests requests (0: no limit) the server stops itself.
+    """
+
+    multithread = True
+    multiprocess = True
+
+    def __init__(self, app, sock, threads=8, max_requests=0):
+        host, port = sock.getsockname()[:2]
+        super().__init__(host, port, app, handler=_RequestHandler, fd=sock.fileno())
+        self.threads = threads
+        self.max_requests = max_requests
+        self.handled = 0
+        self._slots = threading.BoundedSemaphore(threads)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='request')
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def process_request(self, request, client_address):
+        self._slots.acquire()
+        self._executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+        with self._lock:
+            self.handled += 1
+            done = self.max_requests and self.handled == self.max_requests
+        if done:
+            log.info("Worker %d served %d requests, restarting", os.getpid(), self.handled)
+            self.stop()
+
+    def handle_error(self, request, client_address):
+        log.exception("Error handling a request from %s", client_address[0])
+
+    def stop(self):
+        """Stop accepting connections, safe to call from a signal handler"""
+        with self._lock:
+            if self._stopping:
+                return
+            self._stopping = True
+        # shutdown() waits for serve_forever() to return, so not on its thread
+        threading.Thread(target=self.shutdown, name='worker-stop', daemon=True).start()
+
+    def serve(self):
+        """Serve until stop(), then wait for the requests in progress"""
+        self.serve_forever()
+        self._executor.shutdown(wait=True)
+
+
+class _Worker:
+    def __init__(self, generation):
+        self.generation = generation
+        self.booted = False
+        self.kill_at = None  # set once asked to stop
+
+
+class PreforkServer:
+    """Master process forking and supervising the workers
+
+    load_app() returns the WSGI app; with preload it runs once in the
+    master, otherwise in each worker (so a reload also loads new code).
+    Hooks: on_preload(app) in the master after loading, post_fork() in a
+    worker right after the fork, worker_init(app) before it serves and
+    worker_exit(app) after its last request.
+    """
+
+    def __init__(self, load_app, host='0.0.0.0', port=5000, workers=4, threads=8, max_requests=0,
+                 max_requests_jitter=0, graceful_timeout=30, preload=True, backlog=2048,
+                 boot_timeout=60, on_preload=None, post_fork=None, worker_init=None, worker_exit=None):
+        self.load_app = load_app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.preload = preload
+        self.backlog = backlog
+        self.boot_timeout = boot_timeout
+        self.on_preload = on_preload
+        self.post_fork = post_fork
+        self.worker_init = worker_init
+        self.worker_exit = worker_exit
+        self.app = None
+        self._sock = None
+        self._workers = {}  # pid -> _Worker
+        self._generation = 0
+        self._reload_started = None
+        self._stopping = False
+        self._spawn_after = 0
+
+    def run(self):
+        """Bind, fork the workers and supervise them until SIGTERM / SIGINT"""
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        self._sock = socket.create_server((self.host, self.port), family=family, backlog=self.backlog)
+        # Every worker waits on this socket; those that lose the race for a
+        # connection must not block in accept()
+        self._sock.setblocking(False)
+        if self.preload:
+            self.app = self.load_app()
+            if self.on_preload:
+                self.on_preload(self.app)
+            # Keep the collector from writing to (and so copying) the shared pages
+            gc.freeze()
+
+        self._wake_r, self._wake_w = os.pipe()
+        self._ready_r, self._ready_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        signal.set_wakeup_fd(self._wake_w)
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            # The handlers do nothing: the wakeup fd tells the loop which signal came
+            signal.signal(signum, lambda signum, frame: None)
+
+        log.info("Master %d listening on %s:%d with %d workers x %d threads%s", os.getpid(),
+                 self.host, self.port, self.workers, self.threads, ' (preloaded)' if self.preload else '')
+        try:
+            while not self._stopping or self._workers:
+                self._wait()
+                self._reap()
+                if not self._stopping:
+                    self._spawn_missing()
+                    self._retire_old_workers()
+                self._kill_overdue()
+        finally:
+            signal.set_wakeup_fd(-1)
+            self._sock.close()
+        log.info("Master %d stopped", os.getpid())
+
+    # Master loop
+
+    def _wait(self):
+        readable, _, _ = select.select([self._wake_r, self._ready_r], [], [], 1.0)
+        if self._ready_r in readable:
+            # Workers write their pid once they serve (a write this small is atomic)
+            for pid in os.read(self._ready_r, 4096).split():
+                worker = self._workers.get(int(pid))
+                if worker is not None:
+                    worker.booted = True
+        if self._wake_r in readable:
+            try:
+                signals = os.read(self._wake_r, 4096)
+            except BlockingIOError:
+                signals = b''
+            for signum in signals:
+                if signum in (signal.SIGTERM, signal.SIGINT):
+                    self._stop()
+                elif signum == signal.SIGHUP:
+                    self._reload()
+
+    def _reload(self):
+        if self._stopping:
+            return
+        log.info("Reloading: starting %d new workers", self.workers)
+        self._generation += 1
+        self._reload_started = time.monotonic()
+
+    def _stop(self):
+        if self._stopping:
+            return
+        log.info("Stopping %d workers", len(self._workers))
+        self._stopping = True
+        for pid in list(self._workers):
+            self._stop_worker(pid)
+
+    def _stop_worker(self, pid):
+        worker = self._workers[pid]
+        if worker.kill_at is None:
+            worker.kill_at = time.monotonic() + self.graceful_timeout
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self._workers.pop(pid, None)
+            if worker is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if worker.kill_at is not None:
+                log.info("Worker %d stopped (exit status %d)", pid, code)
+            elif not worker.booted:
+                log.error("Worker %d failed to start (exit status %d)", pid, code)
+                # Don't fork in a tight loop while e.g. the app can't be imported
+                self._spawn_after = time.monotonic() + 1
+            elif code != 0:
+                log.warning("Worker %d died (exit status %d)", pid, code)
+
+    def _spawn_missing(self):
+        current = sum(1 for worker in self._workers.values() if worker.generation == self._generation)
+        for _ in range(self.workers - current):
+            if time.monotonic() < self._spawn_after:
+                return
+            self._spawn()
+
+    def _retire_old_workers(self):
+        old = [pid for pid, worker in self._workers.items()
+               if worker.generation != self._generation and worker.kill_at is None]
+        if not old:
+            return
+        new = [worker for worker in self._workers.values() if worker.generation == self._generation]
+        if len(new) >= self.workers and all(worker.booted for worker in new):
+            log.info("New workers serving, stopping %d old workers", len(old))
+            for pid in old:
+                self._stop_worker(pid)
+        elif self._reload_started is not None and time.monotonic() - self._reload_started > self.boot_timeout:
+            # Keep serving with the old workers until the new ones come up
+            log.error("New workers not serving after %ds, old workers kept", self.boot_timeout)
+            self._reload_started = None
+
+    def _kill_overdue(self):
+        now = time.monotonic()
+        for pid, worker in self._workers.items():
+            if worker.kill_at is not None and now >= worker.kill_at:
+                log.warning("Worker %d still busy after %ds, killing it", pid, self.graceful_timeout)
+                worker.kill_at = float('inf')
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    # Worker process
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self._workers[pid] = _Worker(self._generation)
+            return
+        status = BOOT_ERROR
+        try:
+            status = self._run_worker()
+        except BaseException:
+            log.exception("Worker %d failed", os.getpid())
+        finally:
+            os._exit(status)
+
+    def _run_worker(self):
+        signal.set_wakeup_fd(-1)
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+        os.close(self._ready_r)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        # Until it serves, a stopped worker has nothing to finish
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        # Ctrl-C reaches the whole process group; the master decides
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        if self.post_fork:
+            self.post_fork()
+
+        app = self.app if self.preload else self.load_app()
+        if self.worker_init:
+            self.worker_init(app)
+        max_requests = self.max_requests
+        if max_requests and self.max_requests_jitter:
+            max_requests += random.randint(0, self.max_requests_jitter)
+        server = WorkerServer(app, self._sock, self.threads, max_requests)
+        worker_pid = os.getpid()
+
+        def on_term(signum, frame):
+            if os.getpid() != worker_pid:
+                # Inherited by a process the worker forked (e.g. a ProcessPoolExecutor's)
+                signal.signal(signum, signal.SIG_DFL)
+                os.kill(os.getpid(), signum)
+                return
+            server.stop()
+
+        signal.signal(signal.SIGTERM, on_term)
+        os.write(self._ready_w, f'{os.getpid()}\n'.encode('ascii'))
+        os.close(self._ready_w)
+
+        server.serve()
+        if self.worker_exit:
+            self.worker_exit(app)
+        return 0
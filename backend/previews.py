@@ -0,0 +1,157 @@
+# Thumbnails and first-page previews for evidence files
+# Rendered in a process pool after upload and cached next to the blob:
+# blobs/ab/cd/<sha256>.preview.jpg
+
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+# Pillow renders images, PyMuPDF renders the first page of PDFs.
+# Either can be missing, the matching files just get no preview.
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+log = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+PDF_EXTENSIONS = {'pdf'}
+
+PREVIEW_SUFFIX = '.preview.jpg'
+
+
+def preview_kind(file_name):
+    """'image', 'pdf' or None if we can't preview this file type"""
+    ext = file_name.rsplit('.', 1)[-1].lower() if '.' in file_name else ''
+    if ext in IMAGE_EXTENSIONS and Image is not None:
+        return 'image'
+    if ext in PDF_EXTENSIONS and fitz is not None and Image is not None:
+        return 'pdf'
+    return None
+
+
+def render_preview(src_path, dest_path, kind, max_size):
+    """Write a JPEG preview of src_path to dest_path (runs in a worker process)
+
+    Writes to a temp file and renames it, so a preview is either complete
+    or absent and running this twice for the same file is harmless.
+    """
+    if os.path.exists(dest_path):
+        return dest_path
+    if kind == 'pdf':
+        with fitz.open(src_path) as doc:
+            page = doc.load_page(0)
+            # Render just large enough for the preview box
+            zoom = min(max_size[0] / page.rect.width, max_size[1] / page.rect.height, 2.0)
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            image = Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+    else:
+        image = Image.open(src_path)
+        # Let JPEG decoding downscale while reading (much faster for photos)
+        image.draft('RGB', max_size)
+        image = image.convert('RGB')
+
+    image.thumbnail(max_size)
+    tmp_path = f'{dest_path}.{uuid.uuid4().hex}.tmp'
+    try:
+        image.save(tmp_path, 'JPEG', quality=80, optimize=True)
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return dest_path
+
+
+class PreviewGenerator:
+    """Queues preview jobs on a process pool
+
+    At most max_pending jobs are queued or running; submit() returns False
+    when full and the preview is generated the next time it is requested.
+    """
+
+    def __init__(self, store, workers=2, max_pending=100, max_size=(320, 320)):
+        self.store = store
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_size = tuple(max_size)
+        self.available = Image is not None
+        self._executor = None
+        self._pending = set()  # sha256 of jobs queued or running
+        self._lock = threading.Lock()
+        self._stats = {'generated': 0, 'failed': 0, 'rejected': 0}
+
+    def preview_path(self, sha256):
+        return self.store.path_for(sha256) + PREVIEW_SUFFIX
+
+    def has_preview(self, sha256):
+        return os.path.exists(self.preview_path(sha256))
+
+    def is_pending(self, sha256):
+        with self._lock:
+            return sha256 in self._pending
+
+    def _get_executor(self):
+        # Created on first use so worker processes only start when needed
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def submit(self, sha256, file_name):
+        """Queue a preview for a stored file, returns True if queued or already done"""
+        kind = preview_kind(file_name)
+        if not kind or not self.store.exists(sha256):
+            return False
+        if self.has_preview(sha256):
+            return True
+        with self._lock:
+            if sha256 in self._pending:
+                return True
+            if len(self._pending) >= self.max_pending:
+                self._stats['rejected'] += 1
+                return False
+            self._pending.add(sha256)
+            try:
+                future = self._get_executor().submit(
+                    render_preview, self.store.path_for(sha256), self.preview_path(sha256),
+                    kind, self.max_size)
+            except Exception as e:
+                self._pending.discard(sha256)
+                log.error("Error queueing preview: %s", e)
+                return False
+        future.add_done_callback(lambda f: self._done(sha256, f))
+        return True
+
+    def _done(self, sha256, future):
+        with self._lock:
+            self._pending.discard(sha256)
+            if future.exception() is None:
+                self._stats['generated'] += 1
+            else:
+                self._stats['failed'] += 1
+        if future.exception() is not None:
+            log.error("Error generating preview for %s: %s", sha256, future.exception())
+
+    def delete(self, sha256):
+        """Remove a cached preview (when its blob is deleted)"""
+        path = self.preview_path(sha256)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending), workers=self.workers,
+                        max_pending=self.max_pending, available=self.available)
+
+    def shutdown(self, wait=False):
+        """Cancel queued work; wait=True also waits for the processes to exit"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,86 @@
+# Sampling profiler for slow requests
+# While enabled, a background thread samples the stack of every thread
+# that is handling a request. Requests slower than the threshold have
+# their samples written as folded stacks ("a;b;c count" per line), the
+# input format of flamegraph.pl, speedscope and inferno.
+
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+
+
+def _frame_name(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f'{module}:{code.co_name}'
+
+
+def fold_stack(frame):
+    """Stack of a frame, outermost call first, as 'module:function;...'"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SamplingProfiler:
+    """Samples request threads every interval seconds
+
+    start_request() / end_request() are called around each request;
+    end_request() writes the samples to out_dir when the request took at
+    least threshold seconds and returns the file path (else None).
+    """
+
+    def __init__(self, threshold, out_dir, interval=0.005, max_files=500):
+        self.threshold = threshold
+        self.out_dir = out_dir
+        self.interval = interval
+        self.max_files = max_files
+        self._active = {}  # thread id -> Counter of folded stacks
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._written = 0
+
+    def start(self):
+        # Also restarts the thread in a forked worker, where it doesn't exist
+        if self._thread is None or not self._thread.is_alive():
+            os.makedirs(self.out_dir, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, samples in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None and thread_id != own_id:
+                        samples[fold_stack(frame)] += 1
+
+    def start_request(self):
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+
+    def end_request(self, elapsed, label):
+        with self._lock:
+            samples = self._active.pop(threading.get_ident(), None)
+        if not samples or elapsed < self.threshold or self._written >= self.max_files:
+            return None
+        self._written += 1
+        safe_label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_') or 'request'
+        name = f'{datetime.now():%Y%m%d-%H%M%S}-{int(elapsed * 1000)}ms-{safe_label}.folded'
+        path = os.path.join(self.out_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in samples.most_common():
+                f.write(f'{stack} {count}\n')
+        return path
@@ -0,0 +1,62 @@
+# Estimated query plans for the hot queries in database.py
+# Used by check_query_plans.py to verify the indexes from the migrations are used
+
+from datetime import date, datetime, timedelta
+
+import database as db
+
+# Plan operators that read a whole table / index instead of seeking
+SCAN_OPERATORS = ('Table Scan', 'Clustered Index Scan', 'Index Scan')
+
+
+def hot_queries():
+    """(name, sql, params) for each hot query with representative parameters"""
+    today = date.today()
+    now = datetime.now()
+    page = 100
+    queries = [
+        ('officer list', db._officers_query(page)),
+        ('officers by unit', db._officers_query(page, unit_id=1)),
+        ('case list', db._cases_query(page)),
+        ('case list next page', db._cases_query(page, after=[1000000])),
+        ('cases by status', db._cases_query(page, status='Open')),
+        ('cases by officer', db._cases_query(page, filed_by=1)),
+        ('cases by suspect', db._cases_query(page, suspect_id=1)),
+        ('cases by unit', db._cases_query(page, unit_id=1)),
+        ('cases by filed date', db._cases_query(page, date_from=today - timedelta(days=30), date_to=today)),
+        ('case updates', db._case_updates_query(1, page)),
+        ('evidence list', db._evidence_query(page)),
+        ('evidence by case', db._evidence_query(page, case_id=1)),
+        ('evidence by content hash', ("SELECT COUNT(*) FROM Evidence WHERE sha256 = ?", ['0' * 64])),
+        ('duty list', db._duties_query(page)),
+        ('duties by officer', db._duties_query(page, officer_id=1)),
+        ('duties by date', db._duties_query(page, date_from=today, date_to=today + timedelta(days=7))),
+        ('audit log', db._audit_log_query(page)),
+        ('audit log since', db._audit_log_query(page, since=now - timedelta(days=1))),
+        ('audit by record', db._audit_log_query(page, table_name='Case', record_id=1)),
+    ]
+    return [(name, sql, params) for name, (sql, params) in queries]
+
+
+def explain(conn, sql, params):
+    """Estimated plan of one query as a list of text lines (the query is not run)"""
+    cursor = conn.cursor()
+    # SHOWPLAN must be the only statement in its batch
+    cursor.execute("SET SHOWPLAN_TEXT ON")
+    try:
+        cursor.execute(sql, params)
+        lines = []
+        while True:
+            if cursor.description:
+                lines.extend(row[0] for row in cursor.fetchall())
+            if not cursor.nextset():
+                break
+    finally:
+        cursor.execute("SET SHOWPLAN_TEXT OFF")
+    return lines
+
+
+def scans(plan_lines):
+    """Plan lines that scan instead of seek"""
+    return [line.strip() for line in plan_lines
+            if any(f'|--{op}(' in line or line.strip().startswith(f'{op}(') for op in SCAN_OPERATORS)]
@@ -1,30 +1,135 @@
 # Flask routes for NSOS API
 # All CRUD operations and endpoints
 
-from flask import Blueprint, request, jsonify, session, current_app
+from flask import Blueprint, request, jsonify, session, current_app, Response, stream_with_context, g
 from functools import wraps
+from werkzeug.utils import secure_filename
+import hashlib
+import logging
+import math
 import database as db
+import bulk_import
+import export
+import metrics
+import pagination
 import utils
-from datetime import datetime
+from datetime import datetime, timezone
+from config import (SEARCH_PAGE_SIZE, API_MAX_PAGE_SIZE, OPTIONS_LIMIT, UPLOAD_FOLDER,
+                    MAX_EVIDENCE_SIZE, UPLOAD_CHUNK_SIZE, UPLOAD_SESSION_TTL)
+from chunked_upload import UploadManager, UploadNotFound, UploadOffsetMismatch, UploadTooLarge
+from lookup import normalize_cnic, normalize_badge
+from passwords import HasherBusy
+from tokens import InvalidToken
 
 routes = Blueprint('routes', __name__)
+log = logging.getLogger(__name__)
+
+# Partial evidence uploads live under uploads/.partial
+uploads = UploadManager(UPLOAD_FOLDER, MAX_EVIDENCE_SIZE, UPLOAD_SESSION_TTL, utils.blob_store)
+
+
+def _request_token():
+    """Session token from 'Authorization: Bearer ...', else from the cookie session"""
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[7:].strip()
+    return session.get('token')
+
+
+def authenticated_admin():
+    """Claims of the request's valid, unrevoked token (see tokens.py), or None"""
+    token = _request_token()
+    if not token:
+        return None
+    try:
+        claims = utils.token_signer.verify(token)
+    except InvalidToken as e:
+        metrics.AUTH_FAILURES.inc(e.args[0])
+        return None
+    if db.is_token_revoked(claims['token_id']):
+        metrics.AUTH_FAILURES.inc('revoked')
+        return None
+    return claims
 
 
 # Decorator to check if user is logged in
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Check for admin_id in custom header (localStorage-based auth)
-        admin_id = request.headers.get('X-Admin-ID')
-        if admin_id:
-            return f(*args, **kwargs)
+        # Signature, expiry and revocation are checked in memory, no query
+        claims = authenticated_admin()
+        if claims is None:
+            return jsonify({'error': 'Not authenticated'}), 401
+        g.admin_id = claims['admin_id']
+        return f(*args, **kwargs)
+    return decorated_function
 
-        # Fallback: check Flask session (cookie-based auth)
-        if 'admin_id' in session:
-            return f(*args, **kwargs)
 
-        return jsonify({'error': 'Not authenticated'}), 401
-    return decorated_function
+# Decorator for GET endpoints whose response depends only on some tables
+def versioned(*tables):
+    """Add ETag / Last-Modified from the tables' versions and answer 304s
+
+    A matching If-None-Match (or If-Modified-Since) is answered before the
+    endpoint runs, so no query or JSON serialization happens.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            token, last_modified = db.get_table_versions(tables)
+            if token is None:
+                return f(*args, **kwargs)
+            etag = hashlib.sha1(f'{request.full_path}|{token}'.encode()).hexdigest()
+            if last_modified is not None:
+                # AuditLog stores local time; HTTP dates are UTC, whole seconds
+                last_modified = last_modified.astimezone(timezone.utc).replace(microsecond=0)
+
+            not_modified = False
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            elif request.if_modified_since and last_modified is not None:
+                not_modified = last_modified <= request.if_modified_since
+
+            if not_modified:
+                response = Response(status=304)
+            else:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Private data: the browser may keep it but must revalidate each time
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+
+def date_arg(name):
+    """Read an optional YYYY-MM-DD query param (ValueError if malformed)"""
+    value = request.args.get(name)
+    return pagination.parse_date(value) if value else None
+
+
+def case_filters():
+    """Case list filters from the query string (shared by list and export)"""
+    return {
+        'status': request.args.get('status'),
+        'filed_by': request.args.get('filed_by', type=int),
+        'suspect_id': request.args.get('suspect_id', type=int),
+        'unit_id': request.args.get('unit_id', type=int),
+        'date_from': date_arg('date_from'),
+        'date_to': date_arg('date_to')
+    }
+
+
+def evidence_filters():
+    """Evidence list filters from the query string (shared by list and export)"""
+    return {
+        'case_id': request.args.get('case_id', type=int),
+        'date_from': date_arg('date_from'),
+        'date_to': date_arg('date_to')
+    }
 
 
 # Authentication routes
@@ -37,41 +142,69 @@ def login():
     
     if not username or not password:
         return jsonify({'error': 'Username and password required'}), 400
+
+    # Throttled per username and per client IP before any hashing is done
+    throttled = utils.login_throttle.check(username, request.remote_addr)
+    if throttled:
+        reason, wait = throttled
+        metrics.LOGIN_REJECTED.inc(reason)
+        log.warning("Login throttled", extra={'reason': reason, 'ip': request.remote_addr})
+        response = jsonify({'error': 'Too many login attempts, try again later'})
+        response.headers['Retry-After'] = str(max(1, math.ceil(wait)))
+        return response, 429
     
     admin = db.get_admin_by_username(username)
     
-    # Debug: check if admin exists and password verification
+    # Usernames and passwords are never logged, only admin IDs
     if not admin:
-        print(f"Login: Admin '{username}' not found in database")
+        log.info("Login failed: unknown username")
         return jsonify({'error': 'Invalid credentials'}), 401
     
-    print(f"Login: Admin found - ID: {admin['admin_id']}, Username: {admin['username']}")
-    print(f"Login: Checking password...")
-    
-    password_valid = utils.check_password(password, admin['password_hash'])
-    print(f"Login: Password valid: {password_valid}")
+    try:
+        password_valid = utils.check_password(password, admin['password_hash'])
+    except HasherBusy:
+        metrics.LOGIN_REJECTED.inc('busy')
+        log.warning("Login rejected, password check queue full")
+        response = jsonify({'error': 'Server busy, try again shortly'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
     
     if password_valid:
+        issued = utils.token_signer.issue(admin['admin_id'])
+        # Hashes made with an older BCRYPT_ROUNDS are upgraded while we have the password
+        if utils.password_hasher.needs_rehash(admin['password_hash']):
+            try:
+                if db.update_admin_password(admin['admin_id'], utils.hash_password(password)):
+                    utils.password_hasher.count_rehash()
+                    log.info("Password rehashed", extra={'admin_id': admin['admin_id']})
+            except HasherBusy:
+                pass  # next login
         # Set session data (for cookie-based auth fallback)
-        session['admin_id'] = admin['admin_id']
+        session['token'] = issued['token']
         session['username'] = admin['username']
         session.permanent = True
         session.modified = True
 
-        # Return admin_id for localStorage-based auth
+        log.info("Login succeeded", extra={'admin_id': admin['admin_id']})
+        # Return the token for localStorage-based auth (sent as Authorization: Bearer)
         return jsonify({
             'message': 'Login successful',
             'username': admin['username'],
-            'admin_id': admin['admin_id']
+            'admin_id': admin['admin_id'],
+            'token': issued['token'],
+            'expires_at': issued['expires']
         }), 200
     else:
-        print(f"Login: Password check failed for user '{username}'")
+        log.info("Login failed: wrong password", extra={'admin_id': admin['admin_id']})
         return jsonify({'error': 'Invalid credentials'}), 401
 
 
 @routes.route('/api/logout', methods=['POST'])
 def logout():
-    """Logout - no auth required, just clear session"""
+    """Logout - no auth required, revokes the token if there is one and clears the session"""
+    claims = authenticated_admin()
+    if claims:
+        db.revoke_token(claims['token_id'], claims['admin_id'], claims['expires'])
     session.clear()
     return jsonify({'message': 'Logged out successfully'}), 200
 
@@ -80,30 +213,47 @@ def logout():
 def check_auth():
     """Check if user is authenticated"""
     # Always return 200, just indicate authentication status
-    # Debug: print session contents (remove in production)
-    print(f"Check-auth: Session contents: {dict(session)}")
-    print(f"Check-auth: admin_id in session: {'admin_id' in session}")
-    print(f"Check-auth: Request cookies: {list(request.cookies.keys())}")
+    claims = authenticated_admin()
+    if claims:
+        log.debug("Check-auth: authenticated", extra={'admin_id': claims['admin_id']})
+        return jsonify({'authenticated': True, 'username': session.get('username'),
+                        'admin_id': claims['admin_id'], 'expires_at': claims['expires']}), 200
     
-    if 'admin_id' in session:
-        print(f"Check-auth: User authenticated - {session.get('username')}")
-        return jsonify({'authenticated': True, 'username': session.get('username')}), 200
-    
-    print(f"Check-auth: User NOT authenticated - no admin_id in session")
-    return jsonify({'authenticated': False, 'debug': 'No admin_id in session'}), 200
+    log.debug("Check-auth: no valid token")
+    return jsonify({'authenticated': False}), 200
 
 
 # Officer routes
 @routes.route('/api/officers', methods=['GET'])
 @login_required
+@versioned('Officer', 'Unit')
 def get_officers():
-    """Get all officers"""
-    officers = db.get_all_officers()
-    return jsonify(officers), 200
+    """Get officers (paginated with ?limit= and ?cursor=)"""
+    try:
+        limit, after = pagination.page_args(request.args, db.OFFICER_PAGE_KEY)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    officers = db.get_all_officers(limit + 1, after, unit_id=request.args.get('unit_id', type=int))
+    return jsonify(pagination.make_page(officers, limit, db.OFFICER_PAGE_KEY)), 200
+
+
+@routes.route('/api/officers/options', methods=['GET'])
+@login_required
+@versioned('Officer')
+def get_officer_options():
+    """Slim officer list (officer_id, name) for select boxes"""
+    return jsonify(db.get_officer_options()), 200
+
+
+def options_args():
+    """?q= and ?limit= of an options endpoint"""
+    limit = max(1, min(request.args.get('limit', OPTIONS_LIMIT, type=int), API_MAX_PAGE_SIZE))
+    return request.args.get('q', '').strip() or None, limit
 
 
 @routes.route('/api/officers/<int:officer_id>', methods=['GET'])
 @login_required
+@versioned('Officer', 'Unit')
 def get_officer(officer_id):
     """Get officer by ID"""
     officer = db.get_officer_by_id(officer_id)
@@ -167,14 +317,29 @@ def delete_officer(officer_id):
 # Criminal routes
 @routes.route('/api/criminals', methods=['GET'])
 @login_required
+@versioned('Criminal')
 def get_criminals():
-    """Get all criminals"""
-    criminals = db.get_all_criminals()
-    return jsonify(criminals), 200
+    """Get criminals (paginated with ?limit= and ?cursor=)"""
+    try:
+        limit, after = pagination.page_args(request.args, db.CRIMINAL_PAGE_KEY)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    criminals = db.get_all_criminals(limit + 1, after)
+    return jsonify(pagination.make_page(criminals, limit, db.CRIMINAL_PAGE_KEY)), 200
+
+
+@routes.route('/api/criminals/options', methods=['GET'])
+@login_required
+@versioned('Criminal')
+def get_criminal_options():
+    """Slim criminal list (criminal_id, name, cnic) for select boxes: newest, or matching ?q="""
+    query, limit = options_args()
+    return jsonify(db.get_criminal_options(query, limit)), 200
 
 
 @routes.route('/api/criminals/<int:criminal_id>', methods=['GET'])
 @login_required
+@versioned('Criminal')
 def get_criminal(criminal_id):
     """Get criminal by ID"""
     criminal = db.get_criminal_by_id(criminal_id)
@@ -234,14 +399,30 @@ def delete_criminal(criminal_id):
 # Case routes
 @routes.route('/api/cases', methods=['GET'])
 @login_required
+@versioned('Case', 'Officer', 'Criminal', 'Unit')
 def get_cases():
-    """Get all cases"""
-    cases = db.get_all_cases()
-    return jsonify(cases), 200
+    """Get cases (paginated, filter by status, filed_by, suspect_id, unit_id, date_from, date_to)"""
+    try:
+        limit, after = pagination.page_args(request.args, db.CASE_PAGE_KEY)
+        filters = case_filters()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    cases = db.get_all_cases(limit + 1, after, **filters)
+    return jsonify(pagination.make_page(cases, limit, db.CASE_PAGE_KEY)), 200
+
+
+@routes.route('/api/cases/options', methods=['GET'])
+@login_required
+@versioned('Case', 'Officer')
+def get_case_options():
+    """Slim case list (case_id, case_number, title) for select boxes: newest, or matching ?q="""
+    query, limit = options_args()
+    return jsonify(db.get_case_options(query, limit)), 200
 
 
 @routes.route('/api/cases/<int:case_id>', methods=['GET'])
 @login_required
+@versioned('Case', 'Officer', 'Criminal')
 def get_case(case_id):
     """Get case by ID"""
     case = db.get_case_by_id(case_id)
@@ -250,13 +431,31 @@ def get_case(case_id):
     return jsonify({'error': 'Case not found'}), 404
 
 
+@routes.route('/api/cases/<int:case_id>/full', methods=['GET'])
+@login_required
+@versioned('Case', 'CaseUpdate', 'Evidence', 'Officer', 'Criminal', 'Unit')
+def get_case_full(case_id):
+    """Case with filing officer, suspect, first page of updates and evidence
+
+    Updates are paged like /api/cases/<id>/updates (?limit=, ?cursor=);
+    fetch further pages from that endpoint.
+    """
+    try:
+        limit, after = pagination.page_args(request.args, db.CASE_UPDATE_PAGE_KEY)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    details = db.get_case_full(case_id, limit + 1, after)
+    if not details:
+        return jsonify({'error': 'Case not found'}), 404
+    details['updates'] = pagination.make_page(details['updates'], limit, db.CASE_UPDATE_PAGE_KEY)
+    return jsonify(details), 200
+
+
 @routes.route('/api/cases', methods=['POST'])
 @login_required
 def create_case():
     """Create new case"""
     data = request.get_json()
-    print(f"=== CREATE CASE DEBUG ===")
-    print(f"Received data: {data}")
 
     case_number = data.get('case_number')
     title = data.get('title')
@@ -266,27 +465,19 @@ def create_case():
     suspect_id = data.get('suspect_id')
     status = data.get('status', 'Open')
 
-    print(f"case_number: {case_number}, type: {type(case_number)}")
-    print(f"title: {title}, type: {type(title)}")
-    print(f"filed_date: {filed_date}, type: {type(filed_date)}")
-    print(f"filed_by: {filed_by}, type: {type(filed_by)}")
-    print(f"suspect_id: {suspect_id}, type: {type(suspect_id)}")
-    print(f"status: {status}, type: {type(status)}")
-
     if not case_number or not title or not filed_date or not filed_by:
-        print(f"Validation failed - missing required fields")
+        # Field names only, the values may identify people
+        log.debug("Create case rejected, missing required fields",
+                  extra={'fields': sorted(key for key, value in data.items() if value)})
         return jsonify({'error': 'Case number, title, filed date, and filed by are required'}), 400
 
     try:
         case_id = db.create_case(case_number, title, description, filed_date, filed_by, suspect_id, status)
-        print(f"db.create_case returned: {case_id}")
         if case_id:
             return jsonify({'message': 'Case created', 'case_id': case_id}), 201
         return jsonify({'error': 'Failed to create case - database returned None'}), 500
     except Exception as e:
-        print(f"Exception in create_case: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error creating case: %s", e)
         return jsonify({'error': f'Failed to create case: {str(e)}'}), 500
 
 
@@ -325,10 +516,15 @@ def delete_case(case_id):
 # Case update routes
 @routes.route('/api/cases/<int:case_id>/updates', methods=['GET'])
 @login_required
+@versioned('CaseUpdate', 'Officer')
 def get_case_updates(case_id):
-    """Get all updates for a case"""
-    updates = db.get_case_updates(case_id)
-    return jsonify(updates), 200
+    """Get updates for a case, newest first (paginated with ?limit= and ?cursor=)"""
+    try:
+        limit, after = pagination.page_args(request.args, db.CASE_UPDATE_PAGE_KEY)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    updates = db.get_case_updates(case_id, limit + 1, after)
+    return jsonify(pagination.make_page(updates, limit, db.CASE_UPDATE_PAGE_KEY)), 200
 
 
 @routes.route('/api/cases/<int:case_id>/updates', methods=['POST'])
@@ -351,14 +547,16 @@ def add_case_update(case_id):
 # Evidence routes
 @routes.route('/api/evidence', methods=['GET'])
 @login_required
+@versioned('Evidence', 'Case')
 def get_evidence():
-    """Get all evidence"""
-    case_id = request.args.get('case_id')
-    if case_id:
-        evidence = db.get_evidence_by_case(int(case_id))
-    else:
-        evidence = db.get_all_evidence()
-    return jsonify(evidence), 200
+    """Get evidence (paginated, filter by case_id, date_from, date_to)"""
+    try:
+        limit, after = pagination.page_args(request.args, db.EVIDENCE_PAGE_KEY)
+        filters = evidence_filters()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    evidence = db.get_all_evidence(limit + 1, after, **filters)
+    return jsonify(pagination.make_page(evidence, limit, db.EVIDENCE_PAGE_KEY)), 200
 
 
 @routes.route('/api/evidence', methods=['POST'])
@@ -375,22 +573,166 @@ def create_evidence():
     if not case_id:
         return jsonify({'error': 'Case ID required'}), 400
     
-    filename = utils.save_uploaded_file(file)
-    if filename:
-        evidence_id = db.create_evidence(int(case_id), filename, description)
+    stored = utils.save_uploaded_file(file)
+    if stored:
+        evidence_id = db.create_evidence(int(case_id), stored['file_name'], description,
+                                         stored['sha256'], stored['size'])
         if evidence_id:
-            return jsonify({'message': 'Evidence uploaded', 'evidence_id': evidence_id, 'file_name': filename}), 201
+            utils.blob_store.settle(stored['staged'], stored['sha256'])
+            utils.previews.submit(stored['sha256'], stored['file_name'])
+            return jsonify({'message': 'Evidence uploaded', 'evidence_id': evidence_id,
+                            'file_name': stored['file_name'], 'sha256': stored['sha256']}), 201
+        utils.blob_store.discard(stored['staged'])
+        discard_unreferenced_blob(stored['sha256'])
         return jsonify({'error': 'Failed to save evidence record'}), 500
     return jsonify({'error': 'Invalid file type'}), 400
 
 
+def discard_unreferenced_blob(sha256):
+    """Remove a stored file after a failed insert, unless other evidence uses it"""
+    if db.count_evidence_references(sha256) == 0:
+        utils.delete_file(None, sha256, 0, db.count_evidence_references)
+
+
+@routes.route('/api/evidence/<int:evidence_id>', methods=['DELETE'])
+@login_required
+def delete_evidence(evidence_id):
+    """Delete evidence (the stored file goes once nothing references it)"""
+    deleted = db.delete_evidence(evidence_id)
+    if not deleted:
+        return jsonify({'error': 'Evidence not found'}), 404
+    utils.delete_file(deleted['file_name'], deleted['sha256'], deleted['references'],
+                      db.count_evidence_references)
+    return jsonify({'message': 'Evidence deleted'}), 200
+
+
+# Chunked evidence upload: init -> PUT chunks -> complete
+@routes.route('/api/evidence/uploads', methods=['POST'])
+@login_required
+def init_evidence_upload():
+    """Start a chunked upload, returns upload_id and chunk_size
+
+    If the client sends the file's sha256 and that content is already
+    stored, the Evidence row is created right away and nothing needs to
+    be uploaded (response has complete: true).
+    """
+    data = request.get_json()
+    case_id = data.get('case_id')
+    file_name = data.get('file_name', '')
+    description = data.get('description', '')
+    total_size = data.get('total_size')
+    sha256 = (data.get('sha256') or '').lower()
+    
+    if not case_id:
+        return jsonify({'error': 'Case ID required'}), 400
+    if not utils.allowed_file(file_name):
+        return jsonify({'error': 'Invalid file type'}), 400
+    
+    if utils.blob_store.exists(sha256):
+        size = utils.blob_store.size(sha256)
+        stored_name = secure_filename(file_name)
+        evidence_id = db.create_evidence(int(case_id), stored_name, description, sha256, size)
+        if not evidence_id:
+            return jsonify({'error': 'Failed to save evidence record'}), 500
+        # Nothing was uploaded to restore the blob from, so if a delete of the
+        # last row using it ran meanwhile, undo the row and take the upload
+        if utils.blob_store.exists(sha256):
+            utils.previews.submit(sha256, stored_name)
+            return jsonify({'message': 'Evidence uploaded', 'complete': True, 'evidence_id': evidence_id,
+                            'file_name': stored_name, 'size': size, 'sha256': sha256}), 201
+        db.delete_evidence(evidence_id)
+    
+    try:
+        upload = uploads.init(int(case_id), file_name, description,
+                              int(total_size) if total_size is not None else None)
+    except UploadTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    upload['chunk_size'] = UPLOAD_CHUNK_SIZE
+    return jsonify(upload), 201
+
+
+@routes.route('/api/evidence/uploads/<upload_id>', methods=['GET'])
+@login_required
+def get_evidence_upload(upload_id):
+    """Upload status - offset tells the client where to resume"""
+    try:
+        return jsonify(uploads.status(upload_id)), 200
+    except UploadNotFound:
+        return jsonify({'error': 'Upload not found'}), 404
+
+
+@routes.route('/api/evidence/uploads/<upload_id>', methods=['PUT'])
+@login_required
+def append_evidence_upload(upload_id):
+    """Append the raw request body at ?offset= (must equal the current size)"""
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return jsonify({'error': 'offset required'}), 400
+    try:
+        new_offset = uploads.append(upload_id, offset, request.stream)
+    except UploadNotFound:
+        return jsonify({'error': 'Upload not found'}), 404
+    except UploadOffsetMismatch as e:
+        return jsonify({'error': str(e), 'offset': e.offset}), 409
+    except UploadTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    return jsonify({'upload_id': upload_id, 'offset': new_offset}), 200
+
+
+@routes.route('/api/evidence/uploads/<upload_id>/complete', methods=['POST'])
+@login_required
+def complete_evidence_upload(upload_id):
+    """Verify the SHA-256 (if sent), move the file into the store and create the Evidence row"""
+    data = request.get_json(silent=True) or {}
+    try:
+        meta, sha256 = uploads.finalize(upload_id, data.get('sha256'))
+    except UploadNotFound:
+        return jsonify({'error': 'Upload not found'}), 404
+    except UploadOffsetMismatch as e:
+        return jsonify({'error': 'Upload incomplete', 'offset': e.offset}), 409
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    evidence_id = db.create_evidence(meta['case_id'], meta['file_name'], meta['description'],
+                                     sha256, meta['size'])
+    if evidence_id:
+        utils.blob_store.settle(meta['staged'], sha256)
+        utils.previews.submit(sha256, meta['file_name'])
+        return jsonify({'message': 'Evidence uploaded', 'evidence_id': evidence_id,
+                        'file_name': meta['file_name'], 'size': meta['size'], 'sha256': sha256}), 201
+    utils.blob_store.discard(meta['staged'])
+    discard_unreferenced_blob(sha256)
+    return jsonify({'error': 'Failed to save evidence record'}), 500
+
+
+@routes.route('/api/evidence/uploads/<upload_id>', methods=['DELETE'])
+@login_required
+def abort_evidence_upload(upload_id):
+    """Cancel an upload and delete the partial file"""
+    try:
+        uploads.abort(upload_id)
+    except UploadNotFound:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify({'message': 'Upload cancelled'}), 200
+
+
 # Duty routes
 @routes.route('/api/duties', methods=['GET'])
 @login_required
+@versioned('Duty', 'Officer')
 def get_duties():
-    """Get all duties"""
-    duties = db.get_all_duties()
-    return jsonify(duties), 200
+    """Get duties (paginated, filter by officer_id, unit_id, date_from, date_to)"""
+    try:
+        limit, after = pagination.page_args(request.args, db.DUTY_PAGE_KEY)
+        date_from = date_arg('date_from')
+        date_to = date_arg('date_to')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    duties = db.get_all_duties(limit + 1, after,
+                               officer_id=request.args.get('officer_id', type=int),
+                               unit_id=request.args.get('unit_id', type=int),
+                               date_from=date_from, date_to=date_to)
+    return jsonify(pagination.make_page(duties, limit, db.DUTY_PAGE_KEY)), 200
 
 
 @routes.route('/api/duties', methods=['POST'])
@@ -425,38 +767,197 @@ def delete_duty(duty_id):
 # Unit routes
 @routes.route('/api/units', methods=['GET'])
 @login_required
+@versioned('Unit')
 def get_units():
     """Get all units"""
     units = db.get_all_units()
     return jsonify(units), 200
 
 
+# Dashboard routes
+@routes.route('/api/stats', methods=['GET'])
+@login_required
+def get_stats():
+    """Get dashboard counts and breakdowns (cached, see db.get_stats)"""
+    stats = db.get_stats()
+    if stats is None:
+        return jsonify({'error': 'Failed to load statistics'}), 500
+    return jsonify(stats), 200
+
+
+# Bulk import routes
+@routes.route('/api/import/<kind>', methods=['POST'])
+@login_required
+def import_rows(kind):
+    """Bulk import officers, criminals, cases or duties from CSV or NDJSON
+
+    Send the file as multipart field 'file' or as the raw request body
+    (Content-Type text/csv or application/x-ndjson). Bad rows are reported
+    per line and do not stop the import.
+    """
+    if kind not in bulk_import.IMPORT_SPECS:
+        return jsonify({'error': f'Unknown import type: {kind}'}), 404
+    
+    if 'file' in request.files:
+        upload = request.files['file']
+        stream = upload.stream
+        default_format = 'ndjson' if upload.filename.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+    else:
+        stream = request.stream
+        default_format = 'ndjson' if 'ndjson' in (request.content_type or '') else 'csv'
+    fmt = request.args.get('format', default_format)
+    batch_size = max(1, min(request.args.get('batch_size', 1000, type=int), 10000))
+    
+    try:
+        result = bulk_import.import_stream(kind, stream, fmt, batch_size)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result.to_dict()), 200
+
+
 # Search routes
 @routes.route('/api/search', methods=['GET'])
 @login_required
 def search():
-    """Search cases and criminals"""
+    """Search cases and criminals (ranked, paginated with ?limit= and ?offset=)"""
     query = request.args.get('q', '')
     search_type = request.args.get('type', 'all')  # all, cases, criminals
+    limit = max(1, min(request.args.get('limit', SEARCH_PAGE_SIZE, type=int), API_MAX_PAGE_SIZE))
+    offset = max(0, request.args.get('offset', 0, type=int))
     
     if not query:
         return jsonify({'error': 'Search query required'}), 400
     
     results = {}
+    has_more = False
     if search_type in ['all', 'cases']:
-        results['cases'] = db.search_cases(query)
+        cases = db.search_cases(query, limit + 1, offset)
+        has_more = has_more or len(cases) > limit
+        results['cases'] = cases[:limit]
     if search_type in ['all', 'criminals']:
-        results['criminals'] = db.search_criminals(query)
+        criminals = db.search_criminals(query, limit + 1, offset)
+        has_more = has_more or len(criminals) > limit
+        results['criminals'] = criminals[:limit]
+    results['next_offset'] = offset + limit if has_more else None
     
     return jsonify(results), 200
 
 
+@routes.route('/api/search/rebuild', methods=['POST'])
+@login_required
+def rebuild_search_index():
+    """Rebuild the full-text search index from the database"""
+    if db.rebuild_search_index():
+        return jsonify({'message': 'Search index rebuilt'}), 200
+    return jsonify({'error': 'Failed to rebuild search index'}), 500
+
+
+# CNIC / badge number lookup
+@routes.route('/api/lookup', methods=['GET'])
+@login_required
+def lookup():
+    """Exact and prefix lookup by ?cnic= (criminals) or ?badge= (officers)"""
+    cnic = request.args.get('cnic', '').strip()
+    badge = request.args.get('badge', '').strip()
+    limit = max(1, min(request.args.get('limit', 20, type=int), API_MAX_PAGE_SIZE))
+    
+    # Only separators (e.g. '---') would match every row without a CNIC / badge
+    if normalize_cnic(cnic):
+        return jsonify(db.lookup_cnic(cnic, limit)), 200
+    if normalize_badge(badge):
+        return jsonify(db.lookup_badge(badge, limit)), 200
+    return jsonify({'error': 'cnic or badge required'}), 400
+
+
 # Audit log routes
+def audit_filters():
+    """Read AuditLog filters from the query string (ValueError if malformed)"""
+    since = request.args.get('since')
+    until = request.args.get('until')
+    return {
+        'table_name': request.args.get('table_name'),
+        'action': request.args.get('action'),
+        'record_id': request.args.get('record_id', type=int),
+        'since': pagination.parse_datetime(since) if since else None,
+        'until': pagination.parse_datetime(until) if until else None
+    }
+
+
 @routes.route('/api/audit', methods=['GET'])
 @login_required
 def get_audit_logs():
-    """Get audit logs"""
-    limit = request.args.get('limit', 100, type=int)
-    logs = db.get_audit_logs(limit)
-    return jsonify(logs), 200
+    """Get audit logs (paginated, filter by table_name, action, record_id, since, until)"""
+    try:
+        limit, after = pagination.page_args(request.args, db.AUDIT_PAGE_KEY)
+        filters = audit_filters()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    logs = db.get_audit_logs(limit + 1, after, **filters)
+    return jsonify(pagination.make_page(logs, limit, db.AUDIT_PAGE_KEY)), 200
+
+
+# Export routes
+# kind -> (query string filters, row iterator)
+EXPORTS = {
+    'cases': (case_filters, db.iter_cases),
+    'evidence': (evidence_filters, db.iter_evidence),
+    'audit': (audit_filters, db.iter_audit_logs)
+}
+
+
+@routes.route('/api/export/<kind>', methods=['GET'])
+@login_required
+def export_rows(kind):
+    """Stream cases, evidence or audit logs as NDJSON or CSV (?format=, same filters as the lists)"""
+    if kind not in export.FIELDS or kind not in EXPORTS:
+        return jsonify({'error': f"Unknown export: {kind}"}), 404
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in export.FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(export.FORMATS)}"}), 400
+    read_filters, iter_rows = EXPORTS[kind]
+    try:
+        filters = read_filters()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    chunks = export.export_chunks(iter_rows(**filters), fmt, export.FIELDS[kind])
+    response = Response(stream_with_context(chunks), mimetype=export.FORMATS[fmt])
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    response.headers['Content-Disposition'] = f'attachment; filename="{kind}-{stamp}.{fmt}"'
+    return response
+
 
+@routes.route('/api/audit/export', methods=['GET'])
+@login_required
+def export_audit_logs():
+    """Stream matching audit logs (same as /api/export/audit, NDJSON by default)"""
+    return export_rows('audit')
+
+
+@routes.route('/api/audit/stats', methods=['GET'])
+@login_required
+def get_audit_stats():
+    """Get audit writer stats (queue depth, dropped rows)"""
+    return jsonify(db.get_audit_stats()), 200
+
+
+@routes.route('/api/evidence/previews/stats', methods=['GET'])
+@login_required
+def get_preview_stats():
+    """Get preview worker stats (pending jobs, generated, failed)"""
+    return jsonify(utils.previews.stats()), 200
+
+
+# Connection pool stats
+@routes.route('/api/pool-stats', methods=['GET'])
+@login_required
+def get_pool_stats():
+    """Get database connection pool stats"""
+    return jsonify(db.get_pool_stats()), 200
+
+
+@routes.route('/api/cache/stats', methods=['GET'])
+@login_required
+def get_cache_stats():
+    """Get cache hit / miss / eviction counters"""
+    return jsonify(db.get_cache_stats()), 200
@@ -0,0 +1,222 @@
+# Full-text search index for cases and criminals
+# SQLite FTS5 sidecar file, kept in sync by the write functions in database.py
+
+import re
+import sqlite3
+import threading
+
+# Words in a search query (letters and digits, so CNIC dashes split terms)
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS case_fts USING fts5(
+        case_number, title, description, updates, prefix='2 3'
+    );
+    CREATE TABLE IF NOT EXISTS case_officer (
+        case_id INTEGER PRIMARY KEY,
+        filed_by INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS ix_case_officer_filed_by ON case_officer (filed_by);
+    CREATE VIRTUAL TABLE IF NOT EXISTS officer_fts USING fts5(name, prefix='2 3');
+    CREATE VIRTUAL TABLE IF NOT EXISTS criminal_fts USING fts5(
+        name, cnic, notes, prefix='2 3'
+    );
+    CREATE TABLE IF NOT EXISTS index_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+"""
+
+# bm25 column weights: matches in the case number / title rank highest
+CASE_WEIGHTS = '10.0, 5.0, 1.0, 0.5'
+CRIMINAL_WEIGHTS = '5.0, 10.0, 1.0'
+
+
+def fts5_available():
+    """Check that this Python's sqlite3 was built with FTS5"""
+    try:
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        conn.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def build_match_query(text):
+    """Turn user input into an FTS5 query: every word must match as a prefix"""
+    words = TOKEN_RE.findall(text or '')
+    return ' AND '.join(f'"{word}"*' for word in words)
+
+
+class SearchIndex:
+    """Inverted index over case text, officer names and criminal records"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self.available = fts5_available()
+        if self.available:
+            self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        # One SQLite connection per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def is_built(self):
+        """True once a full rebuild has finished"""
+        if not self.available:
+            return False
+        row = self._conn().execute("SELECT value FROM index_meta WHERE key = 'built'").fetchone()
+        return row is not None
+
+    # Incremental updates
+    def index_case(self, case_id, case_number, title, description, filed_by):
+        """Add or replace a case, keeping the update text already indexed"""
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                row = conn.execute("SELECT updates FROM case_fts WHERE rowid = ?", (case_id,)).fetchone()
+                conn.execute("DELETE FROM case_fts WHERE rowid = ?", (case_id,))
+                conn.execute("""
+                    INSERT INTO case_fts (rowid, case_number, title, description, updates)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (case_id, case_number, title, description or '', row[0] if row else ''))
+                conn.execute("INSERT OR REPLACE INTO case_officer (case_id, filed_by) VALUES (?, ?)",
+                             (case_id, filed_by))
+
+    def add_case_update(self, case_id, update_text):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("UPDATE case_fts SET updates = updates || ' ' || ? WHERE rowid = ?",
+                             (update_text, case_id))
+
+    def remove_case(self, case_id):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM case_fts WHERE rowid = ?", (case_id,))
+                conn.execute("DELETE FROM case_officer WHERE case_id = ?", (case_id,))
+
+    def index_officer(self, officer_id, name):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM officer_fts WHERE rowid = ?", (officer_id,))
+                conn.execute("INSERT INTO officer_fts (rowid, name) VALUES (?, ?)", (officer_id, name))
+
+    def remove_officer(self, officer_id):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM officer_fts WHERE rowid = ?", (officer_id,))
+
+    def index_criminal(self, criminal_id, name, cnic, notes):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM criminal_fts WHERE rowid = ?", (criminal_id,))
+                conn.execute("""
+                    INSERT INTO criminal_fts (rowid, name, cnic, notes) VALUES (?, ?, ?, ?)
+                """, (criminal_id, name, cnic, notes or ''))
+
+    def remove_criminal(self, criminal_id):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM criminal_fts WHERE rowid = ?", (criminal_id,))
+
+    # Bulk load
+    def add_cases(self, rows):
+        """Bulk add (case_id, case_number, title, description, filed_by) rows"""
+        rows = list(rows)
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO case_fts (rowid, case_number, title, description, updates)
+                    VALUES (?, ?, ?, ?, '')
+                """, [(r[0], r[1], r[2], r[3] or '') for r in rows])
+                conn.executemany("INSERT OR REPLACE INTO case_officer (case_id, filed_by) VALUES (?, ?)",
+                                 [(r[0], r[4]) for r in rows])
+
+    def add_case_updates(self, rows):
+        """Bulk append (case_id, update_text) rows"""
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.executemany("UPDATE case_fts SET updates = updates || ' ' || ? WHERE rowid = ?",
+                                 [(text, case_id) for case_id, text in rows])
+
+    def add_officers(self, rows):
+        """Bulk add (officer_id, name) rows"""
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO officer_fts (rowid, name) VALUES (?, ?)", rows)
+
+    def add_criminals(self, rows):
+        """Bulk add (criminal_id, name, cnic, notes) rows"""
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO criminal_fts (rowid, name, cnic, notes) VALUES (?, ?, ?, ?)
+                """, [(r[0], r[1], r[2], r[3] or '') for r in rows])
+
+    def clear(self):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                for table in ('case_fts', 'case_officer', 'officer_fts', 'criminal_fts', 'index_meta'):
+                    conn.execute(f"DELETE FROM {table}")
+
+    def mark_built(self):
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES ('built', '1')")
+
+    # Queries
+    def search_cases(self, text, limit=50, offset=0):
+        """Return case IDs, best match first
+
+        Cases match on their own text or on the name of the filing officer.
+        """
+        match = build_match_query(text)
+        if not match:
+            return []
+        rows = self._conn().execute(f"""
+            SELECT case_id, MIN(score) AS best FROM (
+                SELECT rowid AS case_id, bm25(case_fts, {CASE_WEIGHTS}) AS score
+                FROM case_fts WHERE case_fts MATCH ?
+                UNION ALL
+                SELECT co.case_id, 0.0 AS score
+                FROM case_officer co
+                WHERE co.filed_by IN (SELECT rowid FROM officer_fts WHERE officer_fts MATCH ?)
+            )
+            GROUP BY case_id
+            ORDER BY best, case_id DESC
+            LIMIT ? OFFSET ?
+        """, (match, match, limit, offset)).fetchall()
+        return [row[0] for row in rows]
+
+    def search_criminals(self, text, limit=50, offset=0):
+        """Return criminal IDs, best match first"""
+        match = build_match_query(text)
+        if not match:
+            return []
+        rows = self._conn().execute(f"""
+            SELECT rowid FROM criminal_fts WHERE criminal_fts MATCH ?
+            ORDER BY bm25(criminal_fts, {CRIMINAL_WEIGHTS}), rowid
+            LIMIT ? OFFSET ?
+        """, (match, limit, offset)).fetchall()
+        return [row[0] for row in rows]
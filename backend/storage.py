@@ -0,0 +1,158 @@
+# Storage engines: how to connect and the bits of SQL that differ
+# between SQL Server (the production database) and SQLite (local runs,
+# benchmarks, small single-station installs)
+#
+# database.py writes plain SQL and asks the engine for the rest:
+# row limits, paging, INSERT/DELETE ... returning values and batches
+# of several queries.
+
+import os
+import sqlite3
+from datetime import date, datetime, time
+
+SQLITE_SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'schema_sqlite.sql')
+
+
+class SQLServerEngine:
+    """pyodbc + SQL Server (T-SQL)"""
+
+    name = 'mssql'
+
+    def __init__(self, connection_string):
+        self.connection_string = connection_string
+
+    def connect(self):
+        # Imported here so the SQLite engine works without ODBC installed
+        import pyodbc
+        return pyodbc.connect(self.connection_string)
+
+    def limit(self, sql, params, limit):
+        """Return only the first limit rows of a SELECT (TOP goes first)"""
+        return sql.replace("SELECT ", "SELECT TOP (?) ", 1), [limit] + list(params)
+
+    def offset_clause(self):
+        """Paging clause after ORDER BY, takes (offset, limit) params"""
+        return "OFFSET ? ROWS FETCH NEXT ? ROWS ONLY"
+
+    def offset_params(self, offset, limit):
+        return [offset, limit]
+
+    def insert_returning(self, table, columns, returning):
+        return (f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"OUTPUT {', '.join('INSERTED.' + c for c in returning)} "
+                f"VALUES ({', '.join('?' for _ in columns)})")
+
+    def delete_returning(self, table, where, returning):
+        return (f"DELETE FROM {table} "
+                f"OUTPUT {', '.join('DELETED.' + c for c in returning)} "
+                f"WHERE {where}")
+
+    def last_insert_id(self, cursor):
+        """Identity of the row the cursor's last INSERT created"""
+        # SCOPE_IDENTITY() would be NULL here, the INSERT ran as its own batch
+        cursor.execute("SELECT CAST(@@IDENTITY AS INT)")
+        return cursor.fetchone()[0]
+
+    def run_batch(self, cursor, statements):
+        """Run several SELECTs in one round trip, returns a list of row lists"""
+        sql = "SET NOCOUNT ON;\n" + ";\n".join(s for s, p in statements) + ";"
+        params = [value for s, p in statements for value in p]
+        cursor.execute(sql, params)
+        results = [cursor.fetchall()]
+        while len(results) < len(statements) and cursor.nextset():
+            results.append(cursor.fetchall())
+        return results
+
+
+def _adapt_datetime(value):
+    # Same text as str(datetime), so values read back look like SQL Server's
+    return value.isoformat(' ')
+
+
+# Columns declared DATETIME / DATE / TIME in schema_sqlite.sql come back as
+# datetime / date / time objects, like pyodbc returns them
+_CONVERTERS = {
+    'DATETIME': lambda value: datetime.fromisoformat(value.decode()),
+    'DATE': lambda value: date.fromisoformat(value.decode()),
+    'TIME': lambda value: time.fromisoformat(value.decode()),
+}
+
+
+class SQLiteEngine:
+    """Embedded SQLite file in WAL mode
+
+    Creates the schema (database/schema_sqlite.sql) the first time the file
+    is opened.
+    """
+
+    name = 'sqlite'
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",      # readers don't block the writer
+        "PRAGMA synchronous=NORMAL",    # fsync at checkpoints only (safe with WAL)
+        "PRAGMA foreign_keys=ON",
+        "PRAGMA busy_timeout=5000",     # wait for the write lock instead of failing
+        "PRAGMA cache_size=-65536",     # 64MB page cache per connection
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=268435456",   # 256MB memory-mapped reads
+    )
+
+    def __init__(self, path, schema_path=SQLITE_SCHEMA_PATH):
+        self.path = path
+        self.schema_path = schema_path
+        self._schema_ready = False
+        sqlite3.register_adapter(datetime, _adapt_datetime)
+        sqlite3.register_adapter(date, lambda value: value.isoformat())
+        sqlite3.register_adapter(time, lambda value: value.isoformat())
+        for type_name, converter in _CONVERTERS.items():
+            sqlite3.register_converter(type_name, converter)
+
+    def connect(self):
+        # Pooled connections move between threads, the pool makes sure
+        # only one thread uses a connection at a time
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False,
+                               detect_types=sqlite3.PARSE_DECLTYPES)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        if not self._schema_ready:
+            with open(self.schema_path, encoding='utf-8') as f:
+                conn.executescript(f.read())
+            self._schema_ready = True
+        return conn
+
+    def limit(self, sql, params, limit):
+        return sql + "\nLIMIT ?", list(params) + [limit]
+
+    def offset_clause(self):
+        return "LIMIT ? OFFSET ?"
+
+    def offset_params(self, offset, limit):
+        return [limit, offset]
+
+    def insert_returning(self, table, columns, returning):
+        return (f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)}) "
+                f"RETURNING {', '.join(returning)}")
+
+    def delete_returning(self, table, where, returning):
+        return f"DELETE FROM {table} WHERE {where} RETURNING {', '.join(returning)}"
+
+    def last_insert_id(self, cursor):
+        return cursor.lastrowid
+
+    def run_batch(self, cursor, statements):
+        # No multi-statement batches in sqlite3, but there's no round trip either
+        results = []
+        for sql, params in statements:
+            cursor.execute(sql, params)
+            results.append(cursor.fetchall())
+        return results
+
+
+def create_engine(name, connection_string=None, sqlite_path=None):
+    """Build the configured engine ('mssql' or 'sqlite')"""
+    if name == 'mssql':
+        return SQLServerEngine(connection_string)
+    if name == 'sqlite':
+        return SQLiteEngine(sqlite_path)
+    raise ValueError(f'Unknown database engine: {name}')
@@ -0,0 +1,284 @@
+# Synthetic data for benchmarks
+# Realistic-looking officers, criminals, FIRs, case updates, evidence rows,
+# duties and audit rows at a chosen scale, inserted in large batches.
+# Seeded, so the same scale and seed always give the same data.
+
+import hashlib
+import random
+import time
+from datetime import date, datetime, timedelta, time as dtime
+
+import database as db
+import utils
+from audit import AUDIT_INSERT_SQL
+
+# Number of cases per scale; the other tables are sized relative to it
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+# Rows per case (officers and criminals are shared between many cases)
+RATIOS = {
+    'officers': 1 / 40,
+    'criminals': 1 / 4,
+    'case_updates': 3,
+    'evidence': 1 / 2,
+    'duties': 1
+}
+
+# Login used by the benchmark clients
+BENCH_ADMIN = 'bench'
+BENCH_PASSWORD = 'bench-password'
+
+FIRST_NAMES = ['Ahmed', 'Ali', 'Bilal', 'Hamza', 'Usman', 'Imran', 'Kashif', 'Faisal', 'Zeeshan', 'Tariq',
+               'Ayesha', 'Fatima', 'Sana', 'Hina', 'Mariam', 'Nadia', 'Sadia', 'Rabia', 'Amna', 'Zainab',
+               'Asad', 'Danish', 'Hassan', 'Junaid', 'Naveed', 'Omer', 'Qasim', 'Rizwan', 'Shahid', 'Waqas']
+LAST_NAMES = ['Khan', 'Ahmed', 'Ali', 'Hussain', 'Malik', 'Qureshi', 'Butt', 'Chaudhry', 'Sheikh', 'Raza',
+              'Siddiqui', 'Mirza', 'Baig', 'Javed', 'Iqbal', 'Aslam', 'Shah', 'Abbasi', 'Awan', 'Niazi']
+STREETS = ['Main Boulevard', 'Mall Road', 'GT Road', 'Canal Road', 'Jinnah Avenue', 'Railway Road',
+           'Station Road', 'Circular Road', 'Ferozepur Road', 'University Road']
+CITIES = ['Lahore', 'Karachi', 'Islamabad', 'Rawalpindi', 'Faisalabad', 'Multan', 'Peshawar', 'Quetta']
+RANKS = ['Constable', 'Head Constable', 'Assistant Sub-Inspector', 'Sub-Inspector', 'Inspector',
+         'Deputy Superintendent']
+OFFENCES = ['Theft', 'Burglary', 'Robbery', 'Vehicle theft', 'Fraud', 'Assault', 'Kidnapping',
+            'Extortion', 'Cyber crime', 'Narcotics possession', 'Illegal weapons', 'Forgery']
+PLACES = ['at market', 'at bank', 'near bus stand', 'in residential area', 'at petrol pump',
+          'near railway station', 'at shopping mall', 'on highway', 'at school', 'at hospital']
+UPDATE_NOTES = ['Statement of complainant recorded.', 'Site inspected and photographs taken.',
+                'Suspect called for questioning.', 'CCTV footage requested from nearby shops.',
+                'Witness statements recorded.', 'Recovery made from suspect.',
+                'Forensic report awaited.', 'Challan submitted to court.', 'Suspect granted bail.',
+                'Raid conducted, suspect not found.']
+DUTY_LOCATIONS = ['Main Station', 'City Patrol', 'Checkpost 1', 'Checkpost 2', 'Court Duty',
+                  'Highway Patrol', 'Market Beat', 'Night Patrol', 'VIP Route', 'Railway Station']
+EVIDENCE_TYPES = [('photo', 'jpg'), ('scan', 'pdf'), ('statement', 'pdf'), ('cctv_still', 'png'),
+                  ('report', 'docx')]
+
+
+def scale_rows(cases):
+    """Row count per table for a number of cases"""
+    counts = {table: max(1, int(cases * ratio)) for table, ratio in RATIOS.items()}
+    counts['officers'] = max(counts['officers'], 20)
+    counts['cases'] = cases
+    return counts
+
+
+def person_name(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def address(rng):
+    return f'{rng.randint(1, 999)} {rng.choice(STREETS)}, {rng.choice(CITIES)}'
+
+
+def cnic(rng, n):
+    """Valid-format CNIC (#####-#######-#), unique per n (below 10 million)"""
+    return f'{rng.randint(11111, 64999):05d}-{n:07d}-{rng.randint(0, 9)}'
+
+
+def phone(rng):
+    return f'03{rng.randint(0, 4)}{rng.randint(0, 9)}-{rng.randint(0, 9999999):07d}'
+
+
+def _officer_rows(rng, count, units, run):
+    for n in range(count):
+        yield (person_name(rng), address(rng), f'BN{run:02d}-{n:06d}', rng.choice(RANKS), phone(rng),
+               rng.choice(units))
+
+
+def _criminal_rows(rng, count, run):
+    for n in range(count):
+        notes = rng.choice(['', f'Previous {rng.choice(OFFENCES).lower()} cases',
+                            f'Suspected in {rng.randint(2, 9)} incidents', 'Absconder'])
+        # Run number in the middle digits keeps reruns unique
+        yield (person_name(rng), address(rng), cnic(rng, run * 1_000_000 + n), notes or None)
+
+
+def _case_rows(rng, count, officer_ids, criminal_ids, run, days):
+    today = date.today()
+    for n in range(count):
+        offence = rng.choice(OFFENCES)
+        filed = today - timedelta(days=rng.randint(0, days))
+        yield (f'FIR-{filed.year}-B{run}-{n:07d}', f'{offence} {rng.choice(PLACES)}',
+               f'{offence} reported by {person_name(rng)}, {address(rng)}.', filed,
+               rng.choice(officer_ids), rng.choice(criminal_ids) if rng.random() < 0.7 else None,
+               'Open' if rng.random() < 0.6 else 'Closed')
+
+
+def _case_update_rows(rng, count, case_ids, officer_ids, days):
+    now = datetime.now()
+    for _ in range(count):
+        when = now - timedelta(days=rng.randint(0, days), seconds=rng.randint(0, 86399))
+        yield (rng.choice(case_ids), rng.choice(UPDATE_NOTES), when.replace(microsecond=0),
+               rng.choice(officer_ids))
+
+
+def _evidence_rows(rng, count, case_ids, days):
+    now = datetime.now()
+    for n in range(count):
+        kind, ext = rng.choice(EVIDENCE_TYPES)
+        # Rows only: the hash points at no stored blob
+        digest = hashlib.sha256(f'bench-evidence-{n}'.encode()).hexdigest()
+        when = now - timedelta(days=rng.randint(0, days), seconds=rng.randint(0, 86399))
+        yield (rng.choice(case_ids), f'{kind}_{n}.{ext}', f'{kind.replace("_", " ").title()} {n}',
+               when.replace(microsecond=0), digest, rng.randint(20_000, 8_000_000))
+
+
+def _duty_rows(rng, count, officer_ids, days):
+    today = date.today()
+    for _ in range(count):
+        yield (rng.choice(officer_ids), today + timedelta(days=rng.randint(-days, 30)),
+               dtime(rng.choice([0, 8, 14, 16, 20, 22])), rng.choice(DUTY_LOCATIONS))
+
+
+TABLES = {
+    'Officer': ('Officer', ['name', 'address', 'badge_no', 'rank', 'contact', 'unit_id'], 'officer_id'),
+    'Criminal': ('Criminal', ['name', 'address', 'cnic', 'notes'], 'criminal_id'),
+    'Case': ('Case_table', ['case_number', 'title', 'description', 'filed_date', 'filed_by', 'suspect_id',
+                            'status'], 'case_id'),
+    'CaseUpdate': ('CaseUpdate', ['case_id', 'update_text', 'update_date', 'updated_by'], 'update_id'),
+    'Evidence': ('Evidence', ['case_id', 'file_name', 'description', 'upload_date', 'sha256', 'file_size'],
+                 'evidence_id'),
+    'Duty': ('Duty', ['officer_id', 'duty_date', 'duty_time', 'location'], 'duty_id'),
+}
+
+
+def _ids(cursor, table, after_id):
+    sql_table, columns, key = TABLES[table]
+    cursor.execute(f"SELECT {key} FROM {sql_table} WHERE {key} > ? ORDER BY {key}", [after_id])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _max_id(cursor, table):
+    sql_table, columns, key = TABLES[table]
+    cursor.execute(f"SELECT MAX({key}) FROM {sql_table}")
+    return cursor.fetchone()[0] or 0
+
+
+def _insert(conn, table, rows, batch_size, on_progress=None):
+    """Insert rows in batches plus one audit row each, returns the new IDs"""
+    sql_table, columns, key = TABLES[table]
+    sql = (f"INSERT INTO {sql_table} ({', '.join(columns)}) "
+           f"VALUES ({', '.join('?' for _ in columns)})")
+    cursor = conn.cursor()
+    if hasattr(cursor, 'fast_executemany'):
+        cursor.fast_executemany = True  # pyodbc: send the batch in one go
+    first_id = _max_id(cursor, table)
+    inserted = 0
+    batch = []
+
+    def flush():
+        nonlocal inserted
+        cursor.executemany(sql, batch)
+        conn.commit()
+        inserted += len(batch)
+        if on_progress:
+            on_progress(table, inserted)
+        batch.clear()
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    ids = _ids(cursor, table, first_id)
+    _insert_audit(conn, table, ids, batch_size)
+    return ids
+
+
+def _insert_audit(conn, table, ids, batch_size):
+    cursor = conn.cursor()
+    if hasattr(cursor, 'fast_executemany'):
+        cursor.fast_executemany = True
+    now = datetime.now().replace(microsecond=0)
+    for start in range(0, len(ids), batch_size):
+        cursor.executemany(AUDIT_INSERT_SQL, [('INSERT', table, record_id, now)
+                                              for record_id in ids[start:start + batch_size]])
+        conn.commit()
+
+
+def ensure_bench_admin():
+    """Create the benchmark login (BENCH_ADMIN / BENCH_PASSWORD) if missing"""
+    if db.get_admin_by_username(BENCH_ADMIN):
+        return
+    conn = db.get_db_connection()
+    if not conn:
+        raise RuntimeError('No database connection')
+    try:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO Admin (username, password_hash) VALUES (?, ?)",
+                       (BENCH_ADMIN, utils.hash_password(BENCH_PASSWORD)))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def generate(cases, seed=42, batch_size=5000, days=3 * 365, on_progress=None):
+    """Insert a synthetic data set with the given number of cases
+
+    Returns {table: rows inserted}. Can be run again on the same database,
+    the unique columns get a new run number each time.
+    """
+    rng = random.Random(seed)
+    counts = scale_rows(cases)
+    conn = db.get_db_connection()
+    if not conn:
+        raise RuntimeError('No database connection')
+    started = time.perf_counter()
+    try:
+        cursor = conn.cursor()
+        units = [unit['unit_id'] for unit in db.get_all_units() or []]
+        if not units:
+            raise RuntimeError('No units in the database (run the schema first)')
+        # Number this run after earlier ones so reruns don't hit unique keys
+        cursor.execute("SELECT MAX(badge_no) FROM Officer WHERE badge_no LIKE 'BN%'")
+        last_badge = cursor.fetchone()[0]
+        run = int(last_badge[2:4]) + 1 if last_badge else 1
+
+        officer_ids = _insert(conn, 'Officer', _officer_rows(rng, counts['officers'], units, run),
+                              batch_size, on_progress)
+        criminal_ids = _insert(conn, 'Criminal', _criminal_rows(rng, counts['criminals'], run),
+                               batch_size, on_progress)
+        case_ids = _insert(conn, 'Case', _case_rows(rng, counts['cases'], officer_ids, criminal_ids, run, days),
+                           batch_size, on_progress)
+        _insert(conn, 'CaseUpdate', _case_update_rows(rng, counts['case_updates'], case_ids, officer_ids, days),
+                batch_size, on_progress)
+        _insert(conn, 'Evidence', _evidence_rows(rng, counts['evidence'], case_ids, days),
+                batch_size, on_progress)
+        _insert(conn, 'Duty', _duty_rows(rng, counts['duties'], officer_ids, days), batch_size, on_progress)
+        conn.close()
+    except Exception:
+        conn.close()
+        raise
+
+    ensure_bench_admin()
+    # Search / lookup indexes and caches pick up the new rows
+    for table in ('Officer', 'Criminal', 'Case', 'CaseUpdate', 'Evidence', 'Duty'):
+        db.after_bulk_import(table, rebuild_search=False)
+    db.rebuild_search_index()
+    counts['audit'] = sum(counts[t] for t in counts if t != 'audit')
+    counts['seconds'] = round(time.perf_counter() - started, 1)
+    return counts
+
+
+def sample_ids(limit=1000):
+    """Some existing IDs and search terms for benchmark requests"""
+    conn = db.get_db_connection()
+    if not conn:
+        raise RuntimeError('No database connection')
+    try:
+        cursor = conn.cursor()
+        sample = {}
+        for table in ('Officer', 'Criminal', 'Case'):
+            sql_table, columns, key = TABLES[table]
+            sql, params = db.get_engine().limit(f"SELECT {key} FROM {sql_table} ORDER BY {key} DESC", [], limit)
+            cursor.execute(sql, params)
+            sample[table] = [row[0] for row in cursor.fetchall()]
+        sql, params = db.get_engine().limit("SELECT cnic FROM Criminal ORDER BY criminal_id DESC", [], limit)
+        cursor.execute(sql, params)
+        sample['cnic'] = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return sample
+    except Exception:
+        conn.close()
+        raise
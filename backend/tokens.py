@@ -0,0 +1,107 @@
+# Signed session tokens
+# A token is "<key version>.<admin id>.<expiry>.<token id>.<signature>",
+# the signature being the HMAC-SHA256 of the first four parts with the key
+# of that version (base64url). Checking one needs no database read. Keys
+# are rotated by adding a new version and signing with it; tokens signed
+# with older versions still verify while their key is configured.
+
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+
+
+class InvalidToken(Exception):
+    """Token is malformed, badly signed, expired or revoked (reason in args[0])"""
+
+
+def _sign(key, payload):
+    digest = hmac.new(key, payload.encode('ascii'), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b'=').decode('ascii')
+
+
+class TokenSigner:
+    """Issues and verifies tokens with versioned keys {version: secret}"""
+
+    def __init__(self, keys, current_version, ttl=86400):
+        self.keys = {int(version): key.encode('utf-8') if isinstance(key, str) else key
+                     for version, key in keys.items()}
+        if current_version not in self.keys:
+            raise ValueError(f"No key for token key version {current_version}")
+        self.current_version = current_version
+        self.ttl = ttl
+
+    def issue(self, admin_id, now=None):
+        """New token for admin_id, returns {'token', 'token_id', 'expires'}"""
+        expires = int(now if now is not None else time.time()) + self.ttl
+        token_id = secrets.token_urlsafe(12)
+        payload = f'{self.current_version}.{int(admin_id)}.{expires}.{token_id}'
+        token = f'{payload}.{_sign(self.keys[self.current_version], payload)}'
+        return {'token': token, 'token_id': token_id, 'expires': expires}
+
+    def verify(self, token, now=None):
+        """Claims {'admin_id', 'token_id', 'expires', 'key_version'} of a valid token
+
+        Raises InvalidToken. Does not check revocation.
+        """
+        parts = token.split('.')
+        if len(parts) != 5:
+            raise InvalidToken('malformed')
+        version, admin_id, expires, token_id, signature = parts
+        try:
+            key = self.keys.get(int(version))
+            admin_id = int(admin_id)
+            expires = int(expires)
+        except ValueError:
+            raise InvalidToken('malformed')
+        if key is None:
+            raise InvalidToken('unknown_key')
+        if not hmac.compare_digest(signature, _sign(key, token.rsplit('.', 1)[0])):
+            raise InvalidToken('bad_signature')
+        if expires <= (now if now is not None else time.time()):
+            raise InvalidToken('expired')
+        return {'admin_id': admin_id, 'token_id': token_id, 'expires': expires,
+                'key_version': int(version)}
+
+
+class RevocationList:
+    """IDs of revoked tokens that haven't expired yet
+
+    Filled from the RevokedToken table: everything once, then only rows
+    with a higher revocation_id (see database.is_token_revoked).
+    """
+
+    def __init__(self):
+        self._revoked = {}  # token id -> expiry (unix time)
+        self.last_id = 0
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    def is_stale(self, max_age):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= max_age
+
+    def add(self, token_id, expires, revocation_id=None):
+        with self._lock:
+            self._revoked[token_id] = expires
+            if revocation_id is not None and revocation_id > self.last_id:
+                self.last_id = revocation_id
+
+    def mark_loaded(self):
+        """Drop expired entries and restart the refresh clock"""
+        now = time.time()
+        with self._lock:
+            for token_id in [t for t, expires in self._revoked.items() if expires <= now]:
+                del self._revoked[token_id]
+            self._loaded_at = time.monotonic()
+
+    def __contains__(self, token_id):
+        return token_id in self._revoked
+
+    def __len__(self):
+        return len(self._revoked)
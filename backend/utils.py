@@ -1,26 +1,57 @@
 # Utility functions for password hashing and file handling
 
-import bcrypt
 import os
 from werkzeug.utils import secure_filename
+import metrics
+from blobstore import BlobStore
+from passwords import PasswordHasher, LoginThrottle
+from tokens import TokenSigner
+from previews import PreviewGenerator
+from config import (UPLOAD_FOLDER, PREVIEW_WORKERS, PREVIEW_MAX_PENDING, PREVIEW_SIZE, BCRYPT_ROUNDS,
+                    PASSWORD_HASH_WORKERS, PASSWORD_MAX_PENDING, LOGIN_USER_BURST, LOGIN_USER_PER_MINUTE,
+                    LOGIN_IP_BURST, LOGIN_IP_PER_MINUTE, TOKEN_KEYS, TOKEN_KEY_VERSION, TOKEN_TTL)
+
+# Evidence files are stored by content hash under uploads/blobs
+blob_store = BlobStore(os.path.join(UPLOAD_FOLDER, 'blobs'))
+
+# Thumbnails / PDF previews, cached next to each blob
+previews = PreviewGenerator(blob_store, PREVIEW_WORKERS, PREVIEW_MAX_PENDING, PREVIEW_SIZE)
+
+# bcrypt runs in worker processes, off the request threads
+password_hasher = PasswordHasher(BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_MAX_PENDING)
+
+# Login attempt limits, checked before any hashing
+login_throttle = LoginThrottle(LOGIN_USER_BURST, LOGIN_USER_PER_MINUTE, LOGIN_IP_BURST, LOGIN_IP_PER_MINUTE)
+
+# Signs the session tokens issued at login
+token_signer = TokenSigner(TOKEN_KEYS, TOKEN_KEY_VERSION, TOKEN_TTL)
+
+
+def _password_metrics():
+    stats = password_hasher.stats()
+    return [('nsos_password_checks_pending', 'gauge', 'Password checks queued or running',
+             [({}, stats['pending'])]),
+            ('nsos_password_rehashed_total', 'counter', 'Hashes upgraded to BCRYPT_ROUNDS at login',
+             [({}, stats['rehashed'])])]
+
+
+metrics.REGISTRY.register_collector(_password_metrics)
 
-# Upload folder path (relative to project root)
-UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
 
 # Allowed file extensions for evidence
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx'}
 
 
 def hash_password(password):
-    """Hash password using bcrypt"""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    """Hash password using bcrypt (raises passwords.HasherBusy if the pool is full)"""
+    with metrics.BCRYPT_SECONDS.time('hash'):
+        return password_hasher.hash(password)
 
 
 def check_password(password, hashed):
-    """Check if password matches hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    """Check if password matches hash (raises passwords.HasherBusy if the pool is full)"""
+    with metrics.BCRYPT_SECONDS.time('check'):
+        return password_hasher.check(password, hashed)
 
 
 def allowed_file(filename):
@@ -30,32 +61,44 @@ def allowed_file(filename):
 
 
 def save_uploaded_file(file):
-    """Save uploaded file to uploads folder"""
+    """Save uploaded file into the content-addressed store
+
+    Returns {'file_name', 'sha256', 'size', 'staged'} or None if the file
+    type is not allowed. A file whose content is already stored is not
+    written again. Pass 'staged' to blob_store.settle() once the Evidence
+    row is committed, or to blob_store.discard() if it wasn't inserted.
+    """
     if file and allowed_file(file.filename):
-        # Make filename safe
+        # Make filename safe (kept as the display/download name)
         filename = secure_filename(file.filename)
-        
-        # Make sure uploads folder exists
-        if not os.path.exists(UPLOAD_FOLDER):
-            os.makedirs(UPLOAD_FOLDER)
-        
-        # Generate unique filename to avoid conflicts
-        import uuid
-        unique_filename = str(uuid.uuid4()) + '_' + filename
-        
-        filepath = os.path.join(UPLOAD_FOLDER, unique_filename)
-        file.save(filepath)
-        
-        return unique_filename
+        staged, sha256, size = blob_store.stage_stream(file.stream)
+        return {'file_name': filename, 'sha256': sha256, 'size': size, 'staged': staged}
     return None
 
 
-def delete_file(filename):
-    """Delete file from uploads folder"""
+def get_evidence_path(evidence):
+    """Path on disk of an evidence record's file (blob or legacy upload)"""
+    if evidence.get('sha256'):
+        return blob_store.path_for(evidence['sha256'])
+    return os.path.join(UPLOAD_FOLDER, secure_filename(evidence['file_name']))
+
+
+def delete_file(filename, sha256=None, references=0, count_references=None):
+    """Delete an evidence file
+
+    Content-addressed files are shared between Evidence rows, so the blob
+    is only removed when references (rows still using it) is 0, and
+    count_references(sha256) still says so after it was moved aside (see
+    BlobStore.delete).
+    """
+    if sha256:
+        if references == 0 and blob_store.delete(sha256, count_references):
+            previews.delete(sha256)
+            return True
+        return False
     if filename:
         filepath = os.path.join(UPLOAD_FOLDER, filename)
         if os.path.exists(filepath):
             os.remove(filepath)
             return True
     return False
-
@@ -0,0 +1,58 @@
+# Script to print the estimated query plan of every hot query in database.py
+# Run after migrate.py to check the indexes are picked up (nothing is executed)
+# Usage: python check_query_plans.py
+#        python check_query_plans.py --only "cases by officer"
+
+import sys
+import os
+import argparse
+
+# Add backend to path so we can import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+import migrations
+import query_plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show query plans for the hot queries')
+    parser.add_argument('--only', help='only the query with this name')
+    parser.add_argument('--quiet', action='store_true', help='only print queries that scan')
+    args = parser.parse_args()
+
+    try:
+        conn = migrations.connect()
+    except Exception as e:
+        print(f"✗ Could not connect to database: {e}")
+        sys.exit(1)
+
+    flagged = 0
+    try:
+        for name, sql, params in query_plans.hot_queries():
+            if args.only and name != args.only:
+                continue
+            plan = query_plans.explain(conn, sql, params)
+            scans = query_plans.scans(plan)
+            if scans:
+                flagged += 1
+            if args.quiet and not scans:
+                continue
+            print("=" * 60)
+            print(f"{name}{'  [SCAN]' if scans else ''}")
+            print("=" * 60)
+            for line in plan:
+                print(line.rstrip())
+            print()
+    finally:
+        conn.close()
+
+    if flagged:
+        # An ordered scan under TOP (e.g. the unfiltered list pages) reads only
+        # one page of rows and is expected; scans under filters are not
+        print(f"! {flagged} queries scan a table or index - check they stop early (TOP) or add an index")
+    else:
+        print("✓ All hot queries use index seeks")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,8 +10,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
 try:
     import bcrypt
-    import pyodbc
-    from config import get_connection_string
+    from config import get_connection_string, DB_ENGINE, SQLITE_PATH, BCRYPT_ROUNDS
+    from storage import create_engine
     
     print("=" * 60)
     print("Admin User Creator/Updater")
@@ -26,7 +26,7 @@ try:
     print("Generating password hash...")
     
     # Generate password hash
-    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(BCRYPT_ROUNDS))
     hash_string = hashed.decode('utf-8')
     
     print(f"✓ Hash generated: {hash_string[:50]}...")
@@ -35,7 +35,8 @@ try:
     # Connect to database
     print("Connecting to database...")
     try:
-        conn = pyodbc.connect(get_connection_string())
+        engine = create_engine(DB_ENGINE, get_connection_string(), SQLITE_PATH)
+        conn = engine.connect()
         cursor = conn.cursor()
         print("✓ Connected to database")
         print()
@@ -63,11 +64,8 @@ try:
         else:
             # Insert new admin
             print(f"Creating new admin user '{username}'...")
-            cursor.execute("""
-                INSERT INTO Admin (username, password_hash)
-                OUTPUT INSERTED.admin_id
-                VALUES (?, ?)
-            """, (username, hash_string))
+            cursor.execute(engine.insert_returning('Admin', ['username', 'password_hash'], ['admin_id']),
+                           (username, hash_string))
             admin_id = cursor.fetchone()[0]
             conn.commit()
             
@@ -100,11 +98,11 @@ try:
         
         conn.close()
         
-    except pyodbc.Error as e:
+    except Exception as e:
         print(f"✗ Database error: {e}")
         print()
-        print("Make sure:")
-        print("  1. SQL Server is running")
+        print(f"Make sure (DB_ENGINE = '{DB_ENGINE}'):")
+        print("  1. SQL Server is running (or DB_ENGINE = 'sqlite' in backend/config.py)")
         print("  2. Database 'NSOS' exists")
         print("  3. Admin table exists (run schema.sql)")
         print("  4. Connection settings in backend/config.py are correct")
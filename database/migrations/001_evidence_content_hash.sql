@@ -0,0 +1,14 @@
+-- Content-addressed evidence storage
+-- Adds the hash and size of each evidence file. Older rows keep NULL and
+-- are still served from their original file name in the upload folder.
+
+IF COL_LENGTH('Evidence', 'sha256') IS NULL
+    ALTER TABLE Evidence ADD sha256 CHAR(64) NULL;
+
+IF COL_LENGTH('Evidence', 'file_size') IS NULL
+    ALTER TABLE Evidence ADD file_size BIGINT NULL;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Evidence_sha256')
+    CREATE INDEX IX_Evidence_sha256 ON Evidence (sha256);
+GO
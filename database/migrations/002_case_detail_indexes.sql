@@ -0,0 +1,9 @@
+-- Indexes for the case detail page (/api/cases/<id>/full)
+-- Updates and evidence of one case, newest first
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_CaseUpdate_case_date')
+    CREATE INDEX IX_CaseUpdate_case_date ON CaseUpdate (case_id, update_date DESC, update_id DESC);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Evidence_case_date')
+    CREATE INDEX IX_Evidence_case_date ON Evidence (case_id, upload_date DESC, evidence_id DESC);
+GO
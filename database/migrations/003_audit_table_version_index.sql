@@ -0,0 +1,6 @@
+-- Index for the per-table version tokens behind the API's ETags
+-- (latest AuditLog row per table_name)
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_AuditLog_table_log')
+    CREATE INDEX IX_AuditLog_table_log ON AuditLog (table_name, log_id DESC) INCLUDE (action_date);
+GO
@@ -0,0 +1,43 @@
+-- Index pack for the list, filter and join paths in backend/database.py
+-- Keys match each query's WHERE + ORDER BY so TOP (n) pages are index
+-- seeks; small columns the list pages read are INCLUDEd. Wide text
+-- columns (titles, descriptions) are fetched by key lookup for the page's
+-- rows only.
+
+-- Case list filters (newest first = case_id DESC)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Case_filed_by')
+    CREATE INDEX IX_Case_filed_by ON Case_table (filed_by, case_id DESC);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Case_suspect_id')
+    CREATE INDEX IX_Case_suspect_id ON Case_table (suspect_id, case_id DESC);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Case_status')
+    CREATE INDEX IX_Case_status ON Case_table (status, case_id DESC);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Case_filed_date')
+    CREATE INDEX IX_Case_filed_date ON Case_table (filed_date, case_id DESC);
+
+-- Officers by unit (officer list filter, case / duty filter by unit)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Officer_unit_id')
+    CREATE INDEX IX_Officer_unit_id ON Officer (unit_id, officer_id) INCLUDE (name);
+
+-- Case updates by author (officer delete / FK checks)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_CaseUpdate_updated_by')
+    CREATE INDEX IX_CaseUpdate_updated_by ON CaseUpdate (updated_by);
+
+-- Duty roster, latest first, overall and per officer
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Duty_date_time')
+    CREATE INDEX IX_Duty_date_time ON Duty (duty_date DESC, duty_time DESC, duty_id DESC)
+        INCLUDE (officer_id, location);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Duty_officer_date')
+    CREATE INDEX IX_Duty_officer_date ON Duty (officer_id, duty_date DESC, duty_time DESC, duty_id DESC)
+        INCLUDE (location);
+
+-- Audit log reader (also in schema.sql; older databases never got them)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_AuditLog_action_date')
+    CREATE INDEX IX_AuditLog_action_date ON AuditLog (action_date DESC, log_id DESC);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_AuditLog_table_record')
+    CREATE INDEX IX_AuditLog_table_record ON AuditLog (table_name, record_id, action_date DESC);
+GO
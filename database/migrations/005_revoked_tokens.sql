@@ -0,0 +1,19 @@
+-- Revoked session tokens
+-- Tokens are signed and checked without a query (see backend/tokens.py);
+-- logging out records the token here until it expires. Each worker keeps
+-- the unexpired rows in memory and reads new ones by revocation_id.
+
+IF OBJECT_ID('RevokedToken', 'U') IS NULL
+    CREATE TABLE RevokedToken (
+        revocation_id INT PRIMARY KEY IDENTITY(1,1),
+        token_id VARCHAR(32) NOT NULL,
+        admin_id INT NOT NULL,
+        expires_at DATETIME NOT NULL,
+        revoked_at DATETIME NOT NULL DEFAULT GETDATE(),
+        FOREIGN KEY (admin_id) REFERENCES Admin(admin_id)
+    );
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_RevokedToken_expires_at')
+    CREATE INDEX IX_RevokedToken_expires_at ON RevokedToken (expires_at) INCLUDE (token_id);
+GO
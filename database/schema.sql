@@ -14,11 +14,12 @@ USE NSOS;
 GO
 
 -- Drop tables if they exist (for testing)
+IF OBJECT_ID('RevokedToken', 'U') IS NOT NULL DROP TABLE RevokedToken;
 IF OBJECT_ID('AuditLog', 'U') IS NOT NULL DROP TABLE AuditLog;
 IF OBJECT_ID('Evidence', 'U') IS NOT NULL DROP TABLE Evidence;
 IF OBJECT_ID('CaseUpdate', 'U') IS NOT NULL DROP TABLE CaseUpdate;
 IF OBJECT_ID('Duty', 'U') IS NOT NULL DROP TABLE Duty;
-IF OBJECT_ID('Case', 'U') IS NOT NULL DROP TABLE Case;
+IF OBJECT_ID('Case_table', 'U') IS NOT NULL DROP TABLE Case_table;
 IF OBJECT_ID('Criminal', 'U') IS NOT NULL DROP TABLE Criminal;
 IF OBJECT_ID('Officer', 'U') IS NOT NULL DROP TABLE Officer;
 IF OBJECT_ID('Unit', 'U') IS NOT NULL DROP TABLE Unit;
@@ -58,8 +59,8 @@ CREATE TABLE Criminal (
     notes NVARCHAR(500)
 );
 
--- Case (FIR) table
-CREATE TABLE Case (
+-- Case (FIR) table (Case is a reserved word in T-SQL)
+CREATE TABLE Case_table (
     case_id INT PRIMARY KEY IDENTITY(1,1),
     case_number NVARCHAR(50) NOT NULL UNIQUE,
     title NVARCHAR(200) NOT NULL,
@@ -72,6 +73,13 @@ CREATE TABLE Case (
     FOREIGN KEY (suspect_id) REFERENCES Criminal(criminal_id)
 );
 
+-- Case list filters (newest first)
+CREATE INDEX IX_Case_filed_by ON Case_table (filed_by, case_id DESC);
+CREATE INDEX IX_Case_suspect_id ON Case_table (suspect_id, case_id DESC);
+CREATE INDEX IX_Case_status ON Case_table (status, case_id DESC);
+CREATE INDEX IX_Case_filed_date ON Case_table (filed_date, case_id DESC);
+CREATE INDEX IX_Officer_unit_id ON Officer (unit_id, officer_id) INCLUDE (name);
+
 -- CaseUpdate table for progress notes
 CREATE TABLE CaseUpdate (
     update_id INT PRIMARY KEY IDENTITY(1,1),
@@ -79,7 +87,7 @@ CREATE TABLE CaseUpdate (
     update_text NVARCHAR(1000) NOT NULL,
     update_date DATETIME NOT NULL DEFAULT GETDATE(),
     updated_by INT NOT NULL,
-    FOREIGN KEY (case_id) REFERENCES Case(case_id),
+    FOREIGN KEY (case_id) REFERENCES Case_table(case_id),
     FOREIGN KEY (updated_by) REFERENCES Officer(officer_id)
 );
 
@@ -90,9 +98,19 @@ CREATE TABLE Evidence (
     file_name NVARCHAR(255) NOT NULL,
     description NVARCHAR(500),
     upload_date DATETIME NOT NULL DEFAULT GETDATE(),
-    FOREIGN KEY (case_id) REFERENCES Case(case_id)
+    sha256 CHAR(64) NULL,
+    file_size BIGINT NULL,
+    FOREIGN KEY (case_id) REFERENCES Case_table(case_id)
 );
 
+-- Evidence files are stored once per content hash; this finds the other references
+CREATE INDEX IX_Evidence_sha256 ON Evidence (sha256);
+
+-- Case page: updates and evidence of one case, newest first
+CREATE INDEX IX_CaseUpdate_case_date ON CaseUpdate (case_id, update_date DESC, update_id DESC);
+CREATE INDEX IX_Evidence_case_date ON Evidence (case_id, upload_date DESC, evidence_id DESC);
+CREATE INDEX IX_CaseUpdate_updated_by ON CaseUpdate (updated_by);
+
 -- Duty table for duty assignments
 CREATE TABLE Duty (
     duty_id INT PRIMARY KEY IDENTITY(1,1),
@@ -103,6 +121,10 @@ CREATE TABLE Duty (
     FOREIGN KEY (officer_id) REFERENCES Officer(officer_id)
 );
 
+-- Duty roster, latest first, overall and per officer
+CREATE INDEX IX_Duty_date_time ON Duty (duty_date DESC, duty_time DESC, duty_id DESC) INCLUDE (officer_id, location);
+CREATE INDEX IX_Duty_officer_date ON Duty (officer_id, duty_date DESC, duty_time DESC, duty_id DESC) INCLUDE (location);
+
 -- AuditLog table for tracking actions
 CREATE TABLE AuditLog (
     log_id INT PRIMARY KEY IDENTITY(1,1),
@@ -112,6 +134,23 @@ CREATE TABLE AuditLog (
     action_date DATETIME NOT NULL DEFAULT GETDATE()
 );
 
+-- Audit log reader sorts newest first and filters by table/record
+CREATE INDEX IX_AuditLog_action_date ON AuditLog (action_date DESC, log_id DESC);
+CREATE INDEX IX_AuditLog_table_record ON AuditLog (table_name, record_id, action_date DESC);
+-- Latest change per table (API ETags)
+CREATE INDEX IX_AuditLog_table_log ON AuditLog (table_name, log_id DESC) INCLUDE (action_date);
+
+-- Session tokens revoked before they expire (logout)
+CREATE TABLE RevokedToken (
+    revocation_id INT PRIMARY KEY IDENTITY(1,1),
+    token_id VARCHAR(32) NOT NULL,
+    admin_id INT NOT NULL,
+    expires_at DATETIME NOT NULL,
+    revoked_at DATETIME NOT NULL DEFAULT GETDATE(),
+    FOREIGN KEY (admin_id) REFERENCES Admin(admin_id)
+);
+CREATE INDEX IX_RevokedToken_expires_at ON RevokedToken (expires_at) INCLUDE (token_id);
+
 -- Insert sample data
 
 -- Units
@@ -143,10 +182,10 @@ INSERT INTO Criminal (name, address, cnic, notes)
 VALUES ('Bilal Ahmed', '200 Illegal Ave, City', '23456-2345678-2', 'Suspected in multiple robberies');
 
 -- Cases
-INSERT INTO Case (case_number, title, description, filed_date, filed_by, suspect_id, status) 
+INSERT INTO Case_table (case_number, title, description, filed_date, filed_by, suspect_id, status) 
 VALUES ('FIR-2025-001', 'Theft at Market', 'Reported theft of goods from local market', '2025-01-01', 1, 1, 'Open');
 
-INSERT INTO Case (case_number, title, description, filed_date, filed_by, suspect_id, status) 
+INSERT INTO Case_table (case_number, title, description, filed_date, filed_by, suspect_id, status) 
 VALUES ('FIR-2025-002', 'Robbery Case', 'Armed robbery at bank', '2025-01-02', 2, 2, 'Open');
 
 -- Case Updates
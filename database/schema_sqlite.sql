@@ -0,0 +1,125 @@
+-- NSOS Database Schema (SQLite)
+-- Same tables and indexes as schema.sql plus the migrations, for
+-- DB_ENGINE = 'sqlite'. Run automatically when the database file is
+-- opened, so every statement must be safe to run again.
+--
+-- DATE / DATETIME / TIME column types are read back as Python date /
+-- datetime / time objects (see storage.py), keep them as declared.
+
+-- Unit table for police units
+CREATE TABLE IF NOT EXISTS Unit (
+    unit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    unit_name TEXT NOT NULL UNIQUE
+);
+
+-- Admin table for login
+CREATE TABLE IF NOT EXISTS Admin (
+    admin_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL
+);
+
+-- Officer table
+CREATE TABLE IF NOT EXISTS Officer (
+    officer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    address TEXT,
+    badge_no TEXT NOT NULL UNIQUE,
+    rank TEXT,
+    contact TEXT,
+    unit_id INTEGER REFERENCES Unit(unit_id)
+);
+
+-- Criminal table
+CREATE TABLE IF NOT EXISTS Criminal (
+    criminal_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    address TEXT,
+    cnic TEXT NOT NULL UNIQUE,
+    notes TEXT
+);
+
+-- Case (FIR) table
+CREATE TABLE IF NOT EXISTS Case_table (
+    case_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_number TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    description TEXT,
+    filed_date DATE NOT NULL,
+    filed_by INTEGER NOT NULL REFERENCES Officer(officer_id),
+    suspect_id INTEGER REFERENCES Criminal(criminal_id),
+    status TEXT NOT NULL DEFAULT 'Open'
+);
+
+-- CaseUpdate table for progress notes
+CREATE TABLE IF NOT EXISTS CaseUpdate (
+    update_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_id INTEGER NOT NULL REFERENCES Case_table(case_id),
+    update_text TEXT NOT NULL,
+    update_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_by INTEGER NOT NULL REFERENCES Officer(officer_id)
+);
+
+-- Evidence table
+CREATE TABLE IF NOT EXISTS Evidence (
+    evidence_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    case_id INTEGER NOT NULL REFERENCES Case_table(case_id),
+    file_name TEXT NOT NULL,
+    description TEXT,
+    upload_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    sha256 TEXT NULL,
+    file_size INTEGER NULL
+);
+
+-- Duty table for duty assignments
+CREATE TABLE IF NOT EXISTS Duty (
+    duty_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    officer_id INTEGER NOT NULL REFERENCES Officer(officer_id),
+    duty_date DATE NOT NULL,
+    duty_time TIME NOT NULL,
+    location TEXT NOT NULL
+);
+
+-- AuditLog table for tracking actions
+CREATE TABLE IF NOT EXISTS AuditLog (
+    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    action TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    record_id INTEGER NOT NULL,
+    action_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Session tokens revoked before they expire (logout)
+CREATE TABLE IF NOT EXISTS RevokedToken (
+    revocation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    token_id TEXT NOT NULL,
+    admin_id INTEGER NOT NULL REFERENCES Admin(admin_id),
+    expires_at DATETIME NOT NULL,
+    revoked_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Indexes (same as schema.sql; SQLite has no INCLUDE columns)
+CREATE INDEX IF NOT EXISTS IX_Case_filed_by ON Case_table (filed_by, case_id DESC);
+CREATE INDEX IF NOT EXISTS IX_Case_suspect_id ON Case_table (suspect_id, case_id DESC);
+CREATE INDEX IF NOT EXISTS IX_Case_status ON Case_table (status, case_id DESC);
+CREATE INDEX IF NOT EXISTS IX_Case_filed_date ON Case_table (filed_date, case_id DESC);
+CREATE INDEX IF NOT EXISTS IX_Officer_unit_id ON Officer (unit_id, officer_id, name);
+CREATE INDEX IF NOT EXISTS IX_Evidence_sha256 ON Evidence (sha256);
+CREATE INDEX IF NOT EXISTS IX_CaseUpdate_case_date ON CaseUpdate (case_id, update_date DESC, update_id DESC);
+CREATE INDEX IF NOT EXISTS IX_Evidence_case_date ON Evidence (case_id, upload_date DESC, evidence_id DESC);
+CREATE INDEX IF NOT EXISTS IX_CaseUpdate_updated_by ON CaseUpdate (updated_by);
+CREATE INDEX IF NOT EXISTS IX_Duty_date_time ON Duty (duty_date DESC, duty_time DESC, duty_id DESC);
+CREATE INDEX IF NOT EXISTS IX_Duty_officer_date ON Duty (officer_id, duty_date DESC, duty_time DESC, duty_id DESC);
+CREATE INDEX IF NOT EXISTS IX_AuditLog_action_date ON AuditLog (action_date DESC, log_id DESC);
+CREATE INDEX IF NOT EXISTS IX_AuditLog_table_record ON AuditLog (table_name, record_id, action_date DESC);
+CREATE INDEX IF NOT EXISTS IX_AuditLog_table_log ON AuditLog (table_name, log_id DESC, action_date);
+CREATE INDEX IF NOT EXISTS IX_RevokedToken_expires_at ON RevokedToken (expires_at, token_id);
+
+-- Units
+INSERT OR IGNORE INTO Unit (unit_name) VALUES ('Investigation');
+INSERT OR IGNORE INTO Unit (unit_name) VALUES ('Patrol');
+INSERT OR IGNORE INTO Unit (unit_name) VALUES ('Admin');
+
+-- Admin (password: admin123)
+-- NOTE: Run setup_admin.py to set the real password hash
+INSERT OR IGNORE INTO Admin (username, password_hash) VALUES ('admin', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyYq5q5q5q5q');
@@ -10,10 +10,16 @@ async function apiCall(endpoint, method = 'GET', body = null, isFormData = false
         headers: {}
     };
 
-    // Add admin_id header for authentication (localStorage-based)
-    const adminId = localStorage.getItem('admin_id');
-    if (adminId) {
-        options.headers['X-Admin-ID'] = adminId;
+    // Revalidate cached GET responses: the server answers 304 (no body)
+    // when the data hasn't changed and the browser reuses its copy
+    if (method === 'GET') {
+        options.cache = 'no-cache';
+    }
+
+    // Add the signed session token for authentication (localStorage-based)
+    const token = localStorage.getItem('token');
+    if (token) {
+        options.headers['Authorization'] = `Bearer ${token}`;
     }
 
     if (body) {
@@ -40,6 +46,36 @@ async function apiCall(endpoint, method = 'GET', body = null, isFormData = false
     }
 }
 
+// Build a query string from an object, skipping empty values
+function buildQuery(params = {}) {
+    const query = new URLSearchParams();
+    Object.keys(params).forEach(key => {
+        const value = params[key];
+        if (value !== null && value !== undefined && value !== '') {
+            query.append(key, value);
+        }
+    });
+    const text = query.toString();
+    return text ? `?${text}` : '';
+}
+
+// Fetch one page from a list endpoint - returns { items, next_cursor }
+function getPage(endpoint, params = {}) {
+    return apiCall(`${endpoint}${buildQuery(params)}`, 'GET');
+}
+
+// Follow next_cursor until every page of a list endpoint is loaded
+async function getAllPages(endpoint, params = {}) {
+    let items = [];
+    let cursor = null;
+    do {
+        const page = await getPage(endpoint, { ...params, limit: 1000, cursor: cursor });
+        items = items.concat(page.items);
+        cursor = page.next_cursor;
+    } while (cursor);
+    return items;
+}
+
 // Auth API
 const authAPI = {
     login: (username, password) => apiCall('/login', 'POST', { username, password }),
@@ -47,9 +83,58 @@ const authAPI = {
     checkAuth: () => apiCall('/check-auth', 'GET')
 };
 
+// Add an option to a select box unless it is already there
+function ensureOption(select, value, label) {
+    if (value === null || value === undefined || value === '') return;
+    const exists = Array.from(select.options).some(option => option.value === String(value));
+    if (!exists) {
+        const option = document.createElement('option');
+        option.value = value;
+        option.textContent = label;
+        select.appendChild(option);
+    }
+}
+
+// Select box filled from an options endpoint, for tables too big to list
+// in full: shows the newest rows, typing in filterInput asks for matches.
+// describe(item) returns { value, label }.
+function setupOptionPicker(select, filterInput, loadOptions, describe) {
+    const placeholder = select.options[0];
+    let timer = null;
+
+    async function refresh() {
+        const selected = select.value;
+        const selectedOption = select.selectedIndex > 0 ? select.options[select.selectedIndex] : null;
+        try {
+            const items = await loadOptions(filterInput.value.trim());
+            select.innerHTML = '';
+            select.appendChild(placeholder);
+            items.forEach(item => {
+                const { value, label } = describe(item);
+                ensureOption(select, value, label);
+            });
+            // Keep the current choice even if it doesn't match the new filter
+            if (selectedOption) {
+                ensureOption(select, selected, selectedOption.textContent);
+            }
+            select.value = selected;
+        } catch (error) {
+            console.error('Error loading options:', error);
+        }
+    }
+
+    filterInput.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(refresh, 250);
+    });
+    return refresh();
+}
+
 // Officers API
 const officersAPI = {
-    getAll: () => apiCall('/officers', 'GET'),
+    getAll: (params = {}) => getAllPages('/officers', params),
+    getPage: (params = {}) => getPage('/officers', params),
+    getOptions: () => apiCall('/officers/options', 'GET'),
     getById: (id) => apiCall(`/officers/${id}`, 'GET'),
     create: (data) => apiCall('/officers', 'POST', data),
     update: (id, data) => apiCall(`/officers/${id}`, 'PUT', data),
@@ -58,7 +143,9 @@ const officersAPI = {
 
 // Criminals API
 const criminalsAPI = {
-    getAll: () => apiCall('/criminals', 'GET'),
+    getAll: (params = {}) => getAllPages('/criminals', params),
+    getPage: (params = {}) => getPage('/criminals', params),
+    getOptions: (q = '') => apiCall(`/criminals/options${buildQuery({ q })}`, 'GET'),
     getById: (id) => apiCall(`/criminals/${id}`, 'GET'),
     create: (data) => apiCall('/criminals', 'POST', data),
     update: (id, data) => apiCall(`/criminals/${id}`, 'PUT', data),
@@ -67,27 +154,87 @@ const criminalsAPI = {
 
 // Cases API
 const casesAPI = {
-    getAll: () => apiCall('/cases', 'GET'),
+    getAll: (params = {}) => getAllPages('/cases', params),
+    getPage: (params = {}) => getPage('/cases', params),
+    getOptions: (q = '') => apiCall(`/cases/options${buildQuery({ q })}`, 'GET'),
     getById: (id) => apiCall(`/cases/${id}`, 'GET'),
+    getFull: (id, params = {}) => apiCall(`/cases/${id}/full${buildQuery(params)}`, 'GET'),
     create: (data) => apiCall('/cases', 'POST', data),
     update: (id, data) => apiCall(`/cases/${id}`, 'PUT', data),
     delete: (id) => apiCall(`/cases/${id}`, 'DELETE'),
-    getUpdates: (caseId) => apiCall(`/cases/${caseId}/updates`, 'GET'),
+    getUpdates: (caseId, params = {}) => getPage(`/cases/${caseId}/updates`, params),
     addUpdate: (caseId, data) => apiCall(`/cases/${caseId}/updates`, 'POST', data)
 };
 
 // Evidence API
 const evidenceAPI = {
-    getAll: (caseId = null) => {
-        const endpoint = caseId ? `/evidence?case_id=${caseId}` : '/evidence';
-        return apiCall(endpoint, 'GET');
-    },
-    create: (formData) => apiCall('/evidence', 'POST', formData, true)
+    getAll: (caseId = null) => getAllPages('/evidence', { case_id: caseId }),
+    getPage: (params = {}) => getPage('/evidence', params),
+    create: (formData) => apiCall('/evidence', 'POST', formData, true),
+    delete: (id) => apiCall(`/evidence/${id}`, 'DELETE'),
+    fileUrl: (id) => `http://localhost:5000/uploads/evidence/${id}`,
+    previewUrl: (id) => `http://localhost:5000/uploads/evidence/${id}/preview`,
+    uploadChunked: (file, caseId, description, onProgress, sha256) =>
+        uploadEvidenceChunked(file, caseId, description, onProgress, sha256)
 };
 
+// File types the server makes previews for
+const PREVIEW_EXTENSIONS = ['png', 'jpg', 'jpeg', 'gif', 'pdf'];
+
+// Thumbnail <img> for an evidence record ('' if it can't have one).
+// While the preview is still being generated the image is just hidden.
+function evidencePreviewHtml(ev) {
+    const ext = (ev.file_name || '').split('.').pop().toLowerCase();
+    if (!ev.sha256 || !PREVIEW_EXTENSIONS.includes(ext)) {
+        return '';
+    }
+    return `<img src="${evidenceAPI.previewUrl(ev.evidence_id)}" alt="" class="evidence-thumb" loading="lazy" onerror="this.style.display='none'">`;
+}
+
+// Upload a large evidence file in chunks - a failed chunk is retried from
+// the offset the server reports, so interrupted uploads resume.
+// If the file's sha256 is known and already stored nothing is uploaded.
+async function uploadEvidenceChunked(file, caseId, description, onProgress = null, sha256 = null) {
+    const upload = await apiCall('/evidence/uploads', 'POST', {
+        case_id: caseId,
+        file_name: file.name,
+        description: description,
+        total_size: file.size,
+        sha256: sha256
+    });
+    if (upload.complete) {
+        return upload;
+    }
+    const uploadId = upload.upload_id;
+    let offset = upload.offset;
+    let retries = 0;
+
+    while (offset < file.size) {
+        const chunk = file.slice(offset, offset + upload.chunk_size);
+        try {
+            const result = await apiCall(`/evidence/uploads/${uploadId}?offset=${offset}`, 'PUT', chunk, true);
+            offset = result.offset;
+            retries = 0;
+            if (onProgress) {
+                onProgress(offset, file.size);
+            }
+        } catch (error) {
+            if (++retries > 3) {
+                throw error;
+            }
+            // Ask the server how much it has and continue from there
+            const status = await apiCall(`/evidence/uploads/${uploadId}`, 'GET');
+            offset = status.offset;
+        }
+    }
+
+    return apiCall(`/evidence/uploads/${uploadId}/complete`, 'POST', {});
+}
+
 // Duties API
 const dutiesAPI = {
-    getAll: () => apiCall('/duties', 'GET'),
+    getAll: (params = {}) => getAllPages('/duties', params),
+    getPage: (params = {}) => getPage('/duties', params),
     create: (data) => apiCall('/duties', 'POST', data),
     delete: (id) => apiCall(`/duties/${id}`, 'DELETE')
 };
@@ -102,8 +249,24 @@ const searchAPI = {
     search: (query, type = 'all') => apiCall(`/search?q=${encodeURIComponent(query)}&type=${type}`, 'GET')
 };
 
+// Lookup API (exact / prefix match on CNIC or badge number)
+const lookupAPI = {
+    byCnic: (cnic) => apiCall(`/lookup?cnic=${encodeURIComponent(cnic)}`, 'GET'),
+    byBadge: (badge) => apiCall(`/lookup?badge=${encodeURIComponent(badge)}`, 'GET')
+};
+
+// Export API - URLs for streaming downloads (kind: cases, evidence, audit)
+const exportAPI = {
+    url: (kind, params = {}) => `${API_BASE}/export/${kind}${buildQuery(params)}`
+};
+
+// Stats API
+const statsAPI = {
+    get: () => apiCall('/stats', 'GET')
+};
+
 // Audit API
 const auditAPI = {
-    getLogs: (limit = 100) => apiCall(`/audit?limit=${limit}`, 'GET')
+    getLogs: (params = {}) => getPage('/audit', params)
 };
 
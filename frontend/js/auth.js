@@ -2,8 +2,8 @@
 
 // Check if user is authenticated (using localStorage)
 function checkAuth() {
-    const adminId = localStorage.getItem('admin_id');
-    return adminId !== null && adminId !== '';
+    const token = localStorage.getItem('token');
+    return token !== null && token !== '';
 }
 
 // Redirect to login if not authenticated
@@ -15,13 +15,15 @@ function requireAuth() {
     return true;
 }
     
-// Logout function - clears both localStorage and server session
+// Logout function - revokes the token and clears both localStorage and server session
 async function logout() {
     // Clear server session
+    const token = localStorage.getItem('token');
     try {
         await fetch('http://localhost:5000/api/logout', {
             method: 'POST',
-            credentials: 'include'
+            credentials: 'include',
+            headers: token ? { 'Authorization': `Bearer ${token}` } : {}
         });
     } catch (error) {
         console.error('Logout error:', error);
@@ -29,6 +31,7 @@ async function logout() {
 
     // Clear localStorage
     localStorage.removeItem('admin_id');
+    localStorage.removeItem('token');
     localStorage.removeItem('username');
     window.location.href = 'index.html';
 }
@@ -2,6 +2,7 @@
 
 let caseData = null;
 let officers = [];
+let updatesCursor = null;
 
 document.addEventListener('DOMContentLoaded', async function() {
     if (!requireAuth()) {
@@ -19,7 +20,7 @@ document.addEventListener('DOMContentLoaded', async function() {
     
     // Load officers for update form
     try {
-        officers = await officersAPI.getAll();
+        officers = await officersAPI.getOptions();
         const updatedBySelect = document.getElementById('updated_by');
         officers.forEach(officer => {
             const option = document.createElement('option');
@@ -32,8 +33,8 @@ document.addEventListener('DOMContentLoaded', async function() {
     }
     
     loadCaseDetails(caseId);
-    loadCaseUpdates(caseId);
-    loadCaseEvidence(caseId);
+    
+    document.getElementById('loadMoreUpdatesBtn').addEventListener('click', () => loadMoreUpdates(caseId));
     
     // Update form handler
     document.getElementById('updateForm').addEventListener('submit', async function(e) {
@@ -42,10 +43,15 @@ document.addEventListener('DOMContentLoaded', async function() {
     });
 });
 
+// Case, first page of updates and evidence come back in one request
 async function loadCaseDetails(caseId) {
     try {
-        caseData = await casesAPI.getById(caseId);
+        const details = await casesAPI.getFull(caseId);
+        caseData = details.case;
         renderCaseDetails();
+        renderUpdates(details.updates.items);
+        setUpdatesCursor(details.updates.next_cursor);
+        renderEvidence(details.evidence);
     } catch (error) {
         console.error('Error loading case details:', error);
         document.getElementById('caseDetails').innerHTML = '<p>Error loading case details</p>';
@@ -73,23 +79,39 @@ function renderCaseDetails() {
 
 async function loadCaseUpdates(caseId) {
     try {
-        const updates = await casesAPI.getUpdates(caseId);
-        renderUpdates(updates);
+        const page = await casesAPI.getUpdates(caseId);
+        renderUpdates(page.items);
+        setUpdatesCursor(page.next_cursor);
     } catch (error) {
         console.error('Error loading updates:', error);
         document.getElementById('caseUpdates').innerHTML = '<p>Error loading updates</p>';
     }
 }
 
-function renderUpdates(updates) {
+async function loadMoreUpdates(caseId) {
+    try {
+        const page = await casesAPI.getUpdates(caseId, { cursor: updatesCursor });
+        renderUpdates(page.items, true);
+        setUpdatesCursor(page.next_cursor);
+    } catch (error) {
+        console.error('Error loading updates:', error);
+    }
+}
+
+function setUpdatesCursor(cursor) {
+    updatesCursor = cursor;
+    document.getElementById('loadMoreUpdatesBtn').style.display = cursor ? '' : 'none';
+}
+
+function renderUpdates(updates, append = false) {
     const container = document.getElementById('caseUpdates');
     
-    if (updates.length === 0) {
+    if (updates.length === 0 && !append) {
         container.innerHTML = '<p>No updates yet</p>';
         return;
     }
     
-    container.innerHTML = updates.map(update => `
+    const html = updates.map(update => `
         <div class="update-item">
             <div class="update-meta">
                 ${update.officer_name || 'Unknown'} - ${update.update_date || ''}
@@ -97,15 +119,10 @@ function renderUpdates(updates) {
             <div>${update.update_text}</div>
         </div>
     `).join('');
-}
-
-async function loadCaseEvidence(caseId) {
-    try {
-        const evidence = await evidenceAPI.getAll(caseId);
-        renderEvidence(evidence);
-    } catch (error) {
-        console.error('Error loading evidence:', error);
-        document.getElementById('caseEvidence').innerHTML = '<p>Error loading evidence</p>';
+    if (append) {
+        container.insertAdjacentHTML('beforeend', html);
+    } else {
+        container.innerHTML = html;
     }
 }
 
@@ -119,12 +136,13 @@ function renderEvidence(evidence) {
     
     container.innerHTML = evidence.map(ev => `
         <div class="evidence-item">
+            ${evidencePreviewHtml(ev)}
             <div>
                 <strong>${ev.file_name}</strong>
                 <p>${ev.description || 'No description'}</p>
                 <small>Uploaded: ${ev.upload_date || ''}</small>
             </div>
-            <a href="http://localhost:5000/uploads/${ev.file_name}" target="_blank" class="btn btn-primary">Download</a>
+            <a href="${evidenceAPI.fileUrl(ev.evidence_id)}" target="_blank" class="btn btn-primary">Download</a>
         </div>
     `).join('');
 }
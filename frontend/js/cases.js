@@ -2,21 +2,19 @@
 
 let cases = [];
 let officers = [];
-let criminals = [];
 let editingCaseId = null;
+let nextCursor = null;
 
 document.addEventListener('DOMContentLoaded', async function() {
     if (!requireAuth()) {
         return; // Already redirected to login
     }
     
-    // Load officers and criminals for dropdowns
+    // Load officers for the dropdown; criminals are searched as you type
     try {
-        officers = await officersAPI.getAll();
-        criminals = await criminalsAPI.getAll();
+        officers = await officersAPI.getOptions();
         
         const filedBySelect = document.getElementById('filed_by');
-        const suspectSelect = document.getElementById('suspect_id');
         
         officers.forEach(officer => {
             const option = document.createElement('option');
@@ -24,19 +22,20 @@ document.addEventListener('DOMContentLoaded', async function() {
             option.textContent = officer.name;
             filedBySelect.appendChild(option);
         });
-        
-        criminals.forEach(criminal => {
-            const option = document.createElement('option');
-            option.value = criminal.criminal_id;
-            option.textContent = criminal.name;
-            suspectSelect.appendChild(option);
-        });
     } catch (error) {
         console.error('Error loading data:', error);
     }
     
+    setupOptionPicker(document.getElementById('suspect_id'), document.getElementById('suspect_filter'),
+        criminalsAPI.getOptions,
+        criminal => ({ value: criminal.criminal_id, label: `${criminal.name} (${criminal.cnic})` }));
+    
     loadCases();
     
+    document.getElementById('loadMoreBtn').addEventListener('click', () => {
+        loadCases(true);
+    });
+    
     // Form handlers
     document.getElementById('addCaseBtn').addEventListener('click', () => {
         showForm();
@@ -52,10 +51,14 @@ document.addEventListener('DOMContentLoaded', async function() {
     });
 });
 
-async function loadCases() {
+async function loadCases(append = false) {
     try {
-        cases = await casesAPI.getAll();
+        // Load one page at a time, "Load More" fetches the next one
+        const page = await casesAPI.getPage({ cursor: append ? nextCursor : null });
+        cases = append ? cases.concat(page.items) : page.items;
+        nextCursor = page.next_cursor;
         renderCases();
+        document.getElementById('loadMoreBtn').style.display = nextCursor ? 'inline-block' : 'none';
     } catch (error) {
         console.error('Error loading cases:', error);
         document.getElementById('casesTableBody').innerHTML = 
@@ -117,7 +120,9 @@ async function editCase(id) {
     document.getElementById('description').value = caseItem.description || '';
     document.getElementById('filed_date').value = caseItem.filed_date;
     document.getElementById('filed_by').value = caseItem.filed_by;
-    document.getElementById('suspect_id').value = caseItem.suspect_id || '';
+    const suspectSelect = document.getElementById('suspect_id');
+    ensureOption(suspectSelect, caseItem.suspect_id, caseItem.suspect_name);
+    suspectSelect.value = caseItem.suspect_id || '';
     document.getElementById('status').value = caseItem.status;
     document.getElementById('formTitle').textContent = 'Edit Case';
     document.getElementById('caseForm').style.display = 'flex';
@@ -2,6 +2,7 @@
 
 let criminals = [];
 let editingCriminalId = null;
+let nextCursor = null;
 
 document.addEventListener('DOMContentLoaded', async function() {
     if (!requireAuth()) {
@@ -10,6 +11,10 @@ document.addEventListener('DOMContentLoaded', async function() {
     
     loadCriminals();
     
+    document.getElementById('loadMoreBtn').addEventListener('click', () => {
+        loadCriminals(true);
+    });
+    
     // Form handlers
     document.getElementById('addCriminalBtn').addEventListener('click', () => {
         showForm();
@@ -25,10 +30,14 @@ document.addEventListener('DOMContentLoaded', async function() {
     });
 });
 
-async function loadCriminals() {
+async function loadCriminals(append = false) {
     try {
-        criminals = await criminalsAPI.getAll();
+        // Load one page at a time, "Load More" fetches the next one
+        const page = await criminalsAPI.getPage({ cursor: append ? nextCursor : null });
+        criminals = append ? criminals.concat(page.items) : page.items;
+        nextCursor = page.next_cursor;
         renderCriminals();
+        document.getElementById('loadMoreBtn').style.display = nextCursor ? 'inline-block' : 'none';
     } catch (error) {
         console.error('Error loading criminals:', error);
         document.getElementById('criminalsTableBody').innerHTML = 
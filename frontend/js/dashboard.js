@@ -6,18 +6,14 @@ document.addEventListener('DOMContentLoaded', async function() {
         return; // Already redirected to login
     }
     
-    // Load statistics
+    // Load statistics (counts are computed on the server)
     try {
-        const officers = await officersAPI.getAll();
-        const criminals = await criminalsAPI.getAll();
-        const cases = await casesAPI.getAll();
+        const stats = await statsAPI.get();
         
-        document.getElementById('officerCount').textContent = officers.length;
-        document.getElementById('criminalCount').textContent = criminals.length;
-        document.getElementById('caseCount').textContent = cases.length;
-        
-        const openCases = cases.filter(c => c.status === 'Open').length;
-        document.getElementById('openCaseCount').textContent = openCases;
+        document.getElementById('officerCount').textContent = stats.officers;
+        document.getElementById('criminalCount').textContent = stats.criminals;
+        document.getElementById('caseCount').textContent = stats.cases;
+        document.getElementById('openCaseCount').textContent = stats.open_cases;
     } catch (error) {
         console.error('Error loading dashboard stats:', error);
     }
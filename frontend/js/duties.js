@@ -2,6 +2,7 @@
 
 let duties = [];
 let officers = [];
+let nextCursor = null;
 
 document.addEventListener('DOMContentLoaded', async function() {
     if (!requireAuth()) {
@@ -10,7 +11,7 @@ document.addEventListener('DOMContentLoaded', async function() {
     
     // Load officers for dropdown
     try {
-        officers = await officersAPI.getAll();
+        officers = await officersAPI.getOptions();
         const officerSelect = document.getElementById('duty_officer_id');
         officers.forEach(officer => {
             const option = document.createElement('option');
@@ -24,6 +25,10 @@ document.addEventListener('DOMContentLoaded', async function() {
     
     loadDuties();
     
+    document.getElementById('loadMoreBtn').addEventListener('click', () => {
+        loadDuties(true);
+    });
+    
     // Form handlers
     document.getElementById('addDutyBtn').addEventListener('click', () => {
         document.getElementById('dutyForm').style.display = 'flex';
@@ -40,10 +45,14 @@ document.addEventListener('DOMContentLoaded', async function() {
     });
 });
 
-async function loadDuties() {
+async function loadDuties(append = false) {
     try {
-        duties = await dutiesAPI.getAll();
+        // Load one page at a time, "Load More" fetches the next one
+        const page = await dutiesAPI.getPage({ cursor: append ? nextCursor : null });
+        duties = append ? duties.concat(page.items) : page.items;
+        nextCursor = page.next_cursor;
         renderDuties();
+        document.getElementById('loadMoreBtn').style.display = nextCursor ? 'inline-block' : 'none';
     } catch (error) {
         console.error('Error loading duties:', error);
         document.getElementById('dutiesTableBody').innerHTML = 
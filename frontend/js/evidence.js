@@ -1,29 +1,27 @@
 // Evidence page functionality
 
 let evidence = [];
-let cases = [];
+let nextCursor = null;
+
+// Files bigger than this are uploaded in chunks
+const CHUNKED_UPLOAD_THRESHOLD = 8 * 1024 * 1024;
 
 document.addEventListener('DOMContentLoaded', async function() {
     if (!requireAuth()) {
         return; // Already redirected to login
     }
     
-    // Load cases for dropdown
-    try {
-        cases = await casesAPI.getAll();
-        const caseSelect = document.getElementById('evidence_case_id');
-        cases.forEach(caseItem => {
-            const option = document.createElement('option');
-            option.value = caseItem.case_id;
-            option.textContent = `${caseItem.case_number} - ${caseItem.title}`;
-            caseSelect.appendChild(option);
-        });
-    } catch (error) {
-        console.error('Error loading cases:', error);
-    }
+    // Case dropdown: newest cases, searched as you type
+    setupOptionPicker(document.getElementById('evidence_case_id'), document.getElementById('evidence_case_filter'),
+        casesAPI.getOptions,
+        caseItem => ({ value: caseItem.case_id, label: `${caseItem.case_number} - ${caseItem.title}` }));
     
     loadEvidence();
     
+    document.getElementById('loadMoreBtn').addEventListener('click', () => {
+        loadEvidence(true);
+    });
+    
     // Form handlers
     document.getElementById('addEvidenceBtn').addEventListener('click', () => {
         document.getElementById('evidenceForm').style.display = 'flex';
@@ -40,10 +38,14 @@ document.addEventListener('DOMContentLoaded', async function() {
     });
 });
 
-async function loadEvidence() {
+async function loadEvidence(append = false) {
     try {
-        evidence = await evidenceAPI.getAll();
+        // Load one page at a time, "Load More" fetches the next one
+        const page = await evidenceAPI.getPage({ cursor: append ? nextCursor : null });
+        evidence = append ? evidence.concat(page.items) : page.items;
+        nextCursor = page.next_cursor;
         renderEvidence();
+        document.getElementById('loadMoreBtn').style.display = nextCursor ? 'inline-block' : 'none';
     } catch (error) {
         console.error('Error loading evidence:', error);
         document.getElementById('evidenceTableBody').innerHTML = 
@@ -63,11 +65,11 @@ function renderEvidence() {
         <tr>
             <td>${ev.evidence_id}</td>
             <td>${ev.case_number || '-'}</td>
-            <td>${ev.file_name}</td>
+            <td>${evidencePreviewHtml(ev)} ${ev.file_name}</td>
             <td>${ev.description || '-'}</td>
             <td>${ev.upload_date || '-'}</td>
             <td>
-                <a href="http://localhost:5000/uploads/${ev.file_name}" target="_blank" class="action-btn action-btn-view">Download</a>
+                <a href="${evidenceAPI.fileUrl(ev.evidence_id)}" target="_blank" class="action-btn action-btn-view">Download</a>
             </td>
         </tr>
     `).join('');
@@ -89,7 +91,12 @@ async function uploadEvidence() {
     formData.append('description', description);
     
     try {
-        await evidenceAPI.create(formData);
+        // Large files go through the chunked (resumable) upload
+        if (fileInput.files[0].size > CHUNKED_UPLOAD_THRESHOLD) {
+            await evidenceAPI.uploadChunked(fileInput.files[0], caseId, description);
+        } else {
+            await evidenceAPI.create(formData);
+        }
         document.getElementById('evidenceForm').style.display = 'none';
         document.getElementById('evidenceFormElement').reset();
         loadEvidence();
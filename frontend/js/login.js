@@ -37,6 +37,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
             // Login successful - store in localStorage
             localStorage.setItem('admin_id', data.admin_id);
+            localStorage.setItem('token', data.token);
             localStorage.setItem('username', data.username || username);
 
             // Redirect to dashboard
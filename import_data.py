@@ -0,0 +1,73 @@
+# Script to bulk import legacy data from CSV or NDJSON files
+# Uses backend/config.py for database connection
+# Usage: python import_data.py cases old_firs.csv
+#        python import_data.py criminals criminals.ndjson --errors bad_rows.ndjson
+
+import sys
+import os
+import argparse
+import json
+
+# Add backend to path so we can import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+import bulk_import
+import database as db
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import officers, criminals, cases or duties')
+    parser.add_argument('kind', choices=sorted(bulk_import.IMPORT_SPECS), help='what the file contains')
+    parser.add_argument('path', help='CSV or NDJSON file ("-" reads stdin)')
+    parser.add_argument('--format', choices=['csv', 'ndjson'], help='default: from file extension')
+    parser.add_argument('--batch-size', type=int, default=1000, help='rows per transaction (default 1000)')
+    parser.add_argument('--errors', help='write rejected rows to this NDJSON file')
+    args = parser.parse_args()
+
+    fmt = args.format
+    if not fmt:
+        fmt = 'ndjson' if args.path.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+
+    print("=" * 60)
+    print(f"Bulk import: {args.kind} from {args.path} ({fmt})")
+    print("=" * 60)
+
+    errors_file = open(args.errors, 'w', encoding='utf-8') if args.errors else None
+
+    def on_error(line_no, error):
+        if errors_file:
+            errors_file.write(json.dumps({'line': line_no, 'error': error}) + '\n')
+
+    def on_batch(result):
+        print(f"  batch {result.batches}: {result.rows_read} read, {result.inserted} inserted, "
+              f"{result.failed} failed ({result.rows_per_sec:.0f} rows/sec)")
+
+    try:
+        if args.path == '-':
+            stream = sys.stdin.buffer
+        else:
+            stream = open(args.path, 'rb')
+        with stream:
+            result = bulk_import.import_stream(args.kind, stream, fmt, args.batch_size,
+                                               on_batch=on_batch, on_error=on_error,
+                                               background_refresh=False)
+    finally:
+        if errors_file:
+            errors_file.close()
+        # Give queued audit rows a chance to be written
+        db.flush_audit()
+
+    print()
+    print(f"✓ Done in {result.seconds:.1f}s: {result.inserted} of {result.rows_read} rows imported "
+          f"({result.rows_per_sec:.0f} rows/sec)")
+    if result.failed:
+        print(f"✗ {result.failed} rows rejected")
+        for error in result.errors[:10]:
+            print(f"  line {error['line']}: {error['error']}")
+        if args.errors:
+            print(f"  All rejected rows written to {args.errors}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
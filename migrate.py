@@ -0,0 +1,58 @@
+# Script to apply database migrations (database/migrations/NNN_name.sql)
+# Uses backend/config.py for database connection
+# Usage: python migrate.py             apply all pending migrations
+#        python migrate.py --status    show applied / pending migrations
+#        python migrate.py --to 3      apply up to version 3
+
+import sys
+import os
+import argparse
+
+# Add backend to path so we can import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+import migrations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply versioned schema migrations')
+    parser.add_argument('--status', action='store_true', help='list migrations and exit')
+    parser.add_argument('--to', type=int, help='apply up to this version')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("NSOS schema migrations")
+    print("=" * 60)
+
+    try:
+        conn = migrations.connect()
+    except Exception as e:
+        print(f"✗ Could not connect to database: {e}")
+        sys.exit(1)
+
+    try:
+        if args.status:
+            for migration, state in migrations.status(conn):
+                print(f"  {migration.version:03d} {migration.name:<40} {state}")
+            return
+
+        def on_apply(migration):
+            print(f"  applying {migration.version:03d} {migration.name} ...")
+
+        try:
+            applied = migrations.migrate(conn, args.to, on_apply)
+        except Exception as e:
+            print(f"✗ Migration failed (rolled back): {e}")
+            sys.exit(1)
+
+        changed = [m for m, state in migrations.status(conn) if state == 'changed']
+        print()
+        print(f"✓ {len(applied)} migration(s) applied" if applied else "✓ Schema is up to date")
+        for migration in changed:
+            print(f"! {migration.version:03d} {migration.name} was edited after it was applied")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# Script to benchmark the REST API with synthetic data
+# Uses backend/config.py for database connection, or a local SQLite file with --sqlite
+# Usage: python run_benchmark.py generate --scale 10k --sqlite bench.db
+#        python run_benchmark.py run --sqlite bench.db --save baseline.json
+#        python run_benchmark.py run --sqlite bench.db --compare baseline.json
+#        python run_benchmark.py run --sqlite bench.db --mode asgi --compare baseline.json
+
+import sys
+import os
+import argparse
+
+# Add backend to path so we can import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+import config
+
+
+def use_sqlite(path):
+    """Point the backend at a local SQLite file instead of SQL Server
+
+    Must run before database is imported (it reads the config on import).
+    """
+    path = os.path.abspath(path)
+    config.DB_ENGINE = 'sqlite'
+    config.SQLITE_PATH = path
+    config.SEARCH_INDEX_PATH = path + '.search'
+
+
+def generate(args):
+    import synthetic
+
+    scale = args.scale.lower()
+    cases = synthetic.SCALES[scale] if scale in synthetic.SCALES else int(scale)
+
+    print("=" * 60)
+    print(f"Generating synthetic data: {cases} cases")
+    print("=" * 60)
+    for table, count in synthetic.scale_rows(cases).items():
+        print(f"  {table}: {count}")
+    print()
+
+    def on_progress(table, inserted):
+        print(f"  {table}: {inserted} rows", end='\r')
+
+    counts = synthetic.generate(cases, seed=args.seed, batch_size=args.batch_size,
+                                on_progress=on_progress)
+    print()
+    print(f"✓ Done in {counts['seconds']}s: {counts['audit']} rows, plus one audit row each")
+
+
+def run(args):
+    import benchmark
+
+    scenarios = args.only or list(benchmark.SCENARIOS)
+    unknown = [name for name in scenarios if name not in benchmark.SCENARIOS]
+    if unknown:
+        print(f"✗ Unknown scenario(s): {', '.join(unknown)} (choose from {', '.join(benchmark.SCENARIOS)})")
+        sys.exit(2)
+
+    limit = f"{args.requests} requests" if args.requests else f"{args.duration:g}s"
+    print("=" * 60)
+    print(f"API benchmark ({args.mode.upper()}): {len(scenarios)} scenarios, {args.clients} clients, {limit} each")
+    print("=" * 60)
+    print(f"{'scenario':<16}{'req':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'RSS MB':>8}{'errors':>8}")
+
+    def on_result(name, r):
+        print(f"{name:<16}{r['requests']:>8}{r['throughput'] or 0:>9.1f}{r['p50_ms'] or 0:>9.2f}"
+              f"{r['p95_ms'] or 0:>9.2f}{r['p99_ms'] or 0:>9.2f}{r['peak_rss_mb'] or 0:>8.1f}{r['errors']:>8}")
+
+    report = benchmark.run(scenarios, args.clients, args.duration, args.requests, args.warmup,
+                           on_result=on_result, mode=args.mode)
+
+    if args.save:
+        benchmark.save(report, args.save)
+        print()
+        print(f"✓ Results saved to {args.save}")
+
+    if args.compare:
+        rows = benchmark.compare(report, benchmark.load(args.compare), args.threshold)
+        regressions = [row for row in rows if row[5]]
+        print()
+        print(f"Compared with {args.compare} (threshold {args.threshold:g}%):")
+        for name, metric, old, new, change, regressed in rows:
+            mark = '✗' if regressed else ' '
+            print(f"  {mark} {name:<16}{metric:<13}{old:>10}{new:>10}{change:>+9.1f}%")
+        if regressions:
+            print(f"✗ {len(regressions)} regression(s)")
+            sys.exit(1)
+        print("✓ No regressions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the REST API with synthetic data')
+    parser.add_argument('--sqlite', metavar='PATH', help='use a local SQLite database file instead of SQL Server')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    gen = commands.add_parser('generate', help='insert synthetic officers, criminals, cases, ...')
+    gen.add_argument('--scale', default='10k', help='number of cases: 10k, 100k, 1m or a number')
+    gen.add_argument('--seed', type=int, default=42)
+    gen.add_argument('--batch-size', type=int, default=5000, help='rows per transaction (default 5000)')
+
+    bench = commands.add_parser('run', help='run the benchmark scenarios')
+    bench.add_argument('--only', nargs='+', metavar='SCENARIO', help='run only these scenarios')
+    bench.add_argument('--clients', type=int, default=8, help='concurrent clients (default 8)')
+    bench.add_argument('--duration', type=float, default=10.0, help='seconds per scenario (default 10)')
+    bench.add_argument('--requests', type=int, help='stop each scenario after this many requests')
+    bench.add_argument('--warmup', type=float, default=1.0, help='unmeasured seconds per scenario (default 1)')
+    bench.add_argument('--mode', choices=['wsgi', 'asgi'], default='wsgi',
+                       help='call the app directly or through the ASGI adapter (default wsgi)')
+    bench.add_argument('--save', metavar='PATH', help='write results as JSON (e.g. a new baseline)')
+    bench.add_argument('--compare', metavar='PATH', help='compare with saved results, exit 1 on regressions')
+    bench.add_argument('--threshold', type=float, default=10.0,
+                       help='percent change that counts as a regression (default 10)')
+
+    args = parser.parse_args()
+    if args.sqlite:
+        use_sqlite(args.sqlite)
+
+    if args.command == 'generate':
+        generate(args)
+    else:
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
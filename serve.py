@@ -0,0 +1,103 @@
+# Script to run the backend in production: several worker processes with
+# a pool of threads each (see backend/prefork.py)
+# Uses the SERVER_* settings in backend/config.py; options override them
+# Usage: python serve.py
+#        python serve.py --bind 127.0.0.1:8000 --workers 8 --threads 16
+# Reload (new workers, no dropped requests): kill -HUP <master pid>
+# Stop (in-flight requests finish first):   kill -TERM <master pid>
+
+import sys
+import os
+import argparse
+
+# Add backend to path so we can import
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+import config
+import logs
+
+
+def load_app():
+    from app import app
+    return app
+
+
+def on_preload(app):
+    """Fill the caches once in the master, then drop its DB connections"""
+    import database as db
+    db.preload()
+    # Workers open their own connections; a forked connection would be shared
+    db.close_pool()
+
+
+def post_fork():
+    # The master's log writer thread isn't copied into the worker
+    logs.after_fork()
+
+
+def worker_init(app):
+    profiler = app.extensions.get('nsos_profiler')
+    if profiler is not None:
+        profiler.start()
+
+
+def worker_exit(app):
+    """Write what the worker still holds before it exits"""
+    import database as db
+    import utils
+    db.flush_audit()
+    db.close_pool()
+    # The worker leaves with os._exit(): pool processes must be gone by then
+    utils.password_hasher.shutdown(wait=True)
+    utils.previews.shutdown(wait=True)
+    logs.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the NSOS backend with pre-forked workers")
+    parser.add_argument('--bind', default=config.SERVER_BIND, help="host:port (default %(default)s)")
+    parser.add_argument('--workers', type=int, default=config.SERVER_WORKERS,
+                        help="worker processes (default %(default)s)")
+    parser.add_argument('--threads', type=int, default=config.SERVER_THREADS,
+                        help="request threads per worker (default %(default)s)")
+    parser.add_argument('--max-requests', type=int, default=config.SERVER_MAX_REQUESTS,
+                        help="replace a worker after this many requests, 0: never (default %(default)s)")
+    parser.add_argument('--max-requests-jitter', type=int, default=config.SERVER_MAX_REQUESTS_JITTER,
+                        help="random extra requests per worker (default %(default)s)")
+    parser.add_argument('--graceful-timeout', type=float, default=config.SERVER_GRACEFUL_TIMEOUT,
+                        help="seconds a stopping worker may finish its requests (default %(default)s)")
+    parser.add_argument('--no-preload', dest='preload', action='store_false', default=config.SERVER_PRELOAD,
+                        help="import the app in each worker; a reload (HUP) then picks up code changes")
+    args = parser.parse_args()
+
+    host, _, port = args.bind.rpartition(':')
+    if not host or not port.isdigit():
+        print(f"✗ --bind must be host:port, got {args.bind!r}")
+        sys.exit(2)
+    if not hasattr(os, 'fork'):
+        print("✗ serve.py needs os.fork (Linux or macOS); on Windows run an ASGI server, see README")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"NSOS server on {args.bind}: {args.workers} workers x {args.threads} threads")
+    print("=" * 60)
+
+    logs.setup_from_config()
+    from prefork import PreforkServer
+    server = PreforkServer(
+        load_app, host.strip('[]'), int(port),
+        workers=args.workers,
+        threads=args.threads,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout,
+        preload=args.preload,
+        on_preload=on_preload,
+        post_fork=post_fork,
+        worker_init=worker_init,
+        worker_exit=worker_exit)
+    server.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# Test setup: the app runs on the SQLite engine (see backend/storage.py)
+# against a fresh database, search index and upload folder in a temporary
+# directory. The backend modules read config at import time, so it is
+# changed here before anything imports them.
+
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+import config
+
+TMP_DIR = tempfile.mkdtemp(prefix='nsos-tests-')
+config.DB_ENGINE = 'sqlite'
+config.SQLITE_PATH = os.path.join(TMP_DIR, 'nsos.db')
+config.SEARCH_INDEX_PATH = os.path.join(TMP_DIR, 'search_index.db')
+config.CACHE_BACKEND = 'memory'
+config.UPLOAD_FOLDER = os.path.join(TMP_DIR, 'uploads')
+config.PROFILE_DIR = os.path.join(TMP_DIR, 'profiles')
+config.BCRYPT_ROUNDS = 4  # the cheapest cost bcrypt allows
+config.PASSWORD_HASH_WORKERS = 0
+config.LOG_LEVEL = 'WARNING'
+
+import app as app_module
+import database as db
+import utils
+
+ADMIN_USERNAME = 'tester'
+ADMIN_PASSWORD = 'tester-password'
+
+# Unique badge numbers, CNICs and case numbers across tests
+_serial = itertools.count(1)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    db.close_pool()
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def app():
+    conn = db.get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO Admin (username, password_hash) VALUES (?, ?)",
+                       (ADMIN_USERNAME, utils.hash_password(ADMIN_PASSWORD)))
+        conn.commit()
+    finally:
+        conn.close()
+    return app_module.app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope='session')
+def auth(app):
+    """Authorization header of a logged in admin"""
+    response = app.test_client().post('/api/login', json={'username': ADMIN_USERNAME,
+                                                          'password': ADMIN_PASSWORD})
+    assert response.status_code == 200
+    return {'Authorization': 'Bearer ' + response.get_json()['token']}
+
+
+def serial():
+    return next(_serial)
+
+
+def create(client, auth, path, body, id_field):
+    response = client.post(path, json=body, headers=auth)
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()[id_field]
+
+
+@pytest.fixture
+def officer(client, auth):
+    n = serial()
+    return create(client, auth, '/api/officers',
+                  {'name': f'Officer {n}', 'badge_no': f'T-{n:05d}', 'rank': 'SI', 'unit_id': 1},
+                  'officer_id')
+
+
+@pytest.fixture
+def criminal(client, auth):
+    n = serial()
+    return create(client, auth, '/api/criminals',
+                  {'name': f'Suspect {n}', 'cnic': f'35202-{n:07d}-1'}, 'criminal_id')
+
+
+@pytest.fixture
+def case(client, auth, officer, criminal):
+    n = serial()
+    return create(client, auth, '/api/cases',
+                  {'case_number': f'FIR-T-{n}', 'title': f'Test case {n}', 'filed_date': '2026-01-15',
+                   'filed_by': officer, 'suspect_id': criminal}, 'case_id')
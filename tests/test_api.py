@@ -0,0 +1,161 @@
+# REST API against the SQLite engine: CRUD, keyset paging, stats, case detail
+
+import pytest
+
+from conftest import create, serial
+from pagination import encode_cursor
+
+
+def test_requires_login(client):
+    assert client.get('/api/cases').status_code == 401
+    assert client.get('/api/cases', headers={'Authorization': 'Bearer nonsense'}).status_code == 401
+
+
+def test_officer_crud(client, auth):
+    n = serial()
+    officer_id = create(client, auth, '/api/officers',
+                        {'name': 'Asad Khan', 'badge_no': f'B-{n}', 'rank': 'ASI', 'unit_id': 2},
+                        'officer_id')
+
+    officer = client.get(f'/api/officers/{officer_id}', headers=auth).get_json()
+    assert officer['name'] == 'Asad Khan'
+    assert officer['badge_no'] == f'B-{n}'
+
+    response = client.put(f'/api/officers/{officer_id}', headers=auth,
+                          json={'name': 'Asad Khan', 'badge_no': f'B-{n}', 'rank': 'SI', 'unit_id': 2})
+    assert response.status_code == 200
+    assert client.get(f'/api/officers/{officer_id}', headers=auth).get_json()['rank'] == 'SI'
+
+    assert client.delete(f'/api/officers/{officer_id}', headers=auth).status_code == 200
+    assert client.get(f'/api/officers/{officer_id}', headers=auth).status_code == 404
+
+
+def test_criminal_crud(client, auth):
+    n = serial()
+    criminal_id = create(client, auth, '/api/criminals',
+                         {'name': 'Bilal Ahmed', 'cnic': f'61101-{n:07d}-3', 'notes': 'first'},
+                         'criminal_id')
+
+    response = client.put(f'/api/criminals/{criminal_id}', headers=auth,
+                          json={'name': 'Bilal Ahmed', 'cnic': f'61101-{n:07d}-3', 'notes': 'second'})
+    assert response.status_code == 200
+    assert client.get(f'/api/criminals/{criminal_id}', headers=auth).get_json()['notes'] == 'second'
+
+    assert client.delete(f'/api/criminals/{criminal_id}', headers=auth).status_code == 200
+    assert client.get(f'/api/criminals/{criminal_id}', headers=auth).status_code == 404
+
+
+def test_create_validates_required_fields(client, auth):
+    assert client.post('/api/officers', json={'name': 'No badge'}, headers=auth).status_code == 400
+    assert client.post('/api/criminals', json={'cnic': '1'}, headers=auth).status_code == 400
+    assert client.post('/api/cases', json={'title': 'No number'}, headers=auth).status_code == 400
+
+
+def test_case_crud(client, auth, case, officer):
+    case_item = client.get(f'/api/cases/{case}', headers=auth).get_json()
+    assert case_item['status'] == 'Open'
+    assert case_item['filed_by'] == officer
+
+    body = dict(case_item, status='Closed', suspect_id=None)
+    assert client.put(f'/api/cases/{case}', json=body, headers=auth).status_code == 200
+    updated = client.get(f'/api/cases/{case}', headers=auth).get_json()
+    assert updated['status'] == 'Closed'
+    assert updated['suspect_id'] is None
+
+    assert client.delete(f'/api/cases/{case}', headers=auth).status_code == 200
+    assert client.get(f'/api/cases/{case}', headers=auth).status_code == 404
+
+
+def test_case_keyset_paging(client, auth, officer):
+    created = []
+    for _ in range(5):
+        n = serial()
+        created.append(create(client, auth, '/api/cases',
+                              {'case_number': f'FIR-P-{n}', 'title': 'Paged', 'filed_date': '2026-02-01',
+                               'filed_by': officer}, 'case_id'))
+
+    seen = []
+    cursor = None
+    while True:
+        query = {'limit': 2, 'filed_by': officer}
+        if cursor:
+            query['cursor'] = cursor
+        page = client.get('/api/cases', query_string=query, headers=auth).get_json()
+        assert len(page['items']) <= 2
+        seen.extend(item['case_id'] for item in page['items'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    # Newest first, every case exactly once
+    assert seen == sorted(created, reverse=True)
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', encode_cursor([None]), encode_cursor(['x'])])
+def test_paging_rejects_bad_cursor(client, auth, cursor):
+    response = client.get('/api/cases', query_string={'cursor': cursor}, headers=auth)
+    assert response.status_code == 400
+
+
+def test_stats_follow_writes(client, auth, officer):
+    before = client.get('/api/stats', headers=auth).get_json()
+    n = serial()
+    create(client, auth, '/api/cases',
+           {'case_number': f'FIR-S-{n}', 'title': 'Counted', 'filed_date': '2026-03-01',
+            'filed_by': officer, 'status': 'Open'}, 'case_id')
+
+    # Writes clear the cached stats, no waiting for STATS_CACHE_TTL
+    after = client.get('/api/stats', headers=auth).get_json()
+    assert after['cases'] == before['cases'] + 1
+    assert after['open_cases'] == before['open_cases'] + 1
+    assert sum(after['cases_by_status'].values()) == after['cases']
+
+
+def test_case_detail(client, auth, case, officer, criminal):
+    for text in ('Site visited', 'Witness statement taken', 'Suspect questioned'):
+        response = client.post(f'/api/cases/{case}/updates', headers=auth,
+                               json={'update_text': text, 'updated_by': officer})
+        assert response.status_code == 201
+
+    details = client.get(f'/api/cases/{case}/full', query_string={'limit': 2}, headers=auth).get_json()
+    assert details['case']['case_id'] == case
+    assert details['filing_officer']['officer_id'] == officer
+    assert details['suspect']['criminal_id'] == criminal
+    assert details['evidence'] == []
+    assert [u['update_text'] for u in details['updates']['items']] == ['Suspect questioned',
+                                                                      'Witness statement taken']
+
+    rest = client.get(f'/api/cases/{case}/updates',
+                      query_string={'cursor': details['updates']['next_cursor']}, headers=auth).get_json()
+    assert [u['update_text'] for u in rest['items']] == ['Site visited']
+    assert rest['next_cursor'] is None
+
+    assert client.get('/api/cases/999999/full', headers=auth).status_code == 404
+
+
+def test_etag_revalidation(client, auth, case):
+    first = client.get(f'/api/cases/{case}', headers=auth)
+    etag = first.headers['ETag']
+    again = client.get(f'/api/cases/{case}', headers=dict(auth, **{'If-None-Match': etag}))
+    assert again.status_code == 304
+
+    body = dict(first.get_json(), title='Renamed')
+    assert client.put(f'/api/cases/{case}', json=body, headers=auth).status_code == 200
+    changed = client.get(f'/api/cases/{case}', headers=dict(auth, **{'If-None-Match': etag}))
+    assert changed.status_code == 200
+    assert changed.get_json()['title'] == 'Renamed'
+
+
+def test_options_follow_writes(client, auth, criminal):
+    options = client.get('/api/criminals/options', headers=auth).get_json()
+    assert options[0]['criminal_id'] == criminal
+    assert set(options[0]) == {'criminal_id', 'name', 'cnic'}
+
+    # The cached list is dropped when a criminal is added
+    n = serial()
+    newer = create(client, auth, '/api/criminals', {'name': 'Newest', 'cnic': f'42101-{n:07d}-5'},
+                   'criminal_id')
+    assert client.get('/api/criminals/options', headers=auth).get_json()[0]['criminal_id'] == newer
+
+    limited = client.get('/api/criminals/options', query_string={'limit': 1}, headers=auth).get_json()
+    assert len(limited) == 1
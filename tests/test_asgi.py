@@ -0,0 +1,68 @@
+# ASGI adapter: requests run on the thread pool, oversized bodies get 413
+
+import asyncio
+
+import pytest
+from flask import Flask, request
+
+from asgi import ASGIAdapter
+
+calls = []
+
+echo_app = Flask(__name__)
+echo_app.config['MAX_CONTENT_LENGTH'] = 10
+
+
+@echo_app.route('/echo', methods=['POST'])
+def echo():
+    calls.append(1)
+    return request.get_data()
+
+
+def post(adapter, chunks, content_length=None):
+    """Send the body in chunks, returns (status, response body, messages left unread)"""
+    headers = [(b'content-type', b'application/octet-stream')]
+    if content_length is not None:
+        headers.append((b'content-length', str(content_length).encode()))
+    scope = {'type': 'http', 'method': 'POST', 'path': '/echo', 'headers': headers}
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1}
+                for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(adapter(scope, receive, send))
+    return sent[0]['status'], b''.join(m.get('body', b'') for m in sent[1:]), messages
+
+
+@pytest.fixture
+def adapter():
+    calls.clear()
+    adapter = ASGIAdapter(echo_app, threads=2)
+    yield adapter
+    adapter.shutdown()
+
+
+def test_body_within_limit(adapter):
+    assert post(adapter, [b'12345', b'67890'], content_length=10)[:2] == (200, b'1234567890')
+    assert calls == [1]
+
+
+def test_streamed_body_over_limit(adapter):
+    status, body, unread = post(adapter, [b'123456', b'789012', b'345'])
+    assert status == 413
+    # Refused at the chunk that went over, not after reading everything
+    assert len(unread) == 1
+    assert calls == []
+    assert adapter.stats()['too_large'] == 1
+
+
+def test_declared_length_over_limit(adapter):
+    status, body, unread = post(adapter, [b'1'], content_length=11)
+    assert status == 413
+    assert len(unread) == 1
+    assert calls == []
@@ -0,0 +1,97 @@
+# Buffered audit log: rows queued only after commit, failed batches retried
+
+import pytest
+
+import database as db
+from audit import AuditBuffer
+from conftest import serial
+
+
+class FailingConnection:
+    """Connection whose executemany fails the first failures times"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.written = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return self
+
+    def executemany(self, sql, rows):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError('database unavailable')
+        self.written.extend(rows)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_failed_batch_is_retried():
+    conn = FailingConnection(failures=2)
+    buffer = AuditBuffer(lambda: conn, max_attempts=5)
+    buffer.add('INSERT', 'Case', 1, None)
+    assert buffer.flush() == 0
+    assert buffer.stats()['pending'] == 1
+    assert buffer.flush() == 0
+    assert buffer.flush() == 1
+    assert conn.written == [('INSERT', 'Case', 1, None)]
+    assert buffer.stats()['failed'] == 0
+
+
+def test_failed_batch_is_logged_after_max_attempts(caplog):
+    buffer = AuditBuffer(lambda: FailingConnection(failures=10), max_attempts=2)
+    buffer.add('DELETE', 'Evidence', 7, None)
+    buffer.flush()
+    buffer.flush()
+    assert buffer.stats()['failed'] == 1
+    assert buffer.stats()['pending'] == 0
+    assert "('DELETE', 'Evidence', 7, None)" in caplog.text
+
+
+@pytest.fixture
+def buffered(app, monkeypatch):
+    """Buffered audit mode with a buffer that is only flushed by the test"""
+    buffer = AuditBuffer(lambda: db.get_pool().connection())
+    monkeypatch.setattr(db, 'AUDIT_BUFFERED', True)
+    monkeypatch.setattr(db, '_audit_buffer', buffer)
+    return buffer
+
+
+class CommitFails:
+    """Connection wrapper whose commit fails, after the change and its audit row were written"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def commit(self):
+        raise RuntimeError('commit failed')
+
+
+def test_rolled_back_write_queues_nothing(buffered, monkeypatch):
+    n = serial()
+    criminal_id = db.create_criminal('Audited', '', f'37405-{n:07d}-9', '')
+    assert buffered.stats()['queued'] == 1
+
+    connect = db.get_db_connection
+    monkeypatch.setattr(db, 'get_db_connection', lambda: CommitFails(connect()))
+    assert db.update_criminal(criminal_id, 'Renamed', '', f'37405-{n:07d}-9', '') is False
+    monkeypatch.setattr(db, 'get_db_connection', connect)
+    assert buffered.stats()['queued'] == 1
+
+    assert buffered.flush() == 1
+    logs = db.get_audit_logs(10, table_name='Criminal', record_id=criminal_id)
+    assert [entry['action'] for entry in logs] == ['INSERT']
+    assert db.get_criminal_by_id(criminal_id)['name'] == 'Audited'
@@ -0,0 +1,43 @@
+# Bulk import: batches, per-row errors and one audit row per batch
+
+import database as db
+from conftest import serial
+
+
+def import_criminals(client, auth, cnics, batch_size):
+    lines = ['name,cnic'] + [f'Imported {cnic},{cnic}' for cnic in cnics]
+    response = client.post('/api/import/criminals', query_string={'batch_size': batch_size},
+                           data='\n'.join(lines) + '\n', content_type='text/csv', headers=auth)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def criminal_id(cnic):
+    return db.lookup_cnic(cnic)['exact'][0]['criminal_id']
+
+
+def test_audit_row_per_batch_points_at_first_row(client, auth):
+    cnics = [f'91919-{serial():07d}-1' for _ in range(3)]
+    result = import_criminals(client, auth, cnics, batch_size=2)
+    assert result['inserted'] == 3
+
+    first_ids = [criminal_id(cnics[0]), criminal_id(cnics[2])]
+    assert result['audited'] == [
+        {'record_id': first_ids[0], 'inserted': 2, 'first_line': 2, 'last_line': 3},
+        {'record_id': first_ids[1], 'inserted': 1, 'first_line': 4, 'last_line': 4},
+    ]
+    for record_id in first_ids:
+        logs = db.get_audit_logs(10, table_name='Criminal', record_id=record_id)
+        assert [entry['action'] for entry in logs] == ['BULK INSERT']
+
+
+def test_batch_with_a_bad_row_is_inserted_row_by_row(client, auth):
+    taken = f'92929-{serial():07d}-1'
+    import_criminals(client, auth, [taken], batch_size=10)
+
+    fresh = f'92929-{serial():07d}-1'
+    result = import_criminals(client, auth, [taken, fresh], batch_size=10)
+    assert result['inserted'] == 1
+    assert [error['line'] for error in result['errors']] == [2]
+    assert result['audited'] == [{'record_id': criminal_id(fresh), 'inserted': 1,
+                                  'first_line': 2, 'last_line': 3}]
@@ -0,0 +1,93 @@
+# Reference / stats caches: expiry, LRU eviction, invalidation (both backends)
+
+import time
+
+import pytest
+
+from cache import TTLCache, SQLiteCache, create_cache
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_cache(request, tmp_path):
+    def make(ttl=30, max_entries=None):
+        return create_cache(request.param, 'test', ttl, max_entries, str(tmp_path / 'cache.db'))
+    return make
+
+
+def test_get_or_load_calls_loader_once(make_cache):
+    cache = make_cache()
+    calls = []
+    loader = lambda: calls.append(1) or {'value': 1}
+    assert cache.get_or_load('key', loader) == {'value': 1}
+    assert cache.get_or_load('key', loader) == {'value': 1}
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_none_is_not_cached(make_cache):
+    cache = make_cache()
+    calls = []
+    cache.get_or_load('key', lambda: calls.append(1))
+    cache.get_or_load('key', lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+def test_entries_expire(make_cache):
+    cache = make_cache(ttl=0.05)
+    cache.set('key', 'value')
+    assert cache.get('key') == 'value'
+    time.sleep(0.06)
+    assert cache.get('key') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_least_recently_used_is_evicted(make_cache):
+    cache = make_cache(max_entries=2)
+    cache.set('a', 1)
+    time.sleep(0.01)
+    cache.set('b', 2)
+    time.sleep(0.01)
+    cache.set('c', 3)
+    assert cache.get('a') is None
+    assert cache.get('b') == 2
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_invalidate_prefix(make_cache):
+    cache = make_cache()
+    cache.set('case:1', 'one')
+    cache.set('case:2', 'two')
+    cache.set('case_options:50', 'options')
+    cache.invalidate_prefix('case:')
+    assert cache.get('case:1') is None
+    assert cache.get('case:2') is None
+    assert cache.get('case_options:50') == 'options'
+
+
+def test_invalidation_during_load_is_not_overwritten(make_cache):
+    cache = make_cache()
+
+    def loader():
+        # A write commits and invalidates while the value is being read
+        cache.invalidate('key')
+        return 'stale'
+
+    assert cache.get_or_load('key', loader) == 'stale'
+    assert cache.get('key') is None
+
+
+def test_sqlite_cache_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    first = SQLiteCache(path, 'reference')
+    second = SQLiteCache(path, 'reference')
+    first.set('officer:1', {'name': 'Asad'})
+    assert second.get('officer:1') == {'name': 'Asad'}
+    second.invalidate('officer:1')
+    assert first.get('officer:1') is None
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_cache('redis', 'test', 30)
+    assert isinstance(create_cache('memory', 'test', 30), TTLCache)
@@ -0,0 +1,93 @@
+# Chunked evidence uploads: offsets, resuming, hash check and dedup
+
+import hashlib
+import os
+
+import pytest
+
+import utils
+
+CONTENT = os.urandom(300 * 1024)
+SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.fixture
+def upload(client, auth, case):
+    response = client.post('/api/evidence/uploads', headers=auth,
+                           json={'case_id': case, 'file_name': 'statement.doc', 'total_size': len(CONTENT)})
+    assert response.status_code == 201
+    return response.get_json()['upload_id']
+
+
+def put_chunk(client, auth, upload_id, offset, data):
+    return client.put(f'/api/evidence/uploads/{upload_id}', query_string={'offset': offset},
+                      data=data, headers=auth)
+
+
+def test_offsets_and_resume(client, auth, case, upload):
+    before = client.get('/api/stats', headers=auth).get_json()
+    response = put_chunk(client, auth, upload, 0, CONTENT[:100000])
+    assert response.get_json()['offset'] == 100000
+
+    # A chunk sent twice (e.g. the reply was lost) or skipping ahead is
+    # refused with the offset to resume from
+    for offset in (0, 150000):
+        response = put_chunk(client, auth, upload, offset, CONTENT[offset:offset + 1000])
+        assert response.status_code == 409
+        assert response.get_json()['offset'] == 100000
+
+    assert client.get(f'/api/evidence/uploads/{upload}', headers=auth).get_json()['offset'] == 100000
+
+    # Completing early is refused too
+    response = client.post(f'/api/evidence/uploads/{upload}/complete', headers=auth, json={})
+    assert response.status_code == 409
+
+    response = put_chunk(client, auth, upload, 100000, CONTENT[100000:])
+    assert response.get_json()['offset'] == len(CONTENT)
+
+    response = client.post(f'/api/evidence/uploads/{upload}/complete', headers=auth, json={'sha256': SHA256})
+    assert response.status_code == 201
+    evidence = response.get_json()
+    assert evidence['sha256'] == SHA256
+    assert evidence['size'] == len(CONTENT)
+    after = client.get('/api/stats', headers=auth).get_json()
+    assert after['evidence_bytes'] == before['evidence_bytes'] + len(CONTENT)
+
+    with open(utils.blob_store.path_for(SHA256), 'rb') as f:
+        assert f.read() == CONTENT
+    # Nothing staged is left behind
+    assert os.listdir(utils.blob_store.tmp_folder) == []
+
+    downloaded = client.get(f'/uploads/evidence/{evidence["evidence_id"]}', headers=auth)
+    assert downloaded.data == CONTENT
+    assert client.get(f'/uploads/evidence/{evidence["evidence_id"]}').status_code == 401
+
+    details = client.get(f'/api/cases/{case}/full', headers=auth).get_json()
+    assert [e['evidence_id'] for e in details['evidence']] == [evidence['evidence_id']]
+
+
+def test_hash_mismatch_is_refused(client, auth, upload):
+    put_chunk(client, auth, upload, 0, CONTENT)
+    response = client.post(f'/api/evidence/uploads/{upload}/complete', headers=auth, json={'sha256': '0' * 64})
+    assert response.status_code == 400
+
+
+def test_known_content_needs_no_upload(client, auth, case, upload):
+    put_chunk(client, auth, upload, 0, CONTENT)
+    client.post(f'/api/evidence/uploads/{upload}/complete', headers=auth, json={})
+
+    response = client.post('/api/evidence/uploads', headers=auth,
+                           json={'case_id': case, 'file_name': 'copy.doc', 'sha256': SHA256})
+    assert response.status_code == 201
+    copy = response.get_json()
+    assert copy['complete'] is True
+
+    # The blob stays while another row uses it
+    assert client.delete(f'/api/evidence/{copy["evidence_id"]}', headers=auth).status_code == 200
+    assert utils.blob_store.exists(SHA256)
+
+
+def test_abort_removes_partial_file(client, auth, upload):
+    put_chunk(client, auth, upload, 0, CONTENT[:1000])
+    assert client.delete(f'/api/evidence/uploads/{upload}', headers=auth).status_code == 200
+    assert client.get(f'/api/evidence/uploads/{upload}', headers=auth).status_code == 404
@@ -0,0 +1,41 @@
+# Login attempt limits (per username and per client IP)
+
+import config
+from passwords import LoginThrottle, TokenBucket
+
+
+def test_bucket_allows_burst_then_waits():
+    bucket = TokenBucket(burst=3, per_minute=60)
+    assert [bucket.take('a') for _ in range(3)] == [0, 0, 0]
+    assert 0 < bucket.take('a') <= 1
+    # Other keys have their own bucket
+    assert bucket.take('b') == 0
+
+
+def test_bucket_forgets_oldest_keys():
+    bucket = TokenBucket(burst=1, per_minute=1, max_keys=2)
+    bucket.take('a')
+    bucket.take('b')
+    bucket.take('c')
+    assert bucket.take('a') == 0
+
+
+def test_throttle_by_username_and_ip():
+    throttle = LoginThrottle(user_burst=2, user_per_minute=1, ip_burst=3, ip_per_minute=1)
+    assert throttle.check('Alice', '10.0.0.1') is None
+    assert throttle.check('alice', '10.0.0.1') is None
+    # Usernames are not case sensitive
+    assert throttle.check('ALICE', '10.0.0.1')[0] == 'username'
+    assert throttle.check('bob', '10.0.0.1')[0] == 'ip'
+    assert throttle.check('bob', '10.0.0.2') is None
+
+
+def test_login_answers_429_with_retry_after(client):
+    burst = config.LOGIN_USER_BURST
+    statuses = [client.post('/api/login', json={'username': 'nobody', 'password': 'wrong'}).status_code
+                for _ in range(burst + 1)]
+    assert statuses == [401] * burst + [429]
+
+    response = client.post('/api/login', json={'username': 'nobody', 'password': 'wrong'})
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
@@ -0,0 +1,87 @@
+# CNIC / badge lookup indexes: prefix search and reloads
+
+import threading
+
+import pytest
+
+import database as db
+from conftest import create, serial
+from lookup import PrefixIndex, normalize_badge, normalize_cnic
+
+
+def payload(record_id):
+    return {'id': record_id}
+
+
+def test_exact_and_prefix():
+    index = PrefixIndex(normalize_cnic)
+    index.load([(1, '35202-1234567-1', payload(1)), (2, '35202-1234568-1', payload(2)),
+                (3, '61101-0000000-1', payload(3))])
+    assert index.exact('3520212345671') == [payload(1)]
+    assert index.prefix('35202 123456') == [payload(1), payload(2)]
+    assert index.prefix('35202', limit=1) == [payload(1)]
+    assert index.prefix('') == []
+
+
+def test_empty_key_matches_nothing():
+    index = PrefixIndex(normalize_cnic)
+    index.load([(1, '', payload(1)), (2, None, payload(2)), (3, '111', payload(3))])
+    assert index.exact('---') == []
+    assert index.exact(None) == []
+
+
+def test_badge_is_not_case_sensitive():
+    index = PrefixIndex(normalize_badge)
+    index.put(1, 'lhr-0042', payload(1))
+    assert index.exact('LHR 0042') == [payload(1)]
+    index.remove(1)
+    assert index.exact('LHR 0042') == []
+
+
+def test_changes_during_reload_are_kept():
+    index = PrefixIndex(normalize_cnic)
+    index.load([(1, '111', payload(1)), (2, '222', payload(2))])
+
+    # Rows read before these writes committed
+    index.begin_load()
+    rows = [(1, '111', payload(1)), (2, '222', payload(2))]
+    index.put(3, '333', payload(3))
+    index.put(1, '999', payload(1))
+    index.remove(2)
+    index.load(rows)
+
+    assert index.exact('333') == [payload(3)]
+    assert index.exact('999') == [payload(1)]
+    assert index.exact('111') == []
+    assert index.exact('222') == []
+    assert len(index) == 2
+
+
+@pytest.mark.parametrize('query', [{'cnic': '---'}, {'badge': ' - '}, {}])
+def test_lookup_needs_a_search_term(client, auth, query):
+    assert client.get('/api/lookup', query_string=query, headers=auth).status_code == 400
+
+
+def test_lookup_does_not_wait_for_a_reload(client, auth):
+    n = serial()
+    cnic = f'17301-{n:07d}-7'
+    create(client, auth, '/api/criminals', {'name': 'Looked Up', 'cnic': cnic}, 'criminal_id')
+    found = client.get('/api/lookup', query_string={'cnic': cnic}, headers=auth).get_json()
+    assert [match['cnic'] for match in found['exact']] == [cnic]
+
+    # Another thread is reloading the stale index: lookups answer from the current one
+    db._cnic_index.invalidate()
+    db._cnic_index.load_lock.acquire()
+    try:
+        result = []
+        thread = threading.Thread(target=lambda: result.append(db.lookup_cnic(cnic)))
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert [match['cnic'] for match in result[0]['exact']] == [cnic]
+    finally:
+        db._cnic_index.load_lock.release()
+
+    # The next lookup reloads it
+    assert db.lookup_cnic(cnic)['exact']
+    assert not db._cnic_index.is_stale(60)
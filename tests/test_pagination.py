@@ -0,0 +1,52 @@
+# Keyset pagination helpers: cursors, seek conditions and pages
+
+from datetime import datetime
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor, get_limit, keyset_condition, make_page, parse_datetime
+from config import API_PAGE_SIZE, API_MAX_PAGE_SIZE
+
+KEY = (('upload_date', parse_datetime), ('evidence_id', int))
+
+
+def test_cursor_round_trip():
+    values = [datetime(2026, 1, 15, 10, 30, 0, 123456), 42]
+    assert decode_cursor(encode_cursor(values), KEY) == values
+
+
+def test_cursor_accepts_sql_server_precision():
+    token = encode_cursor(['2026-01-15 10:30:00.1234567', 42])
+    assert decode_cursor(token, KEY) == [datetime(2026, 1, 15, 10, 30, 0, 123456), 42]
+
+
+@pytest.mark.parametrize('token', ['%%%', encode_cursor([1]), encode_cursor(['x', 'y']),
+                                   encode_cursor([None, 1]), encode_cursor(['2026-01-01', None])])
+def test_bad_cursor(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token, KEY)
+
+
+def test_no_cursor():
+    assert decode_cursor(None, KEY) is None
+    assert decode_cursor('', KEY) is None
+
+
+def test_limit_is_clamped():
+    assert get_limit(None) == API_PAGE_SIZE
+    assert get_limit(0) == 1
+    assert get_limit(API_MAX_PAGE_SIZE + 1) == API_MAX_PAGE_SIZE
+
+
+def test_keyset_condition_descending():
+    sql, params = keyset_condition(['a', 'b', 'c'], [1, 2, 3], descending=True)
+    assert sql == '((a < ?) OR (a = ? AND b < ?) OR (a = ? AND b = ? AND c < ?))'
+    assert params == [1, 1, 2, 1, 2, 3]
+
+
+def test_make_page():
+    rows = [{'upload_date': datetime(2026, 1, day), 'evidence_id': day} for day in (3, 2, 1)]
+    page = make_page(rows, 2, KEY)
+    assert page['items'] == rows[:2]
+    assert decode_cursor(page['next_cursor'], KEY) == [datetime(2026, 1, 2), 2]
+    assert make_page(rows, 3, KEY)['next_cursor'] is None
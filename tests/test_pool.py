@@ -0,0 +1,131 @@
+# Connection pool: reuse, limits, broken and stale connections
+
+import threading
+import time
+
+import pytest
+
+from pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+
+    def rollback(self):
+        if self.broken:
+            raise RuntimeError('connection lost')
+
+    def cursor(self):
+        if self.broken:
+            raise RuntimeError('connection lost')
+        return FakeCursor()
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCursor:
+    def execute(self, sql):
+        pass
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def connections():
+    return []
+
+
+@pytest.fixture
+def connect(connections):
+    def connect():
+        conn = FakeConnection()
+        connections.append(conn)
+        return conn
+    return connect
+
+
+def test_connections_are_reused(connect, connections):
+    pool = ConnectionPool(connect, min_size=0, max_size=2)
+    pool.acquire().close()
+    pool.acquire().close()
+    assert len(connections) == 1
+    assert pool.stats()['checkouts'] == 2
+    assert pool.stats()['idle'] == 1
+
+
+def test_close_twice_returns_once(connect):
+    pool = ConnectionPool(connect, min_size=0, max_size=2)
+    conn = pool.acquire()
+    conn.close()
+    conn.close()
+    assert pool.stats()['in_use'] == 0
+    with pytest.raises(RuntimeError):
+        conn.cursor()
+
+
+def test_checkout_times_out_when_full(connect):
+    pool = ConnectionPool(connect, min_size=0, max_size=1)
+    held = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire(timeout=0.05)
+    assert pool.stats()['timeouts'] == 1
+    held.close()
+
+
+def test_waiter_gets_released_connection(connect, connections):
+    pool = ConnectionPool(connect, min_size=0, max_size=1)
+    held = pool.acquire()
+    threading.Timer(0.05, held.close).start()
+    with pool.connection(timeout=5):
+        pass
+    assert len(connections) == 1
+    assert pool.stats()['waits'] == 1
+
+
+def test_broken_connection_is_discarded(connect, connections):
+    pool = ConnectionPool(connect, min_size=0, max_size=2)
+    conn = pool.acquire()
+    connections[0].broken = True
+    conn.close()
+    assert connections[0].closed
+    assert pool.stats()['size'] == 0
+
+    pool.acquire().close()
+    assert len(connections) == 2
+
+
+def test_stale_idle_connection_is_replaced(connect, connections):
+    pool = ConnectionPool(connect, min_size=0, max_size=2, ping_interval=0)
+    pool.acquire().close()
+    connections[0].broken = True
+    pool.acquire().close()
+    assert len(connections) == 2
+    assert pool.stats()['reconnects'] == 1
+
+
+def test_idle_connections_expire_down_to_min_size(connect, connections):
+    pool = ConnectionPool(connect, min_size=1, max_size=3, idle_timeout=0.01)
+    held = [pool.acquire() for _ in range(3)]
+    for conn in held:
+        conn.close()
+    time.sleep(0.02)
+    pool.acquire().close()
+    assert pool.stats()['size'] == 1
+    assert sum(conn.closed for conn in connections) == 2
+
+
+def test_warm_and_close_all(connect, connections):
+    pool = ConnectionPool(connect, min_size=2, max_size=4)
+    pool.warm()
+    assert pool.stats()['idle'] == 2
+    pool.close_all()
+    assert all(conn.closed for conn in connections)
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
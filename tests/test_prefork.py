@@ -0,0 +1,78 @@
+# Pre-forking server: workers are replaced after max_requests without
+# dropping requests, and stop cleanly on SIGTERM
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+
+SERVER = """
+import os, sys
+sys.path.insert(0, sys.argv[1])
+from prefork import PreforkServer
+
+def app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [str(os.getpid()).encode()]
+
+PreforkServer(lambda: app, host='127.0.0.1', port=int(sys.argv[2]), workers=1, threads=2,
+              max_requests=2, graceful_timeout=5).run()
+"""
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get(port):
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=5) as response:
+        return int(response.read())
+
+
+@pytest.fixture
+def server():
+    port = free_port()
+    process = subprocess.Popen([sys.executable, '-c', SERVER, BACKEND, str(port)])
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            get(port)
+            break
+        except OSError:
+            if time.monotonic() > deadline or process.poll() is not None:
+                process.kill()
+                pytest.fail('server did not start')
+            time.sleep(0.05)
+    yield process, port
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+
+
+def test_workers_restart_after_max_requests(server):
+    process, port = server
+    # The first worker served the startup check, so every following pair of
+    # requests goes to a new worker; none of them may fail meanwhile
+    pids = [get(port) for _ in range(7)]
+    assert len(set(pids)) == 4
+    assert process.pid not in pids
+
+
+def test_sigterm_stops_master_and_workers(server):
+    process, port = server
+    worker = get(port)
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(timeout=10) == 0
+    with pytest.raises(ProcessLookupError):
+        os.kill(worker, 0)
@@ -0,0 +1,66 @@
+# Signed session tokens: verification, key rotation and revocation at logout
+
+import pytest
+
+from conftest import ADMIN_USERNAME, ADMIN_PASSWORD
+from tokens import InvalidToken, RevocationList, TokenSigner
+
+
+def test_issue_and_verify():
+    signer = TokenSigner({1: 'key-one'}, 1, ttl=60)
+    issued = signer.issue(7, now=1000)
+    claims = signer.verify(issued['token'], now=1030)
+    assert claims == {'admin_id': 7, 'token_id': issued['token_id'], 'expires': 1060, 'key_version': 1}
+
+
+@pytest.mark.parametrize('change, reason', [
+    (lambda token: token + 'x', 'bad_signature'),
+    (lambda token: token.replace('.7.', '.8.', 1), 'bad_signature'),
+    (lambda token: '9' + token[1:], 'unknown_key'),
+    (lambda token: token.rsplit('.', 1)[0], 'malformed'),
+    (lambda token: 'a.b.c.d.e', 'malformed'),
+])
+def test_verify_rejects_tampering(change, reason):
+    signer = TokenSigner({1: 'key-one'}, 1, ttl=60)
+    token = signer.issue(7, now=1000)['token']
+    with pytest.raises(InvalidToken) as raised:
+        signer.verify(change(token), now=1000)
+    assert raised.value.args[0] == reason
+
+
+def test_verify_rejects_expired():
+    signer = TokenSigner({1: 'key-one'}, 1, ttl=60)
+    token = signer.issue(7, now=1000)['token']
+    with pytest.raises(InvalidToken, match='expired'):
+        signer.verify(token, now=1060)
+
+
+def test_key_rotation():
+    old = TokenSigner({1: 'key-one'}, 1)
+    token = old.issue(7)['token']
+    rotated = TokenSigner({1: 'key-one', 2: 'key-two'}, 2)
+    assert rotated.verify(token)['key_version'] == 1
+    assert rotated.verify(rotated.issue(7)['token'])['key_version'] == 2
+    with pytest.raises(InvalidToken, match='unknown_key'):
+        TokenSigner({2: 'key-two'}, 2).verify(token)
+
+
+def test_revocation_list_drops_expired():
+    revoked = RevocationList()
+    revoked.add('gone', 1, revocation_id=3)
+    revoked.add('live', 2 ** 40, revocation_id=5)
+    revoked.mark_loaded()
+    assert 'gone' not in revoked
+    assert 'live' in revoked
+    assert revoked.last_id == 5
+
+
+def test_logout_revokes_token(client):
+    token = client.post('/api/login', json={'username': ADMIN_USERNAME,
+                                            'password': ADMIN_PASSWORD}).get_json()['token']
+    headers = {'Authorization': 'Bearer ' + token}
+    assert client.get('/api/check-auth', headers=headers).get_json()['authenticated'] is True
+
+    assert client.post('/api/logout', headers=headers).status_code == 200
+    assert client.get('/api/check-auth', headers=headers).get_json()['authenticated'] is False
+    assert client.get('/api/cases', headers=headers).status_code == 401